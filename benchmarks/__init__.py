@@ -0,0 +1,15 @@
+import os
+
+# Settings are read at import time. Benchmarks that need no database or LLM
+# still import them, so fill in placeholders when there is no .env to read;
+# values from the environment or .env always win
+if not os.path.exists(".env"):
+    for name, value in {
+        "POSTGRES_HOST": "localhost",
+        "POSTGRES_PORT": "5432",
+        "POSTGRES_DB": "wiki",
+        "POSTGRES_USER": "wiki",
+        "POSTGRES_PASSWORD": "wiki",
+        "OPENAI_API_KEY": "benchmark",
+    }.items():
+        os.environ.setdefault(name, value)
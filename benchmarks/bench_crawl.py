@@ -0,0 +1,145 @@
+"""
+Обход локальной замены Wikipedia: общая сессия против сессии на страницу.
+
+Поднимает на локальном порту StubWiki с деревом статей (--depth, --fan-out)
+и обходит его в ширину --workers воркерами дважды: как раньше, открывая
+новую aiohttp.ClientSession на каждую страницу, и через одну общую сессию
+из create_http_session(). Для каждого режима выводит страниц в секунду и
+число установленных соединений (хендшейков), посчитанных через
+TraceConfig.on_connection_create_end.
+
+Сервер работает по HTTP на loopback, поэтому хендшейк здесь — только TCP.
+С Wikipedia к каждому новому соединению добавляются TLS и сетевые RTT,
+и разница между режимами только растёт.
+
+    python -m benchmarks.bench_crawl [--depth 3] [--fan-out 8] [--workers 10]
+"""
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+
+import aiohttp
+from aiohttp.test_utils import TestServer
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.http_client import create_http_session
+from wiki_parser_app.services.page_parsers import extract_page
+from tests.wiki_stub import StubWiki
+
+# Fetches a page and returns its body
+Fetch = Callable[[str], Awaitable[bytes]]
+
+
+def build_tree(depth: int, fan_out: int) -> Dict[str, List[str]]:
+    """Дерево статей: у каждой статьи выше depth — fan_out дочерних."""
+    pages: Dict[str, List[str]] = {}
+    level = ["Root"]
+    for _ in range(depth):
+        next_level = []
+        for title in level:
+            pages[title] = [f"{title}_{i}" for i in range(fan_out)]
+            next_level.extend(pages[title])
+        level = next_level
+    pages.update({title: [] for title in level})
+    return pages
+
+
+def handshake_counter() -> SimpleNamespace:
+    counter = SimpleNamespace(connections=0, trace=aiohttp.TraceConfig())
+
+    async def on_connection_create_end(session, context, params) -> None:
+        counter.connections += 1
+
+    counter.trace.on_connection_create_end.append(on_connection_create_end)
+    return counter
+
+
+@asynccontextmanager
+async def session_per_page(trace: aiohttp.TraceConfig) -> AsyncIterator[Fetch]:
+    """Прежнее поведение: новая сессия, а значит и новое соединение, на каждую страницу."""
+    async def fetch(url: str) -> bytes:
+        async with aiohttp.ClientSession(trace_configs=[trace]) as session:
+            async with session.get(url) as response:
+                return await response.read()
+
+    yield fetch
+
+
+@asynccontextmanager
+async def shared_session(trace: aiohttp.TraceConfig) -> AsyncIterator[Fetch]:
+    """Одна сессия с пулом соединений на весь обход."""
+    async with create_http_session(trace_configs=[trace]) as session:
+        async def fetch(url: str) -> bytes:
+            async with session.get(url) as response:
+                return await response.read()
+
+        yield fetch
+
+
+async def crawl(base_url: str, fetch: Fetch, workers: int) -> int:
+    """Обход в ширину от Root; возвращает число загруженных страниц."""
+    frontier: asyncio.Queue = asyncio.Queue()
+    visited = {"Root"}
+    frontier.put_nowait("Root")
+    fetched = 0
+
+    async def worker() -> None:
+        nonlocal fetched
+        while True:
+            title = await frontier.get()
+            try:
+                page = extract_page(await fetch(f"{base_url}/wiki/{title}"))
+                fetched += 1
+                for href in page['links']:
+                    link = href.removeprefix("/wiki/")
+                    if link not in visited:
+                        visited.add(link)
+                        frontier.put_nowait(link)
+            finally:
+                frontier.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    await frontier.join()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return fetched
+
+
+async def run(args: argparse.Namespace) -> None:
+    pages = build_tree(args.depth, args.fan_out)
+    server = TestServer(StubWiki(pages).app())
+    await server.start_server()
+    base_url = str(server.make_url("")).rstrip("/")
+    print(f"Stub wiki: {len(pages)} pages, {args.workers} workers, "
+          f"HTTP_LIMIT_PER_HOST={settings.HTTP_LIMIT_PER_HOST}")
+
+    try:
+        results = {}
+        for name, session_factory in (("session per page", session_per_page), ("shared session", shared_session)):
+            counter = handshake_counter()
+            async with session_factory(counter.trace) as fetch:
+                started = time.perf_counter()
+                fetched = await crawl(base_url, fetch, args.workers)
+                elapsed = time.perf_counter() - started
+            results[name] = fetched / elapsed
+            print(f"{name:<18} {results[name]:8.1f} pages/s  {counter.connections:5d} handshakes  "
+                  f"({fetched} pages in {elapsed:.2f}s)")
+        print(f"Speedup: x{results['shared session'] / results['session per page']:.2f}")
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument("--depth", type=int, default=3)
+    arguments.add_argument("--fan-out", type=int, default=8)
+    arguments.add_argument("--workers", type=int, default=settings.CRAWL_WORKERS)
+    asyncio.run(run(arguments.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+p50/p99 горячих запросов к БД до и после индексов миграции a7d3e9b5c184.
+
+Заполняет отдельную схему (по умолчанию bench_indexes) синтетическими
+статьями — дерево с ветвлением 10, каждая 20-я статья не разобрана,
+у каждой 10-й есть summary — и замеряет запросы в трёх вариантах:
+
+- before: без ix_articles_parent_id и ix_articles_unparsed;
+- after: индексы миграции;
+- after + hash(url): дополнительно hash-индекс на articles.url. Поиск по url
+  уже обслуживает уникальный индекс (lang, url), и этот вариант позволяет
+  проверить, что отдельный индекс на url ничего не даёт.
+
+Для каждого запроса выводятся p50/p99 в мс и узлы плана (какой индекс
+используется). Таблицы приложения не затрагиваются; схема удаляется
+в конце, если не указан --keep.
+
+    python -m benchmarks.bench_db_indexes [--url postgresql+asyncpg://...] [--rows 1000000] [--iterations 200]
+
+Без --url берётся TEST_DATABASE_URL, затем настройки POSTGRES_* приложения.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import re
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from wiki_parser_app.core.config import database_url
+from wiki_parser_app.db.database import Base
+from wiki_parser_app.models import articles  # noqa: F401 - registers the tables
+
+FAN_OUT = 10
+SCAN = re.compile(r"(Seq Scan|Index Only Scan|Index Scan|Bitmap Index Scan)(?: using (\w+))? on (\w+)")
+
+SEED_ARTICLES = """
+INSERT INTO articles (id, lang, title, url, content, parsed, level, parent_id, created_at, updated_at)
+SELECT md5('a' || i)::uuid, 'ru', 'Article ' || i, 'Article_' || i, 'text', i % 20 <> 0, 0,
+       CASE WHEN i = 0 THEN NULL ELSE md5('a' || ((i - 1) / :fan_out))::uuid END,
+       now() - i * interval '1 second', now()
+FROM generate_series(0, :rows - 1) AS i
+"""
+SEED_SUMMARIES = """
+INSERT INTO summaries (id, article_id, content, created_at, updated_at)
+SELECT md5('s' || i)::uuid, md5('a' || i)::uuid, 'summary', now(), now()
+FROM generate_series(0, :rows - 1, 10) AS i
+"""
+
+VARIANTS = {
+    "before": [
+        "DROP INDEX IF EXISTS ix_articles_parent_id",
+        "DROP INDEX IF EXISTS ix_articles_unparsed",
+    ],
+    "after": [
+        "CREATE INDEX ix_articles_parent_id ON articles (parent_id)",
+        "CREATE INDEX ix_articles_unparsed ON articles (created_at) WHERE NOT parsed",
+    ],
+    "after + hash(url)": [
+        "CREATE INDEX bench_articles_url_hash ON articles USING hash (url)",
+    ],
+}
+
+
+def article_id(i: int) -> uuid.UUID:
+    """Тот же id, что у статьи i в SEED_ARTICLES."""
+    return uuid.UUID(hashlib.md5(f"a{i}".encode()).hexdigest())
+
+
+def build_queries(rows: int, rng: random.Random) -> Dict[str, Tuple[str, Callable[[], dict]]]:
+    """Название -> (SQL, параметры очередного выполнения) для запросов репозиториев."""
+    return {
+        "get_by_url": (
+            "SELECT id, title FROM articles WHERE lang = 'ru' AND url = :url",
+            lambda: {"url": f"Article_{rng.randrange(rows)}"},
+        ),
+        "crawl dedup (50 urls)": (
+            "SELECT url, id FROM articles WHERE lang = 'ru' AND url = ANY(:urls)",
+            lambda: {"urls": [f"Article_{rng.randrange(rows * 2)}" for _ in range(50)]},
+        ),
+        "exists_for_article": (
+            "SELECT article_id FROM summaries WHERE article_id = :id",
+            lambda: {"id": article_id(rng.randrange(rows))},
+        ),
+        "children": (
+            "SELECT id FROM articles WHERE parent_id = :id",
+            lambda: {"id": article_id(rng.randrange(rows // FAN_OUT))},
+        ),
+        "subtree (depth 3)": (
+            "WITH RECURSIVE tree(id, depth) AS ("
+            " SELECT id, 0 FROM articles WHERE id = :id"
+            " UNION ALL SELECT a.id, tree.depth + 1 FROM articles a JOIN tree ON a.parent_id = tree.id"
+            " WHERE tree.depth < 3) SELECT count(*) FROM tree",
+            lambda: {"id": article_id(rng.randrange(max(rows // FAN_OUT ** 3, 1)))},
+        ),
+        "unparsed queue (100)": (
+            "SELECT id FROM articles WHERE NOT parsed ORDER BY created_at LIMIT 100",
+            lambda: {},
+        ),
+    }
+
+
+async def seed(connection: AsyncConnection, rows: int) -> None:
+    started = time.perf_counter()
+    await connection.run_sync(Base.metadata.create_all)
+    await connection.execute(text(SEED_ARTICLES), {"rows": rows, "fan_out": FAN_OUT})
+    await connection.execute(text(SEED_SUMMARIES), {"rows": rows})
+    await connection.execute(text("ANALYZE"))
+    print(f"Seeded {rows} articles in {time.perf_counter() - started:.1f}s")
+
+
+async def plan(connection: AsyncConnection, sql: str, params: dict) -> str:
+    result = await connection.execute(text(f"EXPLAIN {sql}"), params)
+    scans = []
+    for (line,) in result:
+        match = SCAN.search(line)
+        if match:
+            kind, index, table = match.groups()
+            scans.append(f"{kind} {index or ''} on {table}".replace("  ", " "))
+    return ", ".join(dict.fromkeys(scans))
+
+
+async def measure(connection: AsyncConnection, sql: str, params: Callable[[], dict], iterations: int) -> List[float]:
+    statement = text(sql)
+    for _ in range(min(iterations, 10)):  # warm-up
+        await connection.execute(statement, params())
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await connection.execute(statement, params())
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(
+        args.url,
+        connect_args={"server_settings": {"search_path": args.schema}},
+    )
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+            await connection.execute(text(f'CREATE SCHEMA "{args.schema}"'))
+            await seed(connection, args.rows)
+
+        for variant, statements in VARIANTS.items():
+            async with engine.begin() as connection:
+                for statement in statements:
+                    await connection.execute(text(statement))
+                await connection.execute(text("ANALYZE articles"))
+
+            print(f"\n{variant}")
+            queries = build_queries(args.rows, random.Random(args.seed))
+            async with engine.connect() as connection:
+                for name, (sql, params) in queries.items():
+                    timings = await measure(connection, sql, params, args.iterations)
+                    percentiles = statistics.quantiles(timings, n=100)
+                    print(f"  {name:<22} p50 {percentiles[49] * 1e3:8.3f} ms  p99 {percentiles[98] * 1e3:8.3f} ms"
+                          f"  {await plan(connection, sql, params())}")
+    finally:
+        if not args.keep:
+            async with engine.begin() as connection:
+                await connection.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+        await engine.dispose()
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument("--url", default=os.environ.get("TEST_DATABASE_URL") or database_url)
+    arguments.add_argument("--schema", default="bench_indexes")
+    arguments.add_argument("--rows", type=int, default=1_000_000)
+    arguments.add_argument("--iterations", type=int, default=200)
+    arguments.add_argument("--seed", type=int, default=20)
+    arguments.add_argument("--keep", action="store_true", help="Do not drop the schema at the end")
+    asyncio.run(run(arguments.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
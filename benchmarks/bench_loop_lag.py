@@ -0,0 +1,131 @@
+"""
+Задержка event loop при загрузке и разборе страниц для каждого PARSE_EXECUTOR.
+
+Раздаёт с локального порта страницы корпуса (по умолчанию tests/fixtures/pages),
+раздутые до --inflate байт, и загружает их через WikipediaParser._fetch_article
+с --concurrency одновременными запросами в режимах:
+
+- inline: потоковый разбор прямо из сокета в event loop, чтение
+  останавливается на лимитах PARSER_MAX_CONTENT и квоты ссылок;
+- thread: тот же потоковый разбор, но каждый фрагмент разбирается в пуле
+  из PARSE_WORKERS потоков;
+- process: тело читается целиком (до PARSER_MAX_BYTES) и разбирается
+  в пуле из PARSE_WORKERS процессов.
+
+Параллельно LoopLagMonitor с интервалом --interval замеряет, насколько
+позже запланированного просыпается корутина. Для каждого режима выводятся
+страниц в секунду, p50/p99/max задержки и полученные из сокета мегабайты.
+Ранняя остановка потокового разбора видна с небольшой квотой ссылок
+(--max-links), как при обходе без сохранения графа ссылок.
+
+    python -m benchmarks.bench_loop_lag [каталог] [--pages 200] [--inflate 1500000] [--max-links 10]
+"""
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from benchmarks.bench_parsers import DEFAULT_CORPUS, inflate, load_corpus
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.executors import create_parse_executor
+from wiki_parser_app.core.loop_monitor import LoopLagMonitor
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.parser_service import WikipediaParser
+
+EXECUTORS = ("inline", "thread", "process")
+
+
+class CountingFetcher(PoliteFetcher):
+    """PoliteFetcher, считающий байты тела, полученные из сокета до закрытия ответа."""
+
+    received = 0
+
+    @asynccontextmanager
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncIterator[aiohttp.ClientResponse]:
+        async with super().get(url, headers) as response:
+            try:
+                yield response
+            finally:
+                self.received += response.content.total_bytes
+
+
+def page_app(pages: List[bytes]) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=pages[int(request.match_info['index']) % len(pages)], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get('/wiki/{index}', handle)
+    return app
+
+
+async def measure(executor_name: str, base_url: str, args: argparse.Namespace) -> dict:
+    settings.PARSE_EXECUTOR = executor_name
+    executor = create_parse_executor()
+    monitor = LoopLagMonitor(interval=args.interval, window=1_000_000)
+    try:
+        async with aiohttp.ClientSession() as session:
+            fetcher = CountingFetcher(session, requests_per_second=1e6, burst=10_000)
+            parser = WikipediaParser(None, session, parse_executor=executor, fetcher=fetcher)
+            if args.max_links is not None:
+                parser.max_links = args.max_links
+            # Warm up the pool, so process start-up is not counted
+            await parser._fetch_article(f"{base_url}/wiki/0")
+            fetcher.received = 0
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def fetch(index: int) -> None:
+                async with semaphore:
+                    if await parser._fetch_article(f"{base_url}/wiki/{index}") is None:
+                        raise RuntimeError(f"Page {index} failed")
+
+            monitor.start()
+            started = time.perf_counter()
+            await asyncio.gather(*(fetch(index) for index in range(args.pages)))
+            elapsed = time.perf_counter() - started
+            await monitor.stop()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return {'pages_per_second': args.pages / elapsed, 'read_mb': fetcher.received / 1e6, **monitor.snapshot()}
+
+
+async def run(args: argparse.Namespace) -> None:
+    pages = [inflate(page, args.inflate) for page in load_corpus(args.corpus)]
+    if not pages:
+        raise SystemExit(f"No *.html pages in {args.corpus}")
+    server = TestServer(page_app(pages))
+    await server.start_server()
+    base_url = str(server.make_url("")).rstrip("/")
+    print(f"{len(pages)} pages of {sum(map(len, pages)) / len(pages) / 1e6:.2f} MB, {args.pages} fetches, "
+          f"concurrency {args.concurrency}, PARSE_WORKERS={settings.PARSE_WORKERS}, "
+          f"PARSER_BACKEND={settings.PARSER_BACKEND}")
+    try:
+        for executor_name in args.executors:
+            result = await measure(executor_name, base_url, args)
+            print(f"{executor_name:<8} {result['pages_per_second']:7.1f} pages/s  "
+                  f"lag p50 {result['p50'] * 1e3:6.1f} ms  p99 {result['p99'] * 1e3:6.1f} ms  "
+                  f"max {result['max'] * 1e3:6.1f} ms  read {result['read_mb']:7.1f} MB")
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS)
+    arguments.add_argument("--pages", type=int, default=200)
+    arguments.add_argument("--inflate", type=int, default=1_500_000)
+    arguments.add_argument("--concurrency", type=int, default=settings.CRAWL_WORKERS)
+    arguments.add_argument("--interval", type=float, default=0.005)
+    arguments.add_argument("--max-links", type=int, help="Link quota per page, as a crawl without stored links has")
+    arguments.add_argument("--executors", nargs="+", choices=EXECUTORS, default=list(EXECUTORS))
+    asyncio.run(run(arguments.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
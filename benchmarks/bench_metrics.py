@@ -0,0 +1,97 @@
+"""
+Накладные расходы инструментирования метриками.
+
+Замеряет стоимость отдельных обновлений метрик (нс на вызов, за вычетом
+пустого цикла), стоимость набора обновлений, которые пайплайн делает на
+одну страницу, и сравнивает её со временем разбора страницы из корпуса
+(по умолчанию tests/fixtures/pages). Отдельно — время REGISTRY.render()
+для ответа /metrics.
+
+    python -m benchmarks.bench_metrics [каталог] [--number 1000000]
+"""
+import argparse
+import time
+import timeit
+from pathlib import Path
+
+from wiki_parser_app.core.metrics import (
+    FETCH_IN_FLIGHT,
+    FETCH_SECONDS,
+    HTTP_RESPONSES,
+    PAGES_CRAWLED,
+    PARSE_SECONDS,
+    REGISTRY
+)
+from wiki_parser_app.services.page_parsers import extract_page
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+
+
+def per_page_updates() -> None:
+    """Обновления метрик на одну успешно загруженную и разобранную страницу."""
+    FETCH_IN_FLIGHT.inc()
+    FETCH_SECONDS.labels("ru.wikipedia.org").observe(0.12)
+    HTTP_RESPONSES.labels(200).inc()
+    FETCH_IN_FLIGHT.dec()
+    timed_block()
+    PAGES_CRAWLED.inc()
+
+
+def timed_block() -> None:
+    with PARSE_SECONDS.labels("streaming").time():
+        pass
+
+
+def noop() -> None:
+    pass
+
+
+def cost_ns(function, number: int) -> float:
+    """Время одного вызова в нс за вычетом вызова пустой функции, лучшее из пяти."""
+    baseline = min(timeit.repeat(noop, number=number, repeat=5))
+    measured = min(timeit.repeat(function, number=number, repeat=5))
+    return max(measured - baseline, 0.0) / number * 1e9
+
+
+def parse_time(pages: list) -> float:
+    """Среднее время извлечения одной страницы корпуса в секундах."""
+    for page in pages:
+        extract_page(page)  # warm-up
+    rounds = 20
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            extract_page(page)
+    return (time.perf_counter() - started) / (rounds * len(pages))
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS)
+    arguments.add_argument("--number", type=int, default=1_000_000)
+    args = arguments.parse_args()
+
+    operations = {
+        "Counter.inc()": PAGES_CRAWLED.inc,
+        "Counter.labels(...).inc()": lambda: HTTP_RESPONSES.labels(200).inc(),
+        "Gauge.inc() + dec()": lambda: (FETCH_IN_FLIGHT.inc(), FETCH_IN_FLIGHT.dec()),
+        "Histogram.labels(...).observe()": lambda: FETCH_SECONDS.labels("ru.wikipedia.org").observe(0.12),
+        "with Histogram.labels(...).time()": timed_block,
+    }
+    for name, function in operations.items():
+        print(f"{name:<34} {cost_ns(function, args.number):8.1f} ns")
+
+    per_page = cost_ns(per_page_updates, args.number // 5) / 1e9
+    pages = [path.read_bytes() for path in sorted(args.corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No *.html pages in {args.corpus}")
+    parse = parse_time(pages)
+    print(f"Per page: metrics {per_page * 1e6:.2f} us, extraction {parse * 1e6:.0f} us "
+          f"({per_page / parse:.3%} of extraction alone, before any network or DB time)")
+
+    render = min(timeit.repeat(REGISTRY.render, number=100, repeat=5)) / 100
+    print(f"REGISTRY.render(): {render * 1e3:.3f} ms, {len(REGISTRY.render())} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Пропускная способность (МБ/с) и пиковая память разбора HTML.
+
+Корпус — сохранённые страницы Wikipedia (*.html) из указанного каталога,
+по умолчанию tests/fixtures/pages. Каждый бэкенд разбирает корпус по кругу
+не меньше --seconds секунд, страница подаётся кусками по --chunk байт,
+как при потоковой загрузке, и разбор прекращается, когда набраны лимит
+текста и --max-links ссылок. Для сравнения так же замеряется прежний
+парсер (baseline): весь ответ декодируется в одну строку, текст
+собирается через +=.
+
+Страницы в tests/fixtures/pages маленькие; --inflate N повторяет абзацы
+каждой страницы, пока она не вырастет до N байт, как большая статья.
+
+    python -m benchmarks.bench_parsers [каталог] [--seconds 3] [--chunk 65536] [--max-links N] [--inflate N]
+"""
+import argparse
+import codecs
+import re
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.services.page_parsers import PARSER_BACKENDS
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+
+
+PARAGRAPH = re.compile(rb"<p>.*?</p>", re.DOTALL)
+
+
+class BaselinePageParser(HTMLParser):
+    """Парсер до перехода на потоковое извлечение, без изменений."""
+
+    def __init__(self):
+        super().__init__()
+        self._level = 0
+        self._wrapper_tag = ""
+        self._pattern = re.compile(r"^/wiki/(?!.*:).*")
+        self._found_links: Set[str] = set()
+        self.title = ""
+        self.content = ""
+        self._in_title = False
+        self._in_content = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs_dict = dict(attrs)
+        if tag == "h1" and attrs_dict.get("id") == "firstHeading":
+            self._in_title = True
+        if tag == "div" and attrs_dict.get("id") == "bodyContent":
+            self._level = 1
+            self._wrapper_tag = tag
+            self._in_content = True
+        if self._level > 0 and tag == "a" and "href" in attrs_dict:
+            if self._pattern.match(attrs_dict["href"]):
+                self._found_links.add(attrs_dict["href"])
+        if tag in ["table", "div", "span"] and any(
+                attr in attrs_dict.get("class", "")
+                for attr in ["hatnote", "thumb", "mw-editsection"]
+        ):
+            self._skip_element = True
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._in_content and not getattr(self, "_skip_element", False):
+            self.content += data + " "
+
+    def handle_endtag(self, tag):
+        if tag == "h1" and self._in_title:
+            self._in_title = False
+        if tag == self._wrapper_tag and self._level > 0:
+            self._level -= 1
+            if self._level == 0:
+                self._in_content = False
+        if tag == "div" and getattr(self, "_skip_element", False):
+            self._skip_element = False
+
+
+def load_corpus(directory: Path) -> List[bytes]:
+    pages = [path.read_bytes() for path in sorted(directory.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No *.html pages in {directory}")
+    return pages
+
+
+def inflate(page: bytes, size: int) -> bytes:
+    """Повторяет абзацы страницы после последнего из них, пока она не станет не меньше size байт."""
+    matches = list(PARAGRAPH.finditer(page))
+    if not matches or len(page) >= size:
+        return page
+    paragraphs = b"".join(match.group() for match in matches)
+    repeats = (size - len(page)) // len(paragraphs) + 1
+    end = matches[-1].end()
+    return page[:end] + paragraphs * repeats + page[end:]
+
+
+def baseline_runner() -> Callable[[bytes], dict]:
+    def run(page: bytes) -> dict:
+        # response.text(): the whole body as one string before parsing
+        parser = BaselinePageParser()
+        parser.feed(page.decode("utf-8", errors="replace"))
+        return {
+            'title': parser.title.strip(),
+            'content': parser.content.strip()[:settings.PARSER_MAX_CONTENT],
+            'links': list(parser._found_links),
+        }
+
+    return run
+
+
+def backend_runner(backend: str, chunk: int, max_links: Optional[int] = None) -> Callable[[bytes], dict]:
+    parser_class = PARSER_BACKENDS[backend]
+
+    def run(page: bytes) -> dict:
+        parser = parser_class(max_links=max_links)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for start in range(0, len(page), chunk):
+            parser.feed(decoder.decode(page[start:start + chunk]))
+            if parser.done:
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        return parser.result()
+
+    return run
+
+
+def throughput(run: Callable[[bytes], dict], pages: List[bytes], seconds: float) -> float:
+    """МБ/с при разборе корпуса по кругу в течение seconds секунд."""
+    run(pages[0])  # warm-up
+    size = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for page in pages:
+            run(page)
+            size += len(page)
+    return size / (time.perf_counter() - started) / 1e6
+
+
+def peak_memory(run: Callable[[bytes], dict], pages: List[bytes]) -> int:
+    """Наибольший пик памяти (байт) при разборе одной страницы корпуса."""
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        run(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS)
+    arguments.add_argument("--seconds", type=float, default=3.0)
+    arguments.add_argument("--chunk", type=int, default=settings.PARSER_CHUNK_SIZE)
+    arguments.add_argument("--max-links", type=int, default=None)
+    arguments.add_argument("--inflate", type=int, default=0)
+    args = arguments.parse_args()
+
+    pages = [inflate(page, args.inflate) for page in load_corpus(args.corpus)]
+    print(f"Corpus: {len(pages)} pages, {sum(map(len, pages)) / 1e6:.2f} MB from {args.corpus}")
+
+    runners = {"baseline": baseline_runner()}
+    runners.update({backend: backend_runner(backend, args.chunk, args.max_links) for backend in PARSER_BACKENDS})
+    results: Dict[str, float] = {}
+    for name, run in runners.items():
+        results[name] = throughput(run, pages, args.seconds)
+        print(f"{name:<12} {results[name]:8.2f} MB/s  peak {peak_memory(run, pages) / 1024:8.0f} KB")
+
+    for backend in PARSER_BACKENDS:
+        print(f"{backend} vs baseline: x{results[backend] / results['baseline']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
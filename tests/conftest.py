@@ -0,0 +1,140 @@
+import os
+
+# Settings are read at import time, the tests never connect to these servers
+os.environ.setdefault("POSTGRES_HOST", "localhost")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("POSTGRES_DB", "wiki")
+os.environ.setdefault("POSTGRES_USER", "wiki")
+os.environ.setdefault("POSTGRES_PASSWORD", "wiki")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.repositories.article_repo import ArticleRepository
+from wiki_parser_app.repositories.link_repo import LinkRepository
+from tests.fake_openai import FakeOpenAI
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeSession:
+    def __init__(self, maker: "FakeSessionMaker"):
+        self.maker = maker
+
+    async def __aenter__(self):
+        self.maker.opened += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def commit(self):
+        self.maker.commits += 1
+
+
+class FakeSessionMaker:
+    """Замена async_sessionmaker: считает открытые сессии и коммиты."""
+
+    def __init__(self):
+        self.opened = 0
+        self.commits = 0
+
+    def __call__(self) -> FakeSession:
+        return FakeSession(self)
+
+
+class MemoryStore:
+    """Статьи и ссылки в памяти вместо таблиц articles и article_links."""
+
+    def __init__(self):
+        self.articles: Dict[Tuple[str, str], dict] = {}
+        self.links: List[dict] = []
+        # Errors raised by the next bulk_upsert calls, one per call
+        self.upsert_errors: List[Exception] = []
+
+    def by_url(self, url: str, lang: str = "ru") -> Optional[dict]:
+        return self.articles.get((lang, url))
+
+
+@pytest.fixture
+def session_maker() -> FakeSessionMaker:
+    return FakeSessionMaker()
+
+
+@pytest.fixture
+def memory_store(monkeypatch) -> MemoryStore:
+    store = MemoryStore()
+
+    async def bulk_upsert(self, rows):
+        if store.upsert_errors:
+            raise store.upsert_errors.pop(0)
+        result = {}
+        for row in rows:
+            key = (row['lang'], row['url'])
+            existing = store.articles.get(key)
+            if existing is None:
+                store.articles[key] = dict(row)
+            else:
+                existing.update({k: v for k, v in row.items() if k not in ('id', 'parent_id')})
+            result[row['url']] = store.articles[key]['id']
+        return result
+
+    async def get_existing_urls(self, urls, fresh_for=None, lang="ru"):
+        return {url: store.articles[(lang, url)]['id'] for url in urls if (lang, url) in store.articles}
+
+    async def bulk_insert(self, edges):
+        store.links.extend(edges)
+
+    async def get_target_urls(self, source_ids):
+        targets = {}
+        for edge in sorted(store.links, key=lambda edge: edge['position']):
+            if edge['source_id'] in source_ids:
+                targets.setdefault(edge['source_id'], []).append(edge['target_url'])
+        return targets
+
+    monkeypatch.setattr(ArticleRepository, "bulk_upsert", bulk_upsert)
+    monkeypatch.setattr(ArticleRepository, "get_existing_urls", get_existing_urls)
+    monkeypatch.setattr(LinkRepository, "bulk_insert", bulk_insert)
+    monkeypatch.setattr(LinkRepository, "get_target_urls", get_target_urls)
+    return store
+
+
+@pytest.fixture
+async def serve():
+    """Запускает aiohttp-приложение на локальном порту и возвращает его базовый URL."""
+    servers = []
+
+    async def start(app: web.Application) -> str:
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        return str(server.make_url('')).rstrip('/')
+
+    yield start
+    for server in servers:
+        await server.close()
+
+
+@pytest.fixture
+async def http_session():
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+@pytest.fixture
+async def fake_llm(serve, monkeypatch):
+    """FakeOpenAI на локальном порту; SummaryService ходит в него через LLM_BASE_URL."""
+    llm = FakeOpenAI()
+    base_url = await serve(llm.app())
+    monkeypatch.setattr(settings, "LLM_BASE_URL", f"{base_url}/v1")
+    monkeypatch.setattr(settings, "LLM_BACKOFF_BASE", 0.01)
+    return llm
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+from typing import Callable, List, Optional
+
+from aiohttp import web
+
+
+def api_error(status: int, retry_after: Optional[str] = None) -> Callable[[], web.Response]:
+    """Ответ с ошибкой в формате OpenAI API."""
+    def respond() -> web.Response:
+        headers = {}
+        if retry_after is not None:
+            headers['retry-after'] = retry_after
+        return web.json_response(
+            {'error': {'message': f"HTTP {status}", 'type': 'error', 'code': None}},
+            status=status,
+            headers=headers
+        )
+    return respond
+
+
+class FakeOpenAI:
+    """
+    Локальный OpenAI-совместимый сервер: POST /v1/chat/completions.
+
+    Отвечает reply(messages); faults подменяют ответы на следующие запросы,
+    fail_when(messages) позволяет отвечать ошибкой на конкретные статьи.
+    Запросы со stream=True получают ответ по словам в формате SSE с паузой
+    stream_delay между фрагментами.
+    """
+
+    def __init__(self, reply: Callable[[List[dict]], str] = lambda messages: "Summary"):
+        self.reply = reply
+        self.requests: List[dict] = []
+        self.faults: List[Callable[[], web.Response]] = []
+        self.fail_when: Optional[Callable[[List[dict]], bool]] = None
+        self.stream_delay = 0.0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests.append(body)
+        if self.faults:
+            return self.faults.pop(0)()
+        if self.fail_when is not None and self.fail_when(body['messages']):
+            return api_error(400)()
+
+        content = self.reply(body['messages'])
+        prompt_tokens = sum(len(message['content']) for message in body['messages']) // 3
+        if body.get('stream'):
+            return await self.stream(request, body, content, prompt_tokens)
+        return web.json_response({
+            'id': f"chatcmpl-{len(self.requests)}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body['model'],
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': len(content) // 3,
+                'total_tokens': prompt_tokens + len(content) // 3,
+            },
+        })
+
+    async def stream(self, request: web.Request, body: dict, content: str, prompt_tokens: int) -> web.StreamResponse:
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+
+        def chunk(choices: list, usage: Optional[dict] = None) -> bytes:
+            data = {
+                'id': f"chatcmpl-{len(self.requests)}",
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body['model'],
+                'choices': choices,
+                'usage': usage,
+            }
+            return f"data: {json.dumps(data)}\n\n".encode()
+
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            text = word if i == 0 else f" {word}"
+            await response.write(chunk([{'index': 0, 'delta': {'content': text}, 'finish_reason': None}]))
+            await asyncio.sleep(self.stream_delay)
+        await response.write(chunk([], {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(content) // 3,
+            'total_tokens': prompt_tokens + len(content) // 3,
+        }))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self.handle)
+        return app
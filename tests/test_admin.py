@@ -0,0 +1,28 @@
+import httpx
+import pytest
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.main import create_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()), base_url="http://test") as client:
+        yield client
+
+
+async def test_admin_is_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+
+    assert (await client.get("/admin/profiles")).status_code == 403
+    assert (await client.get("/admin/profiles", headers={"X-Admin-Token": ""})).status_code == 403
+
+
+async def test_admin_requires_the_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+
+    assert (await client.get("/admin/profiles")).status_code == 403
+    assert (await client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"})).status_code == 403
+    assert (await client.get("/admin/profiles", headers={"X-Admin-Token": "secret"})).status_code == 200
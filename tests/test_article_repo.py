@@ -0,0 +1,79 @@
+"""
+Upsert статей и разрешение ссылок по (lang, url) на настоящем PostgreSQL
+(TEST_DATABASE_URL, как в test_query_counts).
+"""
+import os
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from wiki_parser_app.db.database import Base
+from wiki_parser_app.models import articles, jobs  # noqa: F401 - registers the tables
+from wiki_parser_app.repositories.article_repo import ArticleRepository
+from wiki_parser_app.repositories.link_repo import LinkRepository
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def repo():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield ArticleRepository(session)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+def row(lang: str, url: str, content: str) -> dict:
+    return {'id': uuid.uuid4(), 'lang': lang, 'url': url, 'title': url, 'content': content, 'parsed': True,
+            'level': 0, 'parent_id': None}
+
+
+async def test_same_url_in_two_languages_is_two_articles(repo):
+    ru = await repo.bulk_upsert([row("ru", "Python", "ru text")])
+    en = await repo.bulk_upsert([row("en", "Python", "en text")])
+
+    assert ru["Python"] != en["Python"]
+    assert await repo.get_existing_urls(["Python", "Missing"], lang="ru") == ru
+    assert await repo.get_existing_urls(["Python"], lang="en") == en
+    assert await repo.get_existing_urls(["Python"], lang="de") == {}
+
+
+async def test_upsert_updates_only_the_article_of_its_language(repo):
+    ru = await repo.bulk_upsert([row("ru", "Python", "old")])
+    await repo.bulk_upsert([row("en", "Python", "en text")])
+
+    again = await repo.bulk_upsert([row("ru", "Python", "new")])
+
+    # The conflicting row keeps its id, the new id from the batch is ignored
+    assert again == ru
+    ru_article = await repo.get_by_id(ru["Python"])
+    assert ru_article.content == "new"
+    en_ids = await repo.get_existing_urls(["Python"], lang="en")
+    assert (await repo.get_by_id(en_ids["Python"])).content == "en text"
+
+
+async def test_links_resolve_in_the_language_of_their_edge(repo):
+    ru = await repo.bulk_upsert([row("ru", "Root", "text"), row("ru", "Python", "ru text")])
+    en = await repo.bulk_upsert([row("en", "Root", "text"), row("en", "Python", "en text")])
+    links = LinkRepository(repo.db_session)
+    await links.bulk_insert([
+        {'id': uuid.uuid4(), 'source_id': ids["Root"], 'lang': lang, 'target_url': "Python", 'position': 0}
+        for lang, ids in (("ru", ru), ("en", en))
+    ])
+
+    out_links = await links.get_out_links(en["Root"])
+
+    assert [link['article_id'] for link in out_links] == [en["Python"]]
+    assert [link['article_id'] for link in await links.get_in_links(ru["Python"])] == [ru["Root"]]
+    path = await links.shortest_path(en["Root"], en["Python"])
+    assert [article['id'] for article in path] == [en["Root"], en["Python"]]
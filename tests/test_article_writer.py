@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from wiki_parser_app.services.article_writer import ArticleBatchWriter, ArticleWriteError
+
+pytestmark = pytest.mark.anyio
+
+
+class Deadlock(Exception):
+    sqlstate = '40P01'
+
+
+def page(url, level=0, parent_url=None):
+    return dict(url=url, title=url, content=f"Text of {url}", level=level, parent_url=parent_url, links=["A", "B"])
+
+
+async def test_every_flush_commits_its_own_transaction(session_maker, memory_store):
+    writer = ArticleBatchWriter(session_maker, batch_size=2)
+    await writer.add(**page("Root"))
+    await writer.add(**page("Child", 1, "Root"))
+    await writer.add(**page("Grandchild", 2, "Child"))
+    await writer.close()
+
+    assert session_maker.commits == 2
+    assert writer.rows_written == 3
+    assert memory_store.by_url("Child")['parent_id'] == writer.url_ids["Root"]
+    assert memory_store.by_url("Grandchild")['parent_id'] == writer.url_ids["Child"]
+    assert len(memory_store.links) == 6
+
+
+async def test_deadlock_is_retried(session_maker, memory_store):
+    writer = ArticleBatchWriter(session_maker)
+    memory_store.upsert_errors = [DBAPIError("INSERT", {}, Deadlock())]
+
+    await writer.add(**page("Root"))
+    await writer.flush()
+
+    assert writer.deadlocks == 1
+    assert "Root" in writer.url_ids
+    assert session_maker.commits == 1
+
+
+async def test_failed_flush_aborts_the_writer(session_maker, memory_store):
+    writer = ArticleBatchWriter(session_maker)
+    memory_store.upsert_errors = [RuntimeError("connection lost")]
+
+    await writer.add(**page("Root"))
+    with pytest.raises(ArticleWriteError):
+        await writer.flush()
+
+    assert writer.failed.is_set()
+    assert "Root" not in writer.url_ids
+    with pytest.raises(ArticleWriteError):
+        await writer.add(**page("Next"))
+    # Nothing is retried on close once the writer has failed
+    await writer.close()
+    assert session_maker.commits == 0
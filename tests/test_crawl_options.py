@@ -0,0 +1,121 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.main import create_app
+from wiki_parser_app.repositories.job_repo import JobRepository
+from wiki_parser_app.services.article_service import ArticleService
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.job_service import JobManager
+from wiki_parser_app.services.parser_service import WikipediaParser
+from tests.wiki_stub import StubWiki
+
+pytestmark = pytest.mark.anyio
+
+# B is linked twice from Root, so it is the most frequent link
+PAGES = {
+    "Root": ["A", "B", "B", "C"],
+    "A": ["A1"],
+    "B": ["B1"],
+    "C": [],
+    "A1": [],
+    "B1": [],
+}
+
+
+class FakeArticleRepo:
+    async def get_with_summary(self, url, lang):
+        return SimpleNamespace(id=uuid.uuid4(), url=url)
+
+
+@pytest.fixture
+async def api(serve, http_session, session_maker, memory_store, monkeypatch):
+    """POST /parse -> JobManager -> ArticleService -> WikipediaParser против StubWiki."""
+    wiki = StubWiki(PAGES)
+    monkeypatch.setattr(settings, "WIKI_BASE_URL", await serve(wiki.app()))
+    jobs = {}
+
+    async def create(self, url, options=None):
+        jobs[url] = SimpleNamespace(
+            id=uuid.uuid4(), url=url, status="pending", pages_fetched=0, pages_failed=0, pages_deduped=0,
+            depth_reached=0, options=options, article_id=None, error=None, created_at=None, started_at=None,
+            finished_at=None
+        )
+        return jobs[url]
+
+    async def update(self, job_id, **values):
+        pass
+
+    async def list_unfinished(self):
+        return []
+
+    async def summarize_article(self, article):
+        return True
+
+    monkeypatch.setattr(JobRepository, "create", create)
+    monkeypatch.setattr(JobRepository, "update", update)
+    monkeypatch.setattr(JobRepository, "list_unfinished", list_unfinished)
+    monkeypatch.setattr(ArticleService, "summarize_article", summarize_article)
+
+    parsers = []
+
+    def service_factory(session):
+        fetcher = PoliteFetcher(http_session, requests_per_second=1000, burst=100)
+        parsers.append(WikipediaParser(session_maker, http_session, max_depth=0, fan_out=1, fetcher=fetcher))
+        return ArticleService(session, FakeArticleRepo(), None, parsers[-1], None)
+
+    manager = JobManager(session_maker, service_factory, workers=1)
+    app = create_app()
+    app.state.job_manager = manager
+    await manager.start()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def parse(**body):
+            response = await client.post("/parse", json=body)
+            await asyncio.wait_for(manager._queue.join(), timeout=5)
+            return response
+        yield SimpleNamespace(parse=parse, wiki=wiki, jobs=jobs, parsers=parsers)
+    await manager.stop()
+
+
+async def test_request_options_reach_the_crawler(api):
+    response = await api.parse(url="Root", max_depth=2, fan_out=1, link_strategy="frequency")
+
+    assert response.status_code == 202
+    assert response.json()['options'] == {'max_depth': 2, 'fan_out': 1, 'link_strategy': "frequency"}
+    parser = api.parsers[-1]
+    assert (parser.max_depth, parser.fan_out, parser.link_strategy) == (2, 1, "frequency")
+    # fan_out=1 with the frequency strategy follows only the most frequent link
+    assert set(api.wiki.hits) == {"Root", "B", "B1"}
+
+
+async def test_order_strategy_follows_document_order(api):
+    await api.parse(url="Root", max_depth=1, fan_out=2, link_strategy="order")
+
+    assert set(api.wiki.hits) == {"Root", "A", "B"}
+
+
+async def test_max_pages_limits_the_crawl(api):
+    await api.parse(url="Root", max_depth=2, fan_out=3, max_pages=3)
+
+    assert sum(api.wiki.hits.values()) == 3
+
+
+async def test_larger_fan_out_on_a_crawled_article_fetches_the_new_children(api):
+    await api.parse(url="Root", max_depth=1, fan_out=1)
+    api.wiki.hits.clear()
+
+    await api.parse(url="Root", max_depth=1, fan_out=3)
+
+    # Root and A are stored already, only the newly selected children are fetched
+    assert set(api.wiki.hits) == {"B", "C"}
+
+
+async def test_invalid_options_are_rejected(api):
+    response = await api.parse(url="Root", link_strategy="random", fan_out=0)
+
+    assert response.status_code == 422
+    assert api.jobs == {}
@@ -0,0 +1,91 @@
+"""
+Учёт пула соединений, запросов и сессий из db/instrumentation.py на
+настоящем PostgreSQL (TEST_DATABASE_URL, как в test_query_counts).
+"""
+import asyncio
+import os
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from wiki_parser_app.db.database import Base
+from wiki_parser_app.db.instrumentation import db_stats, instrument_engine
+from wiki_parser_app.dependencies import repository_dep
+from wiki_parser_app.main import create_app
+from wiki_parser_app.models.articles import Article, ArticleLink
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine(TEST_DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=5)
+    instrument_engine(engine, slow_query_threshold=60.0)
+    yield engine
+    await engine.dispose()
+
+
+async def test_failed_statement_does_not_leak_its_start_time(engine):
+    failed = db_stats.failed_queries
+    async with engine.connect() as connection:
+        with pytest.raises(DBAPIError):
+            await connection.execute(text("SELECT * FROM no_such_table"))
+        await connection.rollback()
+        info = (await connection.get_raw_connection()).info
+        assert info['query_started_at'] == []
+
+        await connection.execute(text("SELECT 1"))
+        assert info['query_started_at'] == []
+
+    assert db_stats.failed_queries == failed + 1
+
+
+async def test_pool_saturation_is_measured_from_checkout_to_checkin(engine):
+    saturations, saturated_time = db_stats.pool_saturations, db_stats.pool_saturated_time
+    checkouts = db_stats.checkouts
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+        # The only connection is checked out: a second request would wait
+        await asyncio.sleep(0.05)
+
+    assert db_stats.checkouts == checkouts + 1
+    assert db_stats.pool_saturations == saturations + 1
+    assert db_stats.pool_saturated_time - saturated_time >= 0.05
+
+
+async def test_request_opens_one_session_for_all_repositories(engine, monkeypatch):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session:
+        article = Article(title="A", url=f"A_{uuid.uuid4().hex}", content="text", parsed=True, level=0)
+        source = Article(title="B", url=f"B_{uuid.uuid4().hex}", content="text", parsed=True, level=0)
+        session.add_all([article, source])
+        await session.flush()
+        session.add(ArticleLink(source_id=source.id, target_url=article.url, position=0))
+        await session.commit()
+    monkeypatch.setattr(repository_dep, "async_session_maker", session_maker)
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()), base_url="http://test") as client:
+            before = db_stats.sessions_opened
+            # The endpoint depends on both ArticleRepository and LinkRepository
+            response = await client.get(f"/articles/{article.id}/links/in")
+            assert response.status_code == 200
+            assert db_stats.sessions_opened == before + 1
+
+            await client.get(f"/articles/{article.id}/links/in")
+            assert db_stats.sessions_opened == before + 2
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,128 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.metrics import FETCH_IN_FLIGHT
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from tests.wiki_stub import StubWiki
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def wiki(serve):
+    wiki = StubWiki({"Page": ["A"], "Other": ["B"]})
+    wiki.base_url = await serve(wiki.app())
+    return wiki
+
+
+@pytest.fixture
+def fetcher(http_session):
+    return PoliteFetcher(http_session, requests_per_second=1000, burst=100, backoff_base=0.01, backoff_max=0.05)
+
+
+def dropped_connection(wiki: StubWiki) -> tuple:
+    # aiohttp itself resends an idempotent request once when the connection
+    # drops, so the fetcher only sees the second disconnect in a row
+    return wiki.disconnect(), wiki.disconnect()
+
+
+async def fetch_status(fetcher: PoliteFetcher, url: str) -> int:
+    async with fetcher.get(url) as response:
+        await response.read()
+        return response.status
+
+
+async def test_5xx_and_disconnects_are_retried_with_backoff(wiki, fetcher):
+    wiki.fail("Page", wiki.status(503), *dropped_connection(wiki), wiki.status(502))
+
+    assert await fetch_status(fetcher, f"{wiki.base_url}/wiki/Page") == 200
+
+    assert wiki.hits["Page"] == 5
+    assert fetcher.retries == 3
+    assert set(fetcher.retries_by_reason) == {"503", "502", "ServerDisconnectedError"}
+
+
+async def test_retry_after_is_honoured_beyond_backoff_max(wiki, fetcher):
+    wiki.fail("Page", wiki.status(429, {"Retry-After": "0.3"}))
+
+    assert await fetch_status(fetcher, f"{wiki.base_url}/wiki/Page") == 200
+
+    first, second = wiki.arrivals["Page"]
+    # backoff_max is 0.05s; the server's value wins
+    assert second - first >= 0.3
+    assert fetcher.retry_after_wait == pytest.approx(0.3)
+
+
+async def test_retry_after_pauses_the_whole_host(wiki, fetcher):
+    wiki.fail("Page", wiki.status(503, {"Retry-After": "0.3"}))
+
+    async with fetcher.get(f"{wiki.base_url}/wiki/Page") as response:
+        assert response.status == 200
+    assert await fetch_status(fetcher, f"{wiki.base_url}/wiki/Other") == 200
+
+    assert wiki.arrivals["Other"][0] - wiki.arrivals["Page"][0] >= 0.3
+
+
+async def test_retry_after_beyond_the_cap_is_not_retried(wiki, http_session):
+    fetcher = PoliteFetcher(http_session, retry_after_max=60)
+    wiki.fail("Page", wiki.status(429, {"Retry-After": "3600"}))
+
+    assert await fetch_status(fetcher, f"{wiki.base_url}/wiki/Page") == 429
+
+    assert wiki.hits["Page"] == 1
+    assert fetcher.gave_up == 1
+
+
+async def test_retries_give_up_with_the_last_response(wiki, http_session):
+    fetcher = PoliteFetcher(http_session, max_retries=2, backoff_base=0.01)
+    wiki.fail("Page", *[wiki.status(503)] * 3)
+
+    assert await fetch_status(fetcher, f"{wiki.base_url}/wiki/Page") == 503
+
+    assert wiki.hits["Page"] == 3
+    assert fetcher.gave_up == 1
+
+
+async def test_persistent_disconnects_raise_after_retries(wiki, http_session):
+    fetcher = PoliteFetcher(http_session, max_retries=1, backoff_base=0.01)
+    wiki.fail("Page", *dropped_connection(wiki), *dropped_connection(wiki))
+
+    with pytest.raises(aiohttp.ClientError):
+        await fetch_status(fetcher, f"{wiki.base_url}/wiki/Page")
+
+    assert wiki.hits["Page"] == 4
+    assert fetcher.gave_up == 1
+
+
+async def test_circuit_breaker_pauses_only_the_failing_host(wiki, http_session, monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_BREAKER_MIN_REQUESTS", 2)
+    monkeypatch.setattr(settings, "FETCH_BREAKER_COOLDOWN", 60.0)
+    fetcher = PoliteFetcher(http_session, requests_per_second=1000, burst=100, max_retries=1, backoff_base=0.01)
+    wiki.fail("Page", wiki.status(503), wiki.status(503))
+    failing_url = f"{wiki.base_url}/wiki/Page"
+    # The same server under another host name has a breaker of its own
+    other_url = f"{wiki.base_url}/wiki/Other".replace("127.0.0.1", "localhost")
+
+    assert await fetch_status(fetcher, failing_url) == 503
+
+    assert fetcher.stats()['breaker_open'] == ["127.0.0.1"]
+    assert await asyncio.wait_for(fetch_status(fetcher, other_url), timeout=1) == 200
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(fetch_status(fetcher, failing_url), timeout=0.2)
+
+
+async def test_waiting_for_retry_after_is_not_in_flight(wiki, fetcher):
+    wiki.fail("Page", wiki.status(429, {"Retry-After": "0.3"}))
+    in_flight = FETCH_IN_FLIGHT.labels()
+    before = in_flight.value
+
+    task = asyncio.create_task(fetch_status(fetcher, f"{wiki.base_url}/wiki/Page"))
+    await asyncio.sleep(0.15)
+    # The first response is released and the retry waits for the host: nothing is on the wire
+    assert in_flight.value == before
+
+    assert await task == 200
+    assert in_flight.value == before
@@ -0,0 +1,51 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from wiki_parser_app.repositories.job_repo import JobRepository
+from wiki_parser_app.services.job_service import JobManager, JobQueueFull
+
+pytestmark = pytest.mark.anyio
+
+
+def job(url, options=None):
+    return SimpleNamespace(id=uuid.uuid4(), url=url, options=options)
+
+
+async def test_concurrent_submits_never_overfill_the_queue(session_maker, monkeypatch):
+    async def create(self, url, options=None):
+        # The insert yields to the loop, as a real round trip would
+        await asyncio.sleep(0.01)
+        return job(url, options)
+
+    monkeypatch.setattr(JobRepository, "create", create)
+    manager = JobManager(session_maker, service_factory=None, workers=0, queue_size=2)
+
+    results = await asyncio.gather(*(manager.submit(f"Page_{i}") for i in range(5)), return_exceptions=True)
+
+    assert len([result for result in results if not isinstance(result, Exception)]) == 2
+    assert all(isinstance(result, JobQueueFull) for result in results if isinstance(result, Exception))
+    assert manager._queue.qsize() == 2
+
+
+async def test_unfinished_jobs_beyond_queue_size_still_run(session_maker, monkeypatch):
+    unfinished = [job(f"Page_{i}") for i in range(5)]
+    ran = []
+
+    async def list_unfinished(self):
+        return unfinished
+
+    async def run(self, job_id, url, options=None):
+        ran.append(job_id)
+
+    monkeypatch.setattr(JobRepository, "list_unfinished", list_unfinished)
+    monkeypatch.setattr(JobManager, "_run", run)
+    manager = JobManager(session_maker, service_factory=None, workers=1, queue_size=2)
+
+    await manager.start()
+    await asyncio.wait_for(manager._queue.join(), timeout=1)
+    await manager.stop()
+
+    assert ran == [item.id for item in unfinished]
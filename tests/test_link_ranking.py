@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from wiki_parser_app.services.link_ranking import LINK_STRATEGIES, rank_links
+
+LINKS = ["A", "B", "C", "D", "E"]
+COUNTS = [1, 3, 1, 3, 2]
+LEAD = ["C", "E"]
+
+
+def test_order_keeps_document_order():
+    assert rank_links(LINKS, "order", COUNTS, LEAD) == LINKS
+
+
+def test_frequency_puts_frequent_links_first_and_ties_in_document_order():
+    assert rank_links(LINKS, "frequency", COUNTS, LEAD) == ["B", "D", "E", "A", "C"]
+
+
+def test_lead_puts_lead_links_first_and_keeps_document_order_within_groups():
+    assert rank_links(LINKS, "lead", COUNTS, LEAD) == ["C", "E", "A", "B", "D"]
+
+
+@pytest.mark.parametrize("strategy", list(LINK_STRATEGIES))
+def test_ranking_is_deterministic(strategy):
+    rng = random.Random(15)
+    links = [f"Link_{i}" for i in range(200)]
+    counts = [rng.randint(1, 3) for _ in links]
+    lead = rng.sample(links, 40)
+
+    results = {tuple(rank_links(links, strategy, counts, rng.sample(lead, len(lead)))) for _ in range(20)}
+
+    # Neither repeated calls nor the order of the lead set change the ranking
+    assert len(results) == 1
+    assert sorted(results.pop()) == sorted(links)
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        rank_links(LINKS, "random")
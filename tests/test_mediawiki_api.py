@@ -0,0 +1,93 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Set
+
+import pytest
+from aiohttp import web
+
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.mediawiki_api import MediaWikiApiBackend
+
+pytestmark = pytest.mark.anyio
+
+EXCHANGES = json.loads((Path(__file__).parent / "fixtures" / "mediawiki" / "api_query.json").read_text(encoding="utf-8"))
+
+
+class RecordedApi:
+    """api.php, отвечающий записанными ответами на запросы с теми же параметрами."""
+
+    def __init__(self, failing_extracts: Set[str] = frozenset()):
+        self.failing_extracts = failing_extracts
+        self.requests = []
+        self.extracts_in_flight = 0
+        self.max_extracts_in_flight = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        params = dict(request.query)
+        self.requests.append(params)
+        if params.get('prop') == 'extracts':
+            self.extracts_in_flight += 1
+            self.max_extracts_in_flight = max(self.max_extracts_in_flight, self.extracts_in_flight)
+            # Long enough for the other extract requests of the batch to arrive
+            await asyncio.sleep(0.05)
+            self.extracts_in_flight -= 1
+            if params['titles'] in self.failing_extracts:
+                raise web.HTTPInternalServerError()
+        for exchange in EXCHANGES:
+            if exchange['params'] == params:
+                return web.json_response(exchange['response'])
+        return web.json_response({'error': {'code': 'unrecorded', 'info': f"No recorded response for {params}"}})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/w/api.php', self.handle)
+        return app
+
+
+@pytest.fixture
+async def api_backend(serve, http_session):
+    async def start(api: RecordedApi) -> MediaWikiApiBackend:
+        base_url = await serve(api.app())
+        fetcher = PoliteFetcher(http_session, requests_per_second=1000, burst=100, max_retries=0)
+        return MediaWikiApiBackend(fetcher, f"{base_url}/w/api.php")
+    return start
+
+
+async def test_links_are_batched_and_extracts_fetched_concurrently(api_backend):
+    api = RecordedApi()
+    backend = await api_backend(api)
+
+    pages = await backend.fetch_batch(["Python", "ЯП", "Несуществующая_статья"])
+
+    assert pages["Несуществующая_статья"] is None
+    assert pages["Python"] == {
+        'title': "Python",
+        'content': (
+            "Python — высокоуровневый язык программирования общего назначения.\n\n"
+            "Язык является полностью объектно-ориентированным.\n\n"
+            "История\n\n"
+            "Разработка языка Python была начата в конце 1980-х годов."
+        ),
+        'links': ["CPython", "Гвидо_ван_Россум", "Динамическая_типизация", "Интерпретатор", "Язык_программирования"],
+        'link_counts': [1] * 5,
+        'lead_links': [],
+    }
+    # The redirect is followed to the target article
+    assert pages["ЯП"]['title'] == "Язык программирования"
+    assert pages["ЯП"]['links'] == ["Python", "Синтаксис_(программирование)"]
+
+    # Links of the whole batch: one request plus its continuation, then one extract request per article
+    assert [params['prop'] for params in api.requests] == ["links", "links", "extracts", "extracts"]
+    assert backend.requests == 4
+    assert api.max_extracts_in_flight == 2
+
+
+async def test_failed_extract_fails_only_its_article(api_backend):
+    api = RecordedApi(failing_extracts={"Язык программирования"})
+    backend = await api_backend(api)
+
+    pages = await backend.fetch_batch(["Python", "ЯП", "Несуществующая_статья"])
+
+    assert pages["ЯП"] is None
+    assert pages["Python"]['title'] == "Python"
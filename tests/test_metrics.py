@@ -0,0 +1,13 @@
+from wiki_parser_app.core.metrics import DB_POOL_SATURATED_SECONDS, DB_SLOW_QUERIES, REGISTRY
+
+
+def test_db_totals_are_exported_as_counters():
+    DB_POOL_SATURATED_SECONDS.inc(0.25)
+    DB_SLOW_QUERIES.inc()
+
+    rendered = REGISTRY.render()
+
+    assert "# TYPE wiki_db_pool_saturated_seconds_total counter" in rendered
+    assert "# TYPE wiki_db_slow_queries_total counter" in rendered
+    assert DB_POOL_SATURATED_SECONDS.labels().value >= 0.25
+    assert DB_SLOW_QUERIES.labels().value >= 1
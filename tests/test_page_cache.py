@@ -0,0 +1,91 @@
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.page_cache import PageCache
+from wiki_parser_app.services.parser_service import WikipediaParser
+from tests.wiki_stub import render_page
+
+pytestmark = pytest.mark.anyio
+
+URL = "https://ru.wikipedia.org/wiki/Python"
+
+
+async def test_concurrent_puts_of_one_url_leave_one_intact_entry(tmp_path):
+    cache = PageCache(str(tmp_path))
+    bodies = [os.urandom(1 << 20) for _ in range(20)]
+
+    await asyncio.gather(*(cache.put(URL, body, "utf-8", f'"{i}"', None) for i, body in enumerate(bodies)))
+
+    entry = await cache.get(URL)
+    assert entry['body'] == bodies[int(entry['etag'].strip('"'))]
+    assert os.listdir(tmp_path) == [PageCache._file_name(URL)]
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] == os.path.getsize(tmp_path / PageCache._file_name(URL))
+
+
+async def test_failed_write_removes_the_temporary_file(tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path))
+
+    def replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", replace)
+    await cache.put(URL, b"<html></html>", "utf-8", None, None)
+
+    assert os.listdir(tmp_path) == []
+    assert await cache.get(URL) is None
+
+
+class ConditionalWiki:
+    """Страница с ETag и Last-Modified, отвечающая 304 на условный запрос с текущим ETag."""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.last_modified = "Mon, 05 Oct 2026 10:00:00 GMT"
+        self.requests = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(dict(request.headers))
+        headers = {'ETag': self.etag, 'Last-Modified': self.last_modified}
+        if request.headers.get('If-None-Match') == self.etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=render_page("Python", ["CPython"]), content_type="text/html", headers=headers)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/wiki/{title}', self.handle)
+        return app
+
+
+async def test_not_modified_page_is_served_from_the_cache(tmp_path, serve, http_session, session_maker):
+    wiki = ConditionalWiki()
+    url = f"{await serve(wiki.app())}/wiki/Python"
+    cache = PageCache(str(tmp_path))
+    fetcher = PoliteFetcher(http_session, requests_per_second=1000, burst=100)
+    parser = WikipediaParser(session_maker, http_session, fetcher=fetcher, page_cache=cache)
+
+    first = await parser._fetch_article(url)
+    assert 'If-None-Match' not in wiki.requests[0]
+    assert cache.misses == 1
+
+    # The server keeps the ETag but reports a new Last-Modified with the 304
+    wiki.last_modified = "Tue, 06 Oct 2026 10:00:00 GMT"
+    second = await parser._fetch_article(url)
+
+    assert wiki.requests[1]['If-None-Match'] == '"v1"'
+    assert wiki.requests[1]['If-Modified-Since'] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert cache.revalidated == 1
+    assert second == first
+    assert second['title'] == "Python"
+    entry = await cache.get(url)
+    assert (entry['etag'], entry['last_modified']) == ('"v1"', "Tue, 06 Oct 2026 10:00:00 GMT")
+
+    await parser._fetch_article(url)
+    assert wiki.requests[2]['If-Modified-Since'] == "Tue, 06 Oct 2026 10:00:00 GMT"
+    assert cache.revalidated == 2
+    # Unchanged validators do not rewrite the entry
+    assert cache.stores == 2
@@ -0,0 +1,93 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from wiki_parser_app.services.page_parsers import PARSER_BACKENDS, PARAGRAPH_BREAK, PageExtractor, extract_page
+
+pytest.importorskip("lxml")
+
+PAGES = sorted((Path(__file__).parent / "fixtures" / "pages").glob("*.html"))
+SOUP_TAGS = (
+    "p div h1 h2 h3 ul ol dl li dt dd blockquote pre table thead tbody tr td th caption figure figcaption "
+    "section hr br img b i u s small big tt font em strong a span sup code"
+).split()
+
+
+def extract(backend: str, html: str, chunk_size: int) -> dict:
+    parser = PARSER_BACKENDS[backend](max_content=100_000)
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+    parser.close()
+    return parser.result()
+
+
+def tag_soup(rng: random.Random, size: int) -> str:
+    parts = []
+    for _ in range(size):
+        roll, tag = rng.random(), rng.choice(SOUP_TAGS)
+        if roll < 0.35:
+            parts.append(f'<a href="/wiki/Link_{rng.randint(0, 9)}">' if tag == "a" else f"<{tag}>")
+        elif roll < 0.6:
+            parts.append(f"</{tag}>")
+        else:
+            parts.append(rng.choice(["alpha", "beta", "gamma delta"]))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("page", PAGES, ids=lambda page: page.name)
+@pytest.mark.parametrize("chunk_size", [7, 1024, 1 << 20])
+def test_backends_agree_on_fixture_pages(page, chunk_size):
+    html = page.read_text(encoding="utf-8")
+
+    results = {backend: extract(backend, html, chunk_size) for backend in PARSER_BACKENDS}
+
+    assert results["lxml"] == results["html.parser"]
+    assert results["lxml"]["title"]
+    assert results["lxml"]["links"]
+
+
+def test_unclosed_blocks_are_separate_paragraphs():
+    html = (Path(__file__).parent / "fixtures" / "pages" / "unclosed_tags.html").read_bytes()
+
+    for backend in PARSER_BACKENDS:
+        paragraphs = extract_page(html, backend=backend)['content'].split("\n\n")
+        assert paragraphs[:4] == [
+            "An unclosed paragraph with a link",
+            "Another unclosed paragraph, then a list",
+            "first item with a link",
+            "second item",
+        ]
+        assert PARAGRAPH_BREAK not in "".join(paragraphs)
+
+
+def test_backends_agree_on_tag_soup():
+    rng = random.Random(6)
+    for _ in range(500):
+        html = (
+            '<html><body><h1 id="firstHeading">Soup</h1>'
+            f'<div id="bodyContent">{tag_soup(rng, rng.randint(1, 25))}</div>'
+            "<p>outside</p></body></html>"
+        )
+        assert extract("lxml", html, len(html)) == extract("html.parser", html, len(html)), html
+
+
+@pytest.mark.parametrize("backend", list(PARSER_BACKENDS))
+def test_fragments_stop_growing_at_the_content_cap(backend):
+    html = '<div id="bodyContent">' + "<p>text</p>" * 10_000 + "</div>"
+
+    parser = PARSER_BACKENDS[backend](max_content=100)
+    parser.feed(html)
+    parser.close()
+
+    assert len(parser._content_parts) < 100
+    assert len(parser.content) == 100
+
+
+def test_a_backend_must_implement_feed_and_close():
+    class Incomplete(PageExtractor):
+        def feed(self, data: str) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
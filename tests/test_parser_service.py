@@ -0,0 +1,130 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.services.article_writer import ArticleWriteError
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.parser_service import WikipediaParser
+from tests.wiki_stub import StubWiki
+
+pytestmark = pytest.mark.anyio
+
+PAGES = {
+    "Root": ["A", "B", "C"],
+    "A": ["A1", "A2"],
+    "B": ["B1"],
+    "C": [],
+    "A1": [],
+    "A2": [],
+    "B1": [],
+}
+
+
+@pytest.fixture
+async def crawler(serve, http_session, session_maker, monkeypatch):
+    wiki = StubWiki(PAGES)
+    base_url = await serve(wiki.app())
+    monkeypatch.setattr(settings, "WIKI_BASE_URL", base_url)
+    fetcher = PoliteFetcher(http_session, requests_per_second=1000, burst=100, backoff_base=0.01)
+    parser = WikipediaParser(session_maker, http_session, max_depth=2, fan_out=5, workers=2, fetcher=fetcher)
+    return wiki, parser
+
+
+async def test_crawl_stores_the_tree(crawler, memory_store, session_maker):
+    wiki, parser = crawler
+
+    assert await parser.parse_article("Root")
+
+    assert {url for _, url in memory_store.articles} == set(PAGES)
+    assert memory_store.by_url("A1")['parent_id'] == memory_store.by_url("A")['id']
+    assert parser.stats.pages_fetched == len(PAGES)
+    assert session_maker.commits == parser.writer.flushes
+
+
+async def test_write_failure_aborts_the_crawl(crawler, memory_store):
+    wiki, parser = crawler
+    parser.writer.batch_size = 1
+    memory_store.upsert_errors = [RuntimeError("connection lost")]
+
+    with pytest.raises(ArticleWriteError):
+        await parser.parse_article("Root")
+
+    # The root could not be stored, so its children are never fetched
+    assert memory_store.articles == {}
+    assert sum(wiki.hits.values()) < len(PAGES)
+
+
+async def test_recrawl_with_larger_depth_expands_stored_pages(crawler, memory_store):
+    wiki, parser = crawler
+    parser.configure(max_depth=1)
+    assert await parser.parse_article("Root")
+    assert {url for _, url in memory_store.articles} == {"Root", "A", "B", "C"}
+    wiki.hits.clear()
+
+    parser.configure(max_depth=2)
+    assert await parser.parse_article("Root")
+
+    assert {url for _, url in memory_store.articles} == set(PAGES)
+    # Stored pages are expanded from their stored links, only the new level is fetched
+    assert set(wiki.hits) == {"A1", "A2", "B1"}
+    assert memory_store.by_url("A1")['parent_id'] == memory_store.by_url("A")['id']
+    # Stats and written rows belong to the second crawl only
+    assert parser.stats.pages_fetched == 3
+    assert parser.stats.pages_deduped == 4
+    assert parser.writer.rows_written == 3
+    assert set(parser.writer.url_ids) == set(PAGES)
+
+
+async def test_recrawl_refetches_stored_pages_for_ranking_without_storing_them(crawler, memory_store):
+    wiki, parser = crawler
+    parser.configure(max_depth=1)
+    assert await parser.parse_article("Root")
+    wiki.hits.clear()
+
+    # Stored links carry no counts or lead membership, so the pages are fetched again for their links
+    parser.configure(max_depth=2, link_strategy="frequency")
+    assert await parser.parse_article("Root")
+
+    assert {url for _, url in memory_store.articles} == set(PAGES)
+    assert set(wiki.hits) == {"Root", "A", "B", "C", "A1", "A2", "B1"}
+    assert parser.writer.rows_written == 3
+
+
+async def test_same_title_in_another_language_is_a_separate_article(crawler, memory_store):
+    wiki, parser = crawler
+    assert await parser.parse_article("Root")
+    wiki.hits.clear()
+
+    assert await parser.parse_article("https://en.wikipedia.org/wiki/Root")
+
+    # Pages stored for ru are not treated as known in en
+    assert set(wiki.hits) == set(PAGES)
+    assert {lang for lang, _ in memory_store.articles} == {"ru", "en"}
+    assert memory_store.articles[("en", "A")]['id'] != memory_store.articles[("ru", "A")]['id']
+    assert memory_store.articles[("en", "A1")]['parent_id'] == memory_store.articles[("en", "A")]['id']
+    # Edges carry the language their targets are resolved in
+    en_root = memory_store.articles[("en", "Root")]['id']
+    assert {edge['lang'] for edge in memory_store.links if edge['source_id'] == en_root} == {"en"}
+
+
+async def test_thread_executor_parses_the_stream_off_the_loop(crawler, memory_store):
+    wiki, parser = crawler
+    parser.parse_executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        assert parser._streams
+        assert await parser.parse_article("Root")
+    finally:
+        parser.parse_executor.shutdown()
+
+    assert {url for _, url in memory_store.articles} == set(PAGES)
+    assert memory_store.by_url("A")['title'] == "A"
+
+
+async def test_process_executor_reads_the_whole_body(crawler):
+    _, parser = crawler
+    parser.parse_executor = ProcessPoolExecutor(max_workers=1)
+    try:
+        assert not parser._streams
+    finally:
+        parser.parse_executor.shutdown()
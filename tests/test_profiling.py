@@ -0,0 +1,41 @@
+import marshal
+import time
+
+import pytest
+
+from wiki_parser_app.core.profiling import Profile
+
+
+def busy(seconds: float) -> None:
+    # Pure Python holds the GIL, so the sampler wakes up late, as it does under a busy event loop
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def test_sample_weights_are_measured_time():
+    profile = Profile("busy", interval=0.001)
+    profile.start()
+    busy(0.3)
+    profile.stop()
+
+    weights = profile.to_speedscope()['profiles'][0]['weights']
+
+    assert sum(weights) == pytest.approx(sum(profile.stack_time.values()))
+    assert 0.8 * profile.duration <= sum(weights) <= profile.duration
+    # A nominal interval per sample would undercount: samples arrive later than requested
+    assert profile.samples * profile.interval < sum(weights)
+
+
+def test_pstats_times_match_speedscope_weights():
+    profile = Profile("busy", interval=0.001)
+    profile.start()
+    busy(0.1)
+    profile.stop()
+
+    stats = marshal.loads(profile.to_pstats())
+
+    busy_key = next(key for key in stats if key[2] == "busy")
+    _, calls, _, cumtime, _ = stats[busy_key]
+    assert calls == sum(count for stack, count in profile.stacks.items() if busy_key in stack)
+    assert cumtime == pytest.approx(sum(seconds for stack, seconds in profile.stack_time.items() if busy_key in stack))
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from wiki_parser_app.core.rate_limit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, parse_retry_after
+
+pytestmark = pytest.mark.anyio
+
+COOLDOWN = 0.1
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(window=4, min_requests=4, error_rate=0.5, cooldown=COOLDOWN)
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for success in (True, True, False, False):
+        breaker.record(success)
+
+
+async def test_stays_closed_below_the_error_rate(breaker):
+    for success in (True, True, True, False):
+        breaker.record(success)
+
+    assert breaker.state == CLOSED
+    assert breaker.opened == 0
+
+
+async def test_opens_at_the_error_rate_and_holds_requests_for_the_cooldown(breaker):
+    trip(breaker)
+    assert breaker.state == OPEN
+    assert breaker.opened == 1
+
+    started = time.monotonic()
+    await breaker.wait()
+
+    assert time.monotonic() - started >= COOLDOWN * 0.9
+    assert breaker.state == HALF_OPEN
+
+
+async def test_half_open_lets_one_probe_through_and_closes_on_success(breaker):
+    trip(breaker)
+    await breaker.wait()  # the probe
+    waiting = asyncio.create_task(breaker.wait())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    breaker.record(True)
+
+    await asyncio.wait_for(waiting, timeout=1)
+    assert breaker.state == CLOSED
+    assert not breaker.is_open
+
+
+async def test_failed_probe_opens_the_breaker_again(breaker):
+    trip(breaker)
+    await breaker.wait()
+    waiting = asyncio.create_task(breaker.wait())
+    await asyncio.sleep(0.01)
+
+    breaker.record(False)
+
+    assert breaker.state == OPEN
+    assert breaker.opened == 2
+    started = time.monotonic()
+    await asyncio.wait_for(waiting, timeout=1)
+    # The waiting request became the next probe after a full cooldown
+    assert time.monotonic() - started >= COOLDOWN * 0.9
+    assert breaker.state == HALF_OPEN
+
+
+async def test_outcomes_while_open_are_ignored(breaker):
+    trip(breaker)
+
+    breaker.record(False)
+    breaker.record(True)
+
+    assert breaker.state == OPEN
+    assert breaker.opened == 1
+
+
+async def test_lost_probe_frees_the_slot_after_the_cooldown(breaker):
+    trip(breaker)
+    await breaker.wait()  # a probe that never records its outcome
+
+    await asyncio.wait_for(breaker.wait(), timeout=COOLDOWN * 3)
+
+    assert breaker.state == HALF_OPEN
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=120), usegmt=True)
+
+    assert parse_retry_after(when) == pytest.approx(120, abs=2)
+    assert parse_retry_after("90") == 90
+    assert parse_retry_after("-5") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
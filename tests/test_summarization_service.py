@@ -0,0 +1,234 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.models.articles import Article, Summary
+from wiki_parser_app.repositories.article_repo import ArticleRepository
+from wiki_parser_app.repositories.summary_repo import SummaryRepository
+from wiki_parser_app.services import llm_service
+from wiki_parser_app.services.article_service import ArticleService
+from wiki_parser_app.services.llm_service import SummaryService
+from wiki_parser_app.services.summarization_service import BatchSummarizer, RateLimitedSummaryService
+from tests.fake_openai import api_error
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def summary_service(fake_llm):
+    service = RateLimitedSummaryService(api_key="test")
+    yield service
+    await service.client.close()
+
+
+class CountingBucket:
+    def __init__(self):
+        self.acquired = []
+
+    async def acquire(self, amount=1.0):
+        self.acquired.append(amount)
+
+
+def make_article(content: str) -> Article:
+    article = Article(id=uuid.uuid4(), lang="ru", url=content, title=content, content=content, level=0)
+    article.summary = None
+    return article
+
+
+async def test_rate_limited_service_retries_429_and_5xx(fake_llm, summary_service):
+    fake_llm.faults = [api_error(429, retry_after="0.01"), api_error(503)]
+    service = summary_service
+
+    summary = await service.generate_summary(make_article(f"Article {uuid.uuid4()}"))
+
+    assert summary == "Summary"
+    assert service.retries == 2
+    assert len(fake_llm.requests) == 3
+
+
+async def test_client_errors_are_not_retried(fake_llm, summary_service):
+    fake_llm.faults = [api_error(400)]
+    service = summary_service
+
+    with pytest.raises(RuntimeError):
+        await service.generate_summary(make_article(f"Article {uuid.uuid4()}"))
+
+    assert len(fake_llm.requests) == 1
+
+
+async def test_every_map_reduce_call_is_charged(fake_llm, summary_service, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_MODE", "map_reduce")
+    monkeypatch.setattr(settings, "LLM_MAX_INPUT_CHARS", 1000)
+    monkeypatch.setattr(settings, "LLM_CHUNK_TOKENS", 100)
+    summary_service.requests = CountingBucket()
+    summary_service.tokens = CountingBucket()
+    paragraphs = [f"Paragraph {i} {uuid.uuid4()} " + "word " * 40 for i in range(12)]
+
+    await summary_service.generate_summary(make_article("\n\n".join(paragraphs)))
+
+    # Chunk requests plus the reduce request, each charged separately
+    assert len(fake_llm.requests) > 2
+    assert len(summary_service.requests.acquired) == len(fake_llm.requests)
+    assert len(summary_service.tokens.acquired) == len(fake_llm.requests)
+    assert all(tokens < settings.LLM_MAX_TOKENS + 1000 for tokens in summary_service.tokens.acquired)
+
+
+async def test_batch_run_excludes_only_failed_articles(fake_llm, summary_service, session_maker, monkeypatch):
+    articles = {article.id: article for article in (make_article(f"Article {i} {uuid.uuid4()}") for i in range(5))}
+    bad = next(iter(articles.values()))
+    fake_llm.fail_when = lambda messages: bad.content in messages[-1]['content']
+    summaries = {}
+    exclusions = []
+
+    async def get_unsummarized_ids(self, root_id=None, limit=100, exclude_ids=None):
+        exclusions.append(list(exclude_ids or []))
+        pending = [article_id for article_id in articles
+                   if article_id not in summaries and article_id not in (exclude_ids or [])]
+        return pending[:limit]
+
+    async def get_by_id_with_summary(self, article_id):
+        return articles[article_id]
+
+    async def get_by_content_hash(self, content_hash):
+        return None
+
+    async def create(self, article_id, content, content_hash=None):
+        summaries[article_id] = content
+        return content
+
+    monkeypatch.setattr(ArticleRepository, "get_unsummarized_ids", get_unsummarized_ids)
+    monkeypatch.setattr(ArticleRepository, "get_by_id_with_summary", get_by_id_with_summary)
+    monkeypatch.setattr(SummaryRepository, "get_by_content_hash", get_by_content_hash)
+    monkeypatch.setattr(SummaryRepository, "create", create)
+
+    llm_service = summary_service
+    summarizer = BatchSummarizer(
+        session_maker,
+        lambda session: ArticleService(
+            session, ArticleRepository(session), SummaryRepository(session), None, llm_service
+        ),
+        concurrency=2,
+        page_size=2
+    )
+
+    summarizer.start()
+    await summarizer._tasks["all"]
+
+    run = summarizer.runs["all"]
+    assert run['status'] == 'completed'
+    assert (run['summarized'], run['failed']) == (4, 1)
+    assert set(summaries) == set(articles) - {bad.id}
+    # Summarized articles drop out through the outer join, only failures are excluded
+    assert all(exclusion in ([], [bad.id]) for exclusion in exclusions)
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+async def test_exclusions_are_bound_as_one_array_parameter():
+    session = CapturingSession()
+    exclude_ids = [uuid.uuid4() for _ in range(40000)]
+
+    await ArticleRepository(session).get_unsummarized_ids(limit=10, exclude_ids=exclude_ids)
+
+    compiled = session.statements[0].compile(dialect=asyncpg.dialect())
+    # asyncpg allows at most 32767 parameters per query
+    assert len(compiled.positiontup) == 2
+    assert compiled.params['exclude_ids'] == exclude_ids
+
+
+def test_content_hash_covers_language_prompt_and_model(monkeypatch):
+    article = make_article("Same text")
+    same = make_article("Same text")
+    other_lang = make_article("Same text")
+    other_lang.lang = "en"
+
+    assert SummaryService.content_hash(article) == SummaryService.content_hash(same)
+    assert SummaryService.content_hash(article) != SummaryService.content_hash(other_lang)
+
+    before = SummaryService.content_hash(article)
+    monkeypatch.setattr(llm_service, "SUMMARY_PROMPT", "Перескажи статью {language}")
+    assert SummaryService.content_hash(article) != before
+
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "LLM_MODEL", "another-model")
+    assert SummaryService.content_hash(article) != before
+
+
+async def test_retry_after_is_honoured_beyond_backoff_max(fake_llm, summary_service, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKOFF_MAX", 0.01)
+    fake_llm.faults = [api_error(429, retry_after="0.2")]
+
+    started = time.monotonic()
+    assert await summary_service.generate_summary(make_article(f"Article {uuid.uuid4()}")) == "Summary"
+
+    assert time.monotonic() - started >= 0.2
+    assert len(fake_llm.requests) == 2
+
+
+async def test_retry_after_beyond_the_cap_is_not_retried(fake_llm, summary_service, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRY_AFTER_MAX", 60.0)
+    fake_llm.faults = [api_error(429, retry_after="3600")]
+
+    with pytest.raises(RuntimeError):
+        await summary_service.generate_summary(make_article(f"Article {uuid.uuid4()}"))
+
+    assert len(fake_llm.requests) == 1
+    assert summary_service.retries == 0
+
+
+class StoredSummaries:
+    """SummaryRepository в памяти: summary статей и вызовы create/update."""
+
+    def __init__(self):
+        self.writes = []
+
+    async def get_by_content_hash(self, content_hash):
+        return None
+
+    async def create(self, article_id, content, content_hash=None):
+        self.writes.append(("create", content_hash))
+        return content
+
+    async def update(self, summary, content, content_hash=None):
+        self.writes.append(("update", content_hash))
+        summary.content, summary.content_hash = content, content_hash
+        return content
+
+
+async def test_llm_is_called_again_only_when_the_content_changes(fake_llm, summary_service):
+    summaries = StoredSummaries()
+    service = ArticleService(None, None, summaries, None, summary_service)
+    article = make_article(f"Article {uuid.uuid4()}")
+
+    assert await service.summarize_article(article)
+    assert len(fake_llm.requests) == 1
+    [(_, content_hash)] = summaries.writes
+    article.summary = Summary(article_id=article.id, content="Summary", content_hash=content_hash)
+
+    # Unchanged content: the stored summary is up to date, no LLM call and no write
+    assert await service.summarize_article(article)
+    assert len(fake_llm.requests) == 1
+    assert len(summaries.writes) == 1
+
+    article.content = f"Edited article {uuid.uuid4()}"
+    assert await service.summarize_article(article)
+
+    assert len(fake_llm.requests) == 2
+    assert summaries.writes[-1] == ("update", SummaryService.content_hash(article))
+    assert article.summary.content_hash != content_hash
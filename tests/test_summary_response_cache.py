@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from wiki_parser_app.core.cache import MemoryCacheBackend
+from wiki_parser_app.repositories.summary_repo import SummaryRepository
+from wiki_parser_app.services import summary_response_cache as cache_module
+from wiki_parser_app.services.summary_response_cache import SummaryResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SummaryResponseCache(shared=MemoryCacheBackend())
+    monkeypatch.setattr(cache_module, "summary_response_cache", cache)
+    return cache
+
+
+async def test_summary_is_invalidated_only_after_commit(cache):
+    article_id = uuid.uuid4()
+    await cache.set("ru", "Статья", article_id, "old summary")
+
+    async with AsyncSession() as session:
+        SummaryRepository(session)._mark_changed(article_id)
+        # Until the new row is committed, readers still see the old one
+        assert (await cache.get("ru", "Статья"))['summary'] == "old summary"
+
+        await session.commit()
+        await asyncio.sleep(0)
+
+    assert await cache.get("ru", "Статья") is None
+    assert await cache.shared.get(cache._summary_key(article_id)) is None
+
+
+async def test_rolled_back_change_is_not_invalidated(cache):
+    article_id = uuid.uuid4()
+    await cache.set("ru", "Статья", article_id, "summary")
+
+    async with AsyncSession() as session:
+        # The repository flushes first, so the transaction has already begun
+        await session.begin()
+        SummaryRepository(session)._mark_changed(article_id)
+        await session.rollback()
+        await session.commit()
+
+    assert (await cache.get("ru", "Статья"))['summary'] == "summary"
+
+
+async def test_row_read_before_invalidation_is_not_cached(cache):
+    article_id = uuid.uuid4()
+    generation = cache.generation
+    # A GET read the old row from the database, then the new summary was committed
+    cache.invalidate([article_id])
+
+    entry = await cache.set("ru", "Статья", article_id, "old summary", generation=generation)
+
+    assert entry['summary'] == "old summary"
+    assert await cache.get("ru", "Статья") is None
@@ -0,0 +1,158 @@
+"""
+GET /summary/stream на настоящем PostgreSQL (TEST_DATABASE_URL, как в
+test_query_counts) и FakeOpenAI вместо LLM.
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import List, Tuple
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from wiki_parser_app.db.database import Base
+from wiki_parser_app.dependencies.repository_dep import get_session_with_commit
+from wiki_parser_app.dependencies.summary_dep import get_summary_streamer
+from wiki_parser_app.main import create_app
+from wiki_parser_app.models.articles import Article, Summary
+from wiki_parser_app.repositories.summary_repo import SummaryRepository
+from wiki_parser_app.services import summary_stream
+from wiki_parser_app.services.llm_service import SummaryService
+from wiki_parser_app.services.summary_cache import SummaryCache
+from wiki_parser_app.services.summary_stream import SummaryStreamer
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def db_session_maker():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db_session_maker, fake_llm, monkeypatch):
+    fake_llm.reply = lambda messages: "A short summary of the article"
+    monkeypatch.setattr(summary_stream, "summary_cache", SummaryCache())
+    llm_service = SummaryService(api_key="test")
+
+    async def session_with_commit():
+        async with db_session_maker() as session:
+            yield session
+            await session.commit()
+
+    app = create_app()
+    app.dependency_overrides[get_session_with_commit] = session_with_commit
+    app.dependency_overrides[get_summary_streamer] = lambda: SummaryStreamer(llm_service, db_session_maker)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await llm_service.client.close()
+
+
+async def add_article(db_session_maker, content: str) -> Article:
+    async with db_session_maker() as session:
+        article = Article(title="A", url=f"A_{uuid.uuid4().hex}", content=content, parsed=True, level=0)
+        session.add(article)
+        await session.commit()
+        return article
+
+
+async def stream(client: httpx.AsyncClient, article: Article) -> List[Tuple[str, dict]]:
+    response = await client.get("/summary/stream", params={"url": article.url})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def stored_summaries(db_session_maker, article: Article) -> List[Summary]:
+    async with db_session_maker() as session:
+        result = await session.execute(select(Summary).where(Summary.article_id == article.id))
+        return list(result.scalars())
+
+
+async def test_stream_sends_deltas_and_stores_the_summary(client, db_session_maker, fake_llm):
+    article = await add_article(db_session_maker, "Article text")
+
+    events = await stream(client, article)
+
+    assert [event for event, _ in events] == ["delta"] * 6 + ["done"]
+    assert "".join(data['text'] for event, data in events if event == "delta") == "A short summary of the article"
+    assert events[-1][1] == {"summary": "A short summary of the article", "cached": False}
+    [summary] = await stored_summaries(db_session_maker, article)
+    assert summary.content == "A short summary of the article"
+    assert summary.content_hash == SummaryService.content_hash(article)
+
+
+async def test_stored_summary_is_sent_without_calling_the_llm(client, db_session_maker, fake_llm):
+    article = await add_article(db_session_maker, "Article text")
+    await stream(client, article)
+
+    events = await stream(client, article)
+
+    assert events == [("done", {"summary": "A short summary of the article", "cached": True})]
+    assert len(fake_llm.requests) == 1
+
+
+async def test_summary_of_the_same_text_is_reused(client, db_session_maker, fake_llm):
+    first = await add_article(db_session_maker, "Shared text")
+    second = await add_article(db_session_maker, "Shared text")
+    await stream(client, first)
+
+    events = await stream(client, second)
+
+    assert events == [("done", {"summary": "A short summary of the article", "cached": True})]
+    assert len(fake_llm.requests) == 1
+    [summary] = await stored_summaries(db_session_maker, second)
+    assert summary.content_hash == SummaryService.content_hash(second)
+
+
+async def test_concurrent_streams_store_one_summary(client, db_session_maker, fake_llm):
+    fake_llm.stream_delay = 0.01
+    article = await add_article(db_session_maker, "Article text")
+
+    results = await asyncio.gather(stream(client, article), stream(client, article))
+
+    assert all(events[-1][0] == "done" for events in results)
+    assert len(await stored_summaries(db_session_maker, article)) == 1
+    async with db_session_maker() as session:
+        assert await session.scalar(select(func.count()).select_from(Summary)) == 1
+
+
+async def test_missing_article_is_404(client):
+    response = await client.get("/summary/stream", params={"url": "Missing"})
+
+    assert response.status_code == 404
+
+
+async def test_upsert_waits_for_a_concurrent_insert_instead_of_failing(db_session_maker):
+    article = await add_article(db_session_maker, "Article text")
+
+    async with db_session_maker() as first, db_session_maker() as second:
+        await SummaryRepository(first).upsert(article.id, "first", "hash-1")
+        # Blocks on the uncommitted row of the first transaction
+        pending = asyncio.create_task(SummaryRepository(second).upsert(article.id, "second", "hash-2"))
+        await asyncio.sleep(0.1)
+        assert not pending.done()
+        await first.commit()
+        await pending
+        await second.commit()
+
+    [summary] = await stored_summaries(db_session_maker, article)
+    assert (summary.content, summary.content_hash) == ("second", "hash-2")
@@ -0,0 +1,38 @@
+import pytest
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.services.parser_service import normalize_title, split_wiki_url
+
+
+@pytest.mark.parametrize("url, title", [
+    ("Python", "Python"),
+    ("Python (programming language)", "Python_(programming_language)"),
+    ("/wiki/%D0%AF%D0%B7%D1%8B%D0%BA", "Язык"),
+    ("https://ru.wikipedia.org/wiki/Python#История", "Python"),
+    ("https://en.wikipedia.org/wiki/Python?action=history", "Python"),
+    ("  Python  ", "Python"),
+])
+def test_normalize_title(url, title):
+    assert normalize_title(url) == title
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://en.wikipedia.org/wiki/Python", ("en", "Python")),
+    ("https://de.m.wikipedia.org/wiki/Python", ("de", "Python")),
+    ("http://zh-yue.wikipedia.org/wiki/Python", ("zh-yue", "Python")),
+    (" https://fr.wikipedia.org/wiki/Python_(langage) ", ("fr", "Python_(langage)")),
+])
+def test_split_wiki_url_takes_the_language_from_the_host(url, expected):
+    assert split_wiki_url(url) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "Python",
+    "/wiki/Python",
+    "https://example.org/wiki/Python",
+    "https://wikipedia.org/wiki/Python",
+])
+def test_split_wiki_url_falls_back_to_the_default_language(url, monkeypatch):
+    monkeypatch.setattr(settings, "WIKI_DEFAULT_LANG", "kk")
+
+    assert split_wiki_url(url) == ("kk", "Python")
@@ -0,0 +1,69 @@
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from aiohttp import web
+
+# Builds the response to a request instead of the page
+Fault = Callable[[web.Request], web.StreamResponse]
+
+
+def render_page(title: str, links: List[str], paragraphs: int = 3) -> str:
+    """HTML-страница в разметке Wikipedia: заголовок, абзацы текста и ссылки."""
+    anchors = " ".join(f'<a href="/wiki/{quote(link)}">{link}</a>' for link in links)
+    body = "".join(f"<p>Paragraph {i} of {title}. {anchors}</p>" for i in range(paragraphs))
+    return (
+        f'<html><head><title>{title}</title></head><body>'
+        f'<h1 id="firstHeading">{title}</h1>'
+        f'<div id="bodyContent"><div id="mw-content-text"><div class="mw-parser-output">{body}</div></div></div>'
+        f'</body></html>'
+    )
+
+
+class StubWiki:
+    """
+    Локальная замена Wikipedia для тестов: отдаёт /wiki/{title} по словарю
+    title -> ссылки и позволяет подменять ответы (fault injection).
+    """
+
+    def __init__(self, pages: Dict[str, List[str]]):
+        self.pages = pages
+        self.hits: Counter = Counter()
+        # title -> time.monotonic() of every request
+        self.arrivals: Dict[str, List[float]] = defaultdict(list)
+        # title -> responses returned by the next requests, one per request
+        self.faults: Dict[str, List[Fault]] = {}
+
+    @staticmethod
+    def status(code: int, headers: Optional[Dict[str, str]] = None) -> Fault:
+        return lambda request: web.Response(status=code, headers=headers)
+
+    @staticmethod
+    def disconnect() -> Fault:
+        """Обрывает соединение, не отправив ответ."""
+        def respond(request: web.Request) -> web.StreamResponse:
+            request.transport.close()
+            return web.Response()
+        return respond
+
+    def fail(self, title: str, *responses: Fault) -> None:
+        self.faults.setdefault(title, []).extend(responses)
+
+    async def handle_page(self, request: web.Request) -> web.StreamResponse:
+        title = request.match_info['title']
+        self.hits[title] += 1
+        self.arrivals[title].append(time.monotonic())
+        if self.faults.get(title):
+            return self.faults[title].pop(0)(request)
+        links = self.pages.get(title)
+        if links is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=render_page(title, links), content_type='text/html')
+
+    def app(self, extra_routes: Optional[List[web.RouteDef]] = None) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/wiki/{title}', self.handle_page)
+        if extra_routes:
+            app.add_routes(extra_routes)
+        return app
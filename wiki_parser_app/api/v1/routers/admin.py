@@ -0,0 +1,58 @@
+import json
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+
+from wiki_parser_app.core.profiling import Profile, profile_store
+from wiki_parser_app.dependencies.admin_dep import require_admin
+
+router = APIRouter(prefix='/admin', dependencies=[Depends(require_admin)])
+
+
+def _get_profile(profile_id: str) -> Profile:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get('/profiles')
+async def list_profiles():
+    """Recently recorded profiles, newest first"""
+    return [profile.summary() for profile in profile_store.list()]
+
+
+@router.get('/profiles/{profile_id}')
+async def get_profile(profile_id: str):
+    """Profile summary with async span timings (fetch, throttle, parse, db_flush, llm, ...)"""
+    return _get_profile(profile_id).summary()
+
+
+@router.get('/profiles/{profile_id}/download')
+async def download_profile(
+        profile_id: str,
+        format: Literal['speedscope', 'pstats'] = Query('speedscope')
+):
+    """
+    Download the sampled CPU profile
+
+    Parameters:
+    - format: "speedscope" (open at https://www.speedscope.app) or
+      "pstats" (python -m pstats <file>, snakeviz)
+    """
+    profile = _get_profile(profile_id)
+    if format == 'pstats':
+        content = profile.to_pstats()
+        media_type = 'application/octet-stream'
+        filename = f"{profile.id}.pstats"
+    else:
+        content = json.dumps(profile.to_speedscope())
+        media_type = 'application/json'
+        filename = f"{profile.id}.speedscope.json"
+
+    return Response(
+        content,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
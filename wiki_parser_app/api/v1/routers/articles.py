@@ -0,0 +1,106 @@
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from wiki_parser_app.dependencies.article_sevice_dep import get_article_repo, get_link_repo
+from wiki_parser_app.repositories.article_repo import ArticleRepository, DEFAULT_TREE_FIELDS, TREE_FIELDS
+from wiki_parser_app.repositories.link_repo import LinkRepository
+from wiki_parser_app.schemas.article import (
+    ArticleLinkSchema,
+    ArticlePathSchema,
+    ArticleRefSchema,
+    ArticleTreeNodeSchema,
+    ArticleTreeSchema
+)
+
+router = APIRouter()
+
+
+@router.get(
+    '/articles/{article_id}/tree',
+    response_model=ArticleTreeSchema,
+    response_model_exclude_unset=True
+)
+async def get_article_tree(
+        article_id: UUID,
+        max_depth: int = Query(5, ge=0, le=50),
+        limit: int = Query(500, ge=1, le=5000),
+        offset: int = Query(0, ge=0),
+        fields: str = Query(",".join(DEFAULT_TREE_FIELDS)),
+        article_repo: ArticleRepository = Depends(get_article_repo)
+):
+    """
+    Return the crawl tree rooted at the article as a flat list of nodes
+
+    Parameters:
+    - max_depth: how many levels below the root to include
+    - limit, offset: pagination over nodes in breadth-first order
+    - fields: comma-separated columns to return (content is excluded by default)
+    """
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = set(requested) - set(TREE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    rows = await article_repo.get_tree(article_id, max_depth, requested, limit, offset)
+    if not rows and offset == 0:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    return ArticleTreeSchema(
+        root_id=article_id,
+        items=[ArticleTreeNodeSchema(**row) for row in rows],
+        next_offset=offset + limit if len(rows) == limit else None
+    )
+
+
+@router.get('/articles/path', response_model=ArticlePathSchema)
+async def get_article_path(
+        source_id: UUID,
+        target_id: UUID,
+        max_depth: int = Query(6, ge=1, le=10),
+        link_repo: LinkRepository = Depends(get_link_repo)
+):
+    """
+    Shortest chain of links from one stored article to another
+
+    Breadth-first search with one query per level plus one that loads the
+    path articles: a path of length n costs n + 1 queries, at most max_depth + 1.
+    """
+    path = await link_repo.shortest_path(source_id, target_id, max_depth)
+    if not path:
+        raise HTTPException(status_code=404, detail="Path not found")
+
+    return ArticlePathSchema(
+        length=len(path) - 1,
+        articles=[ArticleRefSchema(**article) for article in path]
+    )
+
+
+@router.get('/articles/{article_id}/links/out', response_model=List[ArticleLinkSchema])
+async def get_article_out_links(
+        article_id: UUID,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+        link_repo: LinkRepository = Depends(get_link_repo)
+):
+    """Links found on the article page, in document order"""
+    links = await link_repo.get_out_links(article_id, limit, offset)
+    return [ArticleLinkSchema(**link) for link in links]
+
+
+@router.get('/articles/{article_id}/links/in', response_model=List[ArticleLinkSchema])
+async def get_article_in_links(
+        article_id: UUID,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+        article_repo: ArticleRepository = Depends(get_article_repo),
+        link_repo: LinkRepository = Depends(get_link_repo)
+):
+    """Stored articles that link to this one ("what links here")"""
+    links = await link_repo.get_in_links(article_id, limit, offset)
+    # An empty page is the only case that needs to tell "no links" from "no article"
+    if not links and not await article_repo.get_ref(article_id):
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    return [ArticleLinkSchema(**link) for link in links]
@@ -0,0 +1,21 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from wiki_parser_app.dependencies.job_dep import get_job_repo
+from wiki_parser_app.repositories.job_repo import JobRepository
+from wiki_parser_app.schemas.job import JobSchema
+
+router = APIRouter()
+
+
+@router.get('/jobs/{job_id}', response_model=JobSchema)
+async def get_job(
+        job_id: UUID,
+        job_repo: JobRepository = Depends(get_job_repo)
+):
+    job = await job_repo.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobSchema.model_validate(job)
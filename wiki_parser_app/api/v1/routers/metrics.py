@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from wiki_parser_app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    LOOP_LAG_P99,
+    REGISTRY
+)
+from wiki_parser_app.db.database import engine
+from wiki_parser_app.db.instrumentation import db_stats, pool_status
+from wiki_parser_app.services.summary_cache import summary_cache
+from wiki_parser_app.services.summary_response_cache import summary_response_cache
+
+router = APIRouter()
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def get_prometheus_metrics(request: Request):
+    """Метрики пайплайна обхода и суммаризации в текстовом формате Prometheus."""
+    LOOP_LAG_P99.set(request.app.state.loop_monitor.percentile(0.99))
+    DB_POOL_CHECKED_OUT.set(engine.pool.checkedout())
+    return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@router.get('/metrics/loop')
+async def get_loop_lag(request: Request):
+    """Задержка event loop в секундах за последнее окно измерений."""
+    return request.app.state.loop_monitor.snapshot()
+
+
+@router.get('/metrics/fetch')
+async def get_fetch_stats(request: Request):
+    """Повторы, ожидание лимитов и срабатывания circuit breaker при загрузке страниц."""
+    return request.app.state.fetcher.stats()
+
+
+@router.get('/metrics/page-cache')
+async def get_page_cache_stats(request: Request):
+    """Попадания, условные запросы и вытеснения дискового кэша страниц."""
+    page_cache = request.app.state.page_cache
+    return page_cache.stats() if page_cache is not None else {'enabled': False}
+
+
+@router.get('/metrics/summary-cache')
+async def get_summary_cache_stats():
+    """Попадания и промахи кэша summary."""
+    return summary_cache.stats()
+
+
+@router.get('/metrics/summary-responses')
+async def get_summary_response_cache_stats():
+    """Попадания, промахи и инвалидации кэша ответов GET /summary."""
+    return summary_response_cache.stats()
+
+
+@router.get('/metrics/db')
+async def get_db_stats():
+    """Состояние пула соединений, ожидание соединений и медленные запросы."""
+    return {'pool': pool_status(engine), **db_stats.as_dict()}
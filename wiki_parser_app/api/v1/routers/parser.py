@@ -1,49 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from loguru import logger
 
-from wiki_parser_app.dependencies.article_sevice_dep import get_article_service
+from wiki_parser_app.dependencies.job_dep import get_job_manager
 
-from wiki_parser_app.schemas.article import ParseRequestSchema, ArticleResponseSchema
-from wiki_parser_app.services.article_service import ArticleService
+from wiki_parser_app.schemas.article import ParseRequestSchema
+from wiki_parser_app.schemas.job import JobSchema
+from wiki_parser_app.services.job_service import JobManager, JobQueueFull
 
 
 router = APIRouter()
 
 
-@router.post("/parse", response_model=ArticleResponseSchema)
+@router.post("/parse", response_model=JobSchema, status_code=202)
 async def parse_article(
         request: ParseRequestSchema,
-        article_service: ArticleService = Depends(get_article_service)
+        profile: bool = Query(False),
+        x_profile: bool = Header(False),
+        job_manager: JobManager = Depends(get_job_manager)
 ):
     """
-    Parse a Wikipedia article and generate summary
+    Enqueue parsing of a Wikipedia article and summary generation
 
     Parameters:
     - url: Wikipedia article URL or title (e.g. "Harry_Potter")
+    - max_depth: Crawl depth, 0 parses only the article itself (optional)
+    - fan_out: Child links followed from each page (optional)
+    - max_pages: Total page budget of the crawl (optional)
+    - link_strategy: How child links are chosen: "order", "frequency" or "lead" (optional)
+    - profile (query) or X-Profile (header): Record a profile of the job,
+      available from GET /admin/profiles/{job id} when the job finishes
 
     Returns:
-    - Parsed article with summary
+    - Created job; poll GET /jobs/{id} for its progress
     """
     try:
-        article = await article_service.parse_and_save_article(request.url)
-        if not article:
-            raise HTTPException(
-                status_code=404,
-                detail="Article not found or could not be parsed"
-            )
-
-        return ArticleResponseSchema(
-            id=article.id,
-            url=article.url,
-            title=article.title,
-            summary=article.summary.summary if article.summary else None
+        job = await job_manager.submit(
+            request.url,
+            request.model_dump(exclude={'url'}, exclude_none=True),
+            profile=profile or x_profile
         )
+        return JobSchema.model_validate(job)
 
-    except HTTPException:
-        raise
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"API error: {str(e)}")
         raise HTTPException(
             status_code=500,
-            detail=f"Error processing article: {str(e)}"
-        )
\ No newline at end of file
+            detail=f"Error creating parse job: {str(e)}"
+        )
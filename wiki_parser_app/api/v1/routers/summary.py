@@ -1,22 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
 from wiki_parser_app.dependencies.article_sevice_dep import get_article_repo
+from wiki_parser_app.dependencies.summary_dep import get_batch_summarizer, get_summary_streamer
 from wiki_parser_app.repositories.article_repo import ArticleRepository
-from wiki_parser_app.schemas.article import ArticleSummarySchema
+from wiki_parser_app.schemas.article import (
+    ArticleSummarySchema,
+    SummaryBatchRequestSchema,
+    SummaryBatchStatusSchema
+)
+from wiki_parser_app.services.parser_service import split_wiki_url
+from wiki_parser_app.services.summarization_service import BatchSummarizer
+from wiki_parser_app.services.summary_response_cache import summary_response_cache
+from wiki_parser_app.services.summary_stream import SummaryStreamer
 
 router = APIRouter()
 
 
-@router.get('/summary', response_model=ArticleSummarySchema)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+
+@router.get('/summary', response_model=ArticleSummarySchema, responses={304: {"description": "Not Modified"}})
 async def get_summary(
         url: str,
+        response: Response,
+        if_none_match: Optional[str] = Header(default=None),
         article_repo: ArticleRepository = Depends(get_article_repo)
 ):
-    article = await article_repo.get_by_url(url)
-    if not article or not article.summary:
-        raise HTTPException(status_code=404, detail="Summary not found")
+    """
+    Get the stored summary of an article
+
+    Served from a read-through cache. The response carries an ETag;
+    send it back in If-None-Match to get 304 while the summary is unchanged.
+    """
+    lang, title = split_wiki_url(url)
+    generation = summary_response_cache.generation
+    entry = await summary_response_cache.get(lang, title)
+    if entry is None:
+        row = await article_repo.get_summary_by_url(title, lang)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        entry = await summary_response_cache.set(lang, title, *row, generation=generation)
+
+    headers = {'ETag': entry['etag'], 'Cache-Control': 'no-cache'}
+    if _etag_matches(if_none_match, entry['etag']):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return ArticleSummarySchema(id=entry['id'], summary=entry['summary'])
+
+
+@router.get('/summary/stream')
+async def stream_summary(
+        url: str,
+        article_repo: ArticleRepository = Depends(get_article_repo),
+        streamer: SummaryStreamer = Depends(get_summary_streamer)
+):
+    """
+    Stream the article summary as Server-Sent Events
+
+    Emits "delta" events with text fragments as the LLM produces them and a
+    final "done" event with the full summary; an up-to-date stored summary,
+    or one already generated for the same text, is sent as a single "done"
+    event right away.
+    """
+    lang, title = split_wiki_url(url)
+    article = await article_repo.get_with_summary(title, lang)
+    if not article or not article.content:
+        raise HTTPException(status_code=404, detail="Article not found")
 
-    return ArticleSummarySchema(
-        article_id=article.id,
-        content=article.summary.content
+    return StreamingResponse(
+        streamer.events(article),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
+
+
+@router.post('/summary/batch', response_model=SummaryBatchStatusSchema, status_code=202)
+async def start_summary_batch(
+        request: SummaryBatchRequestSchema,
+        batch_summarizer: BatchSummarizer = Depends(get_batch_summarizer)
+):
+    """
+    Start generating summaries for every article of a crawl tree
+    (article_id is its root) or, without article_id, for all articles without one
+    """
+    run_id = batch_summarizer.start(request.article_id)
+    return SummaryBatchStatusSchema(run_id=run_id, **batch_summarizer.runs[run_id])
+
+
+@router.get('/summary/batch/{run_id}', response_model=SummaryBatchStatusSchema)
+async def get_summary_batch(
+        run_id: str,
+        batch_summarizer: BatchSummarizer = Depends(get_batch_summarizer)
+):
+    run = batch_summarizer.runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Batch run not found")
+
+    return SummaryBatchStatusSchema(run_id=run_id, **run)
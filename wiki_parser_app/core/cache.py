@@ -0,0 +1,115 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Protocol
+
+from loguru import logger
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти процесса с ограничением по числу записей и времени жизни.
+    Ведёт счётчики попаданий и промахов.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(Protocol):
+    """Общий (разделяемый между процессами) кэш: значения должны сериализоваться в JSON."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """
+    CacheBackend в памяти процесса. Заменяет общий кэш там, где Redis
+    не нужен или недоступен, например в тестах и при одном воркере.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache = TTLCache(maxsize, ttl=0.0)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class RedisCacheBackend:
+    """CacheBackend поверх Redis: кэш общий для всех воркеров приложения."""
+
+    def __init__(self, url: str):
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._client.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+
+def create_cache_backend(name: Optional[str], url: Optional[str] = None) -> Optional[CacheBackend]:
+    """
+    Создаёт общий кэш по имени: None — без общего кэша, "memory" — кэш
+    в памяти процесса, "redis" — Redis по адресу url (нужен пакет redis).
+    """
+    if not name:
+        return None
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "redis":
+        if redis is None or not url:
+            logger.warning("Redis cache backend needs the redis package and REDIS_URL, shared cache is disabled")
+            return None
+        return RedisCacheBackend(url)
+    logger.warning(f"Unknown cache backend {name!r}, shared cache is disabled")
+    return None
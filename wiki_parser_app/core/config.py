@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Extra
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,8 +12,134 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
 
+    # Пул соединений с PostgreSQL
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Кэш подготовленных выражений asyncpg; 0 — для работы через pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SLOW_QUERY_THRESHOLD: float = 0.5
+
     OPENAI_API_KEY: str
     LLM_PROVIDER: str = "deepseek"
+    LLM_BASE_URL: str = "https://api.deepseek.com"
+    LLM_MODEL: str = "deepseek-chat"
+    LLM_MAX_TOKENS: int = 512
+    LLM_MAX_INPUT_CHARS: int = 8000
+
+    # Длинные статьи: "map_reduce" пересказывает фрагменты и объединяет их, "truncate" обрезает текст
+    SUMMARY_MODE: str = "map_reduce"
+    LLM_CHUNK_TOKENS: int = 2000
+    LLM_CHUNK_CONCURRENCY: int = 4
+    SUMMARY_CHUNK_CACHE_SIZE: int = 4096
+    SUMMARY_CHUNK_CACHE_TTL: float = 7 * 24 * 3600.0
+
+    # Ограничения и повторы запросов к LLM при пакетной генерации summary
+    LLM_REQUESTS_PER_MINUTE: int = 60
+    LLM_TOKENS_PER_MINUTE: int = 100000
+    LLM_CHARS_PER_TOKEN: float = 3.0
+    LLM_MAX_RETRIES: int = 5
+    LLM_BACKOFF_BASE: float = 1.0
+    LLM_BACKOFF_MAX: float = 60.0
+    # Как FETCH_RETRY_AFTER_MAX: Retry-After соблюдается как есть; если он дольше, запрос не повторяется
+    LLM_RETRY_AFTER_MAX: float = 600.0
+    SUMMARY_BATCH_CONCURRENCY: int = 4
+    SUMMARY_BATCH_PAGE_SIZE: int = 100
+
+    # Кэш summary по хэшу входного текста
+    SUMMARY_CACHE_SIZE: int = 1024
+    SUMMARY_CACHE_TTL: float = 3600.0
+
+    # Кэш ответов GET /summary: LRU в памяти процесса и необязательный общий
+    # кэш ("memory" или "redis"); при общем кэше локальный TTL стоит держать
+    # коротким, так как инвалидация других процессов проходит только через него
+    SUMMARY_RESPONSE_CACHE_SIZE: int = 4096
+    SUMMARY_RESPONSE_CACHE_TTL: float = 300.0
+    SUMMARY_RESPONSE_SHARED_TTL: float = 3600.0
+    SUMMARY_RESPONSE_CACHE_BACKEND: Optional[str] = None
+    REDIS_URL: Optional[str] = None
+
+    # HTTP-клиент краулера
+    HTTP_USER_AGENT: str = "WikiParser/1.0 (https://github.com/valyaplotnikova/WikiParser)"
+    HTTP_LIMIT: int = 100
+    HTTP_LIMIT_PER_HOST: int = 10
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0
+    HTTP_TOTAL_TIMEOUT: float = 60.0
+    # Отдельная сессия с собственным пулом соединений на каждый хост
+    HTTP_SESSION_PER_HOST: bool = True
+
+    # Вежливый обход: лимит запросов на хост, повторы и circuit breaker
+    FETCH_REQUESTS_PER_SECOND: float = 10.0
+    FETCH_BURST: int = 10
+    FETCH_MAX_RETRIES: int = 4
+    FETCH_BACKOFF_BASE: float = 0.5
+    FETCH_BACKOFF_MAX: float = 30.0
+    # Retry-After сервера соблюдается как есть; если он дольше, запрос не повторяется
+    FETCH_RETRY_AFTER_MAX: float = 600.0
+    FETCH_BREAKER_WINDOW: int = 50
+    FETCH_BREAKER_MIN_REQUESTS: int = 10
+    FETCH_BREAKER_ERROR_RATE: float = 0.5
+    FETCH_BREAKER_COOLDOWN: float = 30.0
+
+    # Разделы Wikipedia: язык по умолчанию для заголовков без хоста и шаблон адреса раздела
+    WIKI_DEFAULT_LANG: str = "ru"
+    WIKI_BASE_URL: str = "https://{lang}.wikipedia.org"
+
+    # Планировщик обхода
+    CRAWL_WORKERS: int = 10
+    CRAWL_MAX_DEPTH: int = 5
+    CRAWL_MAX_PAGES: int = 1000
+    CRAWL_FAN_OUT: int = 5
+    CRAWL_LINK_STRATEGY: str = "order"
+    # Источник страниц: "html" (страницы /wiki/) или "api" (MediaWiki Action API)
+    CRAWL_FETCH_BACKEND: str = "html"
+    MEDIAWIKI_API_BATCH_SIZE: int = 50
+    CRAWL_DB_BATCH_SIZE: int = 200
+    CRAWL_DB_FLUSH_INTERVAL: float = 1.0
+    CRAWL_DB_DEADLOCK_RETRIES: int = 3
+    CRAWL_FRESHNESS_HOURS: Optional[float] = None
+    CRAWL_STORE_LINKS: bool = True
+    CRAWL_MAX_LINKS_PER_PAGE: int = 500
+    CRAWL_LINK_INSERT_CHUNK: int = 5000
+
+    # Извлечение текста из HTML
+    PARSER_MAX_CONTENT: int = 50000
+    PARSER_CHUNK_SIZE: int = 64 * 1024
+    PARSER_BACKEND: str = "auto"
+    PARSER_MAX_BYTES: int = 2 * 1024 * 1024
+
+    # Пул для разбора HTML вне event loop: "thread", "process" или "inline".
+    # "thread" и "inline" разбирают страницу потоком и перестают читать ответ на лимитах,
+    # "process" читает тело целиком; "inline" держит event loop на время разбора
+    # (сравнение — python -m benchmarks.bench_loop_lag)
+    PARSE_EXECUTOR: str = "thread"
+    PARSE_WORKERS: int = 2
+
+    # Дисковый кэш страниц (None — кэш выключен)
+    PAGE_CACHE_DIR: Optional[str] = None
+    PAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PAGE_CACHE_OFFLINE: bool = False
+
+    # Фоновые задания на парсинг
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_SIZE: int = 100
+    JOB_PROGRESS_INTERVAL: float = 2.0
+
+    # Мониторинг задержки event loop
+    LOOP_LAG_INTERVAL: float = 0.1
+    LOOP_LAG_WINDOW: int = 600
+
+    # Профилирование обходов: глобально или по флагу запроса (заголовок X-Profile, ?profile=1)
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_INTERVAL: float = 0.005
+    PROFILE_KEEP: int = 20
+    # Токен для /admin/*, передаётся в заголовке X-Admin-Token (None — /admin/* отвечают 403)
+    ADMIN_TOKEN: Optional[str] = None
 
     model_config = SettingsConfigDict(
         env_file=(".env", ".test.env"),
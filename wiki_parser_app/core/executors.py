@@ -0,0 +1,28 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from loguru import logger
+
+from wiki_parser_app.core.config import settings
+
+
+def create_parse_executor() -> Optional[Executor]:
+    """
+    Создаёт пул для разбора HTML согласно настройке PARSE_EXECUTOR.
+
+    "thread" разбирает страницу потоком по мере чтения из сокета и перестаёт
+    читать её на лимитах, не занимая event loop; с html.parser, который держит
+    GIL, разбор всё же конкурирует с event loop за GIL. "process" полностью
+    снимает разбор с event loop, но читает тело целиком (до PARSER_MAX_BYTES).
+    "inline" разбирает потоком прямо в event loop и задерживает остальные
+    корутины на время разбора каждого фрагмента.
+
+    :return: Пул исполнителей или None для режима "inline"
+    """
+    if settings.PARSE_EXECUTOR == "process":
+        return ProcessPoolExecutor(max_workers=settings.PARSE_WORKERS)
+    if settings.PARSE_EXECUTOR == "thread":
+        return ThreadPoolExecutor(max_workers=settings.PARSE_WORKERS, thread_name_prefix="html-parse")
+    if settings.PARSE_EXECUTOR != "inline":
+        logger.warning(f"Unknown PARSE_EXECUTOR {settings.PARSE_EXECUTOR!r}, parsing inline")
+    return None
@@ -0,0 +1,58 @@
+from typing import Dict, Optional, Sequence
+
+import aiohttp
+
+from wiki_parser_app.core.config import settings
+
+
+def create_http_session(trace_configs: Optional[Sequence[aiohttp.TraceConfig]] = None) -> aiohttp.ClientSession:
+    """
+    Создаёт долгоживущую HTTP-сессию краулера с настроенным пулом соединений.
+
+    Сессия создаётся один раз на время жизни приложения, поэтому соединения
+    с Wikipedia переиспользуются (keep-alive), а DNS-ответы кэшируются.
+
+    :param trace_configs: Трассировка запросов aiohttp, например для подсчёта
+        новых соединений в бенчмарке
+    :return: Сконфигурированная сессия aiohttp
+    :rtype: aiohttp.ClientSession
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_LIMIT,
+        limit_per_host=settings.HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.HTTP_TOTAL_TIMEOUT,
+        sock_connect=settings.HTTP_CONNECT_TIMEOUT,
+        sock_read=settings.HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": settings.HTTP_USER_AGENT},
+        trace_configs=list(trace_configs or ()),
+    )
+
+
+class HostSessions:
+    """
+    Отдельная HTTP-сессия на каждый хост (например, ru.wikipedia.org и
+    en.wikipedia.org), чтобы обходы разных разделов не делили пул соединений.
+    Сессии создаются при первом обращении к хосту.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    def get(self, host: str) -> aiohttp.ClientSession:
+        if host not in self._sessions:
+            self._sessions[host] = create_http_session()
+        return self._sessions[host]
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from wiki_parser_app.core.config import settings
+
+
+class LoopLagMonitor:
+    """
+    Измеряет задержку event loop: насколько позже запланированного
+    просыпается корутина, спящая interval секунд.
+    """
+
+    def __init__(self, interval: float = settings.LOOP_LAG_INTERVAL, window: int = settings.LOOP_LAG_WINDOW):
+        self.interval = interval
+        self.samples: deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        return {
+            'samples': len(self.samples),
+            'p50': round(self.percentile(0.5), 4),
+            'p99': round(self.percentile(0.99), 4),
+            'max': round(self.max_lag, 4),
+        }
@@ -0,0 +1,220 @@
+# Метрики в формате Prometheus (text exposition 0.0.4) без внешних зависимостей.
+# API повторяет prometheus_client: metric.labels(...).inc()/observe()/set().
+# Обновление метрики — поиск в словаре и сложение, поэтому инструментирование
+# можно держать включённым под нагрузкой. Метрики обновляются только из
+# потока event loop, блокировки не нужны.
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Timer:
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._started)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # The last slot counts observations above the largest bound (+Inf)
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            registry: Registry = REGISTRY
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        registry.register(self)
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in self._children.items()
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+            registry: Registry = REGISTRY
+    ):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def samples(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), child.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# Загрузка страниц
+FETCH_SECONDS = Histogram(
+    "wiki_fetch_seconds", "Time until response headers of a page request, per host", ["host"]
+)
+FETCH_IN_FLIGHT = Gauge("wiki_fetch_in_flight", "Page requests currently in progress")
+HTTP_RESPONSES = Counter("wiki_http_responses_total", "HTTP responses by status code", ["status"])
+FETCH_ERRORS = Counter("wiki_fetch_errors_total", "Page requests failed with a network error", ["reason"])
+FETCH_RETRIES = Counter("wiki_fetch_retries_total", "Page requests retried", ["reason"])
+
+# Обход
+PARSE_SECONDS = Histogram("wiki_parse_seconds", "HTML extraction time per page", ["mode"])
+PAGES_CRAWLED = Counter("wiki_pages_crawled_total", "Pages fetched and extracted")
+PAGES_DEDUPED = Counter("wiki_pages_deduped_total", "Pages skipped because they are already stored")
+PAGES_FAILED = Counter("wiki_pages_failed_total", "Pages that could not be fetched or parsed")
+DB_FLUSH_SECONDS = Histogram("wiki_db_flush_seconds", "Time to write one batch of crawled articles")
+DB_FLUSH_ROWS = Histogram(
+    "wiki_db_flush_rows", "Articles written per batch", buckets=(1, 10, 50, 100, 200, 500, 1000)
+)
+DB_POOL_SATURATED_SECONDS = Counter(
+    "wiki_db_pool_saturated_seconds_total", "Time all pooled connections were checked out"
+)
+DB_SLOW_QUERIES = Counter("wiki_db_slow_queries_total", "Queries slower than DB_SLOW_QUERY_THRESHOLD")
+
+# LLM
+LLM_SECONDS = Histogram("wiki_llm_request_seconds", "LLM request latency", ["mode"])
+LLM_FIRST_TOKEN_SECONDS = Histogram("wiki_llm_first_token_seconds", "Time to the first token of a streamed summary")
+LLM_TOKENS = Histogram("wiki_llm_tokens", "Tokens per LLM request", ["type"], buckets=TOKEN_BUCKETS)
+LLM_ERRORS = Counter("wiki_llm_errors_total", "Failed LLM requests", ["mode"])
+
+# Состояние процесса, обновляется при каждом запросе /metrics
+LOOP_LAG_P99 = Gauge("wiki_event_loop_lag_p99_seconds", "Event loop lag, 99th percentile over the window")
+DB_POOL_CHECKED_OUT = Gauge("wiki_db_pool_checked_out", "Database connections currently checked out")
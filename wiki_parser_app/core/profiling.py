@@ -0,0 +1,254 @@
+import marshal
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from wiki_parser_app.core.config import settings
+
+
+# (файл, строка начала функции, имя функции) — тот же ключ, что у pstats
+FrameKey = Tuple[str, int, str]
+
+current_profile: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+
+
+class SpanStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total': round(self.total, 4),
+            'avg': round(self.total / self.count, 4) if self.count else 0.0,
+            'max': round(self.max, 4),
+        }
+
+
+class Profile:
+    """
+    Профиль одного обхода.
+
+    - CPU: фоновый поток раз в interval секунд снимает стек потока event loop.
+      Сэмплы отражают всё, что выполнялось в event loop, включая другие
+      запросы; время в select/epoll — это простой loop в ожидании I/O.
+      Вес сэмпла — реально прошедшее с предыдущего сэмпла время: пока
+      event loop держит GIL, сэмплер просыпается позже interval.
+    - Асинхронные участки (span) — время по стене между входом и выходом,
+      включая ожидание внутри await. Задачи, созданные внутри обхода,
+      наследуют профиль через contextvar.
+    """
+
+    def __init__(self, label: str, profile_id: Optional[str] = None, interval: float = settings.PROFILE_SAMPLE_INTERVAL):
+        self.id = profile_id or uuid.uuid4().hex
+        self.label = label
+        self.interval = interval
+        self.spans: Dict[str, SpanStats] = defaultdict(SpanStats)
+        # Stack -> number of samples and seconds attributed to it
+        self.stacks: Dict[Tuple[FrameKey, ...], int] = defaultdict(int)
+        self.stack_time: Dict[Tuple[FrameKey, ...], float] = defaultdict(float)
+        self.started_at = time.time()
+        self.duration = 0.0
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.id}", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _sample(self) -> None:
+        previous = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, previous = now - previous, now
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                # Root first, as speedscope expects
+                key = tuple(reversed(stack))
+                self.stacks[key] += 1
+                self.stack_time[key] += elapsed
+
+    def add_span(self, name: str, elapsed: float) -> None:
+        stats = self.spans[name]
+        stats.count += 1
+        stats.total += elapsed
+        stats.max = max(stats.max, elapsed)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def summary(self) -> dict:
+        return {
+            'id': self.id,
+            'label': self.label,
+            'started_at': self.started_at,
+            'duration': round(self.duration, 4),
+            'samples': self.samples,
+            'sample_interval': self.interval,
+            'sampled_time': round(sum(self.stack_time.values()), 4),
+            'spans': {name: stats.as_dict() for name, stats in sorted(self.spans.items())},
+        }
+
+    def to_speedscope(self) -> dict:
+        """Профиль в формате https://www.speedscope.app (sampled)."""
+        frames: List[dict] = []
+        index: Dict[FrameKey, int] = {}
+        samples = []
+        weights = []
+        for stack in self.stacks:
+            indices = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    frames.append({'name': key[2], 'file': key[0], 'line': key[1]})
+                indices.append(index[key])
+            samples.append(indices)
+            weights.append(self.stack_time[stack])
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.label,
+            'exporter': 'wiki_parser_app',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': self.label,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+    def to_pstats(self) -> bytes:
+        """
+        Сэмплы в формате файла pstats (marshal словаря статистики).
+
+        Число вызовов — это число сэмплов, в которых функция была на стеке,
+        tottime/cumtime — время, приписанное этим сэмплам.
+        """
+        stats: Dict[FrameKey, list] = {}
+        callers: Dict[FrameKey, Dict[FrameKey, list]] = defaultdict(dict)
+        for stack, count in self.stacks.items():
+            weight = self.stack_time[stack]
+            seen = set()
+            for depth, key in enumerate(stack):
+                entry = stats.setdefault(key, [0, 0, 0.0, 0.0])
+                if key not in seen:
+                    # Recursive frames are counted once per sample
+                    seen.add(key)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += weight
+                if depth > 0:
+                    edge = callers[key].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    edge[0] += count
+                    edge[1] += count
+                    edge[3] += weight
+            # Self time belongs to the leaf frame only
+            stats[stack[-1]][2] += weight
+            if len(stack) > 1:
+                callers[stack[-1]][stack[-2]][2] += weight
+
+        return marshal.dumps({
+            key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers[key].items()})
+            for key, (cc, nc, tt, ct) in stats.items()
+        })
+
+
+class ProfileStore:
+    """Последние max_size профилей в памяти процесса."""
+
+    def __init__(self, max_size: int = settings.PROFILE_KEEP):
+        self.max_size = max_size
+        self._profiles: OrderedDict[str, Profile] = OrderedDict()
+
+    def add(self, profile: Profile) -> None:
+        self._profiles[profile.id] = profile
+        self._profiles.move_to_end(profile.id)
+        while len(self._profiles) > self.max_size:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Profile]:
+        return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore()
+
+
+@contextmanager
+def profiling(label: str, profile_id: Optional[str] = None, enabled: bool = True) -> Iterator[Optional[Profile]]:
+    """
+    Профилирует код внутри блока, если enabled.
+
+    Вложенный вызов внутри уже профилируемого блока не создаёт новый
+    профиль, а пишет в текущий.
+    """
+    active = current_profile.get()
+    if not enabled or active is not None:
+        yield active
+        return
+
+    profile = Profile(label, profile_id)
+    token = current_profile.set(profile)
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        current_profile.reset(token)
+        profile_store.add(profile)
+        logger.info(f"Profile {profile.id} ({label}) recorded: {profile.samples} samples in {profile.duration:.2f}s")
+
+
+class span:
+    """
+    Замер асинхронного участка: with span("fetch"): await ...
+
+    Без активного профиля стоит одно чтение contextvar.
+    """
+
+    __slots__ = ("name", "_profile", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._profile = current_profile.get()
+        if self._profile is not None:
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._profile is not None:
+            self._profile.add_span(self.name, time.perf_counter() - self._started)
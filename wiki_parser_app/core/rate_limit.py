@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Состояния CircuitBreaker
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: ёмкость capacity, пополнение rate токенов в секунду.
+    acquire() ждёт, пока в корзине не наберётся нужное число токенов.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.wait_time = 0.0
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # Requests larger than the bucket would never fit, so clamp them
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) / self.rate
+                self.wait_time += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= amount
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker по доле ошибок в скользящем окне из window последних запросов.
+
+    Когда доля ошибок достигает error_rate (при не менее чем min_requests
+    запросах в окне), breaker размыкается (open) на cooldown секунд: wait()
+    в это время не пропускает новые запросы. Затем он переходит в half-open
+    и пропускает один пробный запрос, остальные ждут его исхода: успех
+    замыкает breaker (closed), ошибка снова размыкает его на cooldown.
+    """
+
+    def __init__(self, window: int, min_requests: int, error_rate: float, cooldown: float):
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened = 0
+        self.wait_time = 0.0
+        self._outcomes: deque = deque(maxlen=window)
+        self._open_until = 0.0
+        self._probing = False
+        self._probe_finished = asyncio.Event()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def record(self, success: bool) -> None:
+        if self.state == OPEN:
+            # Late outcome of a request sent before the breaker opened
+            return
+        if self.state == HALF_OPEN:
+            if success:
+                self.state = CLOSED
+            else:
+                self._open()
+            self._probing = False
+            self._probe_finished.set()
+            self._probe_finished = asyncio.Event()
+            return
+
+        self._outcomes.append(success)
+        if len(self._outcomes) < self.min_requests:
+            return
+        failures = self._outcomes.count(False)
+        if failures / len(self._outcomes) >= self.error_rate:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._open_until = time.monotonic() + self.cooldown
+        self._outcomes.clear()
+        self.opened += 1
+
+    async def wait(self) -> None:
+        while self.state != CLOSED:
+            started = time.monotonic()
+            if self.state == OPEN:
+                delay = self._open_until - started
+                if delay > 0:
+                    self.wait_time += delay
+                    await asyncio.sleep(delay)
+                    continue
+                self.state = HALF_OPEN
+            if not self._probing:
+                # This request is the probe
+                self._probing = True
+                return
+            try:
+                # A probe that never reports back (e.g. a cancelled request) frees the slot after cooldown
+                await asyncio.wait_for(self._probe_finished.wait(), timeout=self.cooldown)
+            except asyncio.TimeoutError:
+                self._probing = False
+            self.wait_time += time.monotonic() - started
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After в секундах: заголовок бывает числом секунд или HTTP-датой."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return max(seconds, 0.0)
@@ -6,10 +6,24 @@ from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, declared_attr
 from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine, AsyncSession
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
-from wiki_parser_app.core.config import database_url
-
-
-engine = create_async_engine(url=database_url)
+from wiki_parser_app.core.config import database_url, settings
+from wiki_parser_app.db.instrumentation import instrument_engine
+
+
+engine = create_async_engine(
+    url=database_url,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        # SQLAlchemy's cache of prepared statements and asyncpg's own one
+        'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+        'statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+    },
+)
+instrument_engine(engine, settings.DB_SLOW_QUERY_THRESHOLD)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
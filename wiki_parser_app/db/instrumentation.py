@@ -0,0 +1,112 @@
+import time
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from wiki_parser_app.core.metrics import DB_POOL_SATURATED_SECONDS, DB_SLOW_QUERIES
+
+
+class DBStats:
+    """Счётчики пула соединений и запросов к БД."""
+
+    def __init__(self):
+        self.sessions_opened = 0
+        self.checkouts = 0
+        self.checked_out_max = 0
+        self.pool_saturations = 0
+        self.pool_saturated_time = 0.0
+        self.queries = 0
+        self.failed_queries = 0
+        self.query_time = 0.0
+        self.slow_queries = 0
+
+    def as_dict(self) -> dict:
+        return {
+            'sessions_opened': self.sessions_opened,
+            'checkouts': self.checkouts,
+            'checked_out_max': self.checked_out_max,
+            'pool_saturations': self.pool_saturations,
+            'pool_saturated_time': round(self.pool_saturated_time, 4),
+            'queries': self.queries,
+            'failed_queries': self.failed_queries,
+            'query_time': round(self.query_time, 4),
+            'slow_queries': self.slow_queries,
+        }
+
+
+db_stats = DBStats()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_threshold: float) -> None:
+    """
+    Подключает к движку учёт соединений пула, времени запросов и лог медленных запросов.
+
+    Пул учитывается по событиям checkout/checkin: пока все соединения
+    выданы (pool_size + max_overflow), новый запрос соединения ждёт, поэтому
+    время в таком состоянии (pool_saturated_time) показывает, что пул мал
+    для текущей нагрузки.
+    """
+    checked_out = 0
+    saturated_since = None
+
+    def is_full() -> bool:
+        pool = engine.sync_engine.pool
+        max_overflow = getattr(pool, '_max_overflow', -1)
+        # A pool without an overflow limit never makes a checkout wait
+        return max_overflow > -1 and checked_out >= pool.size() + max_overflow
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        nonlocal checked_out, saturated_since
+        checked_out += 1
+        db_stats.checkouts += 1
+        db_stats.checked_out_max = max(db_stats.checked_out_max, checked_out)
+        if saturated_since is None and is_full():
+            saturated_since = time.perf_counter()
+            db_stats.pool_saturations += 1
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        nonlocal checked_out, saturated_since
+        checked_out = max(checked_out - 1, 0)
+        if saturated_since is not None:
+            saturated = time.perf_counter() - saturated_since
+            saturated_since = None
+            db_stats.pool_saturated_time += saturated
+            DB_POOL_SATURATED_SECONDS.inc(saturated)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+        db_stats.queries += 1
+        db_stats.query_time += elapsed
+        if elapsed >= slow_query_threshold:
+            db_stats.slow_queries += 1
+            DB_SLOW_QUERIES.inc()
+            logger.warning(f"Slow query ({elapsed:.3f}s): {' '.join(statement.split())[:500]}")
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start
+        # time so the next statement on this connection is not timed from it
+        connection = exception_context.connection
+        started = connection.info.get('query_started_at') if connection is not None else None
+        if started:
+            started.pop()
+            db_stats.failed_queries += 1
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'max_overflow': pool._max_overflow,
+    }
@@ -0,0 +1,14 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from wiki_parser_app.core.config import settings
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Проверяет X-Admin-Token; без заданного ADMIN_TOKEN доступ к /admin/* закрыт."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
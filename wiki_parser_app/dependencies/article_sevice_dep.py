@@ -1,11 +1,19 @@
+from concurrent.futures import Executor
+from typing import Optional
+
+import aiohttp
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from wiki_parser_app.core.config import api_key
+from wiki_parser_app.db.database import async_session_maker
 from wiki_parser_app.dependencies.repository_dep import get_session_with_commit
 from wiki_parser_app.repositories.article_repo import ArticleRepository
+from wiki_parser_app.repositories.link_repo import LinkRepository
 from wiki_parser_app.repositories.summary_repo import SummaryRepository
 from wiki_parser_app.services.article_service import ArticleService
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.page_cache import PageCache
 from wiki_parser_app.services.llm_service import SummaryService
 from wiki_parser_app.services.parser_service import WikipediaParser
 
@@ -18,19 +26,34 @@ def get_summary_repo(session: AsyncSession = Depends(get_session_with_commit)) -
     return SummaryRepository(session)
 
 
-def get_parser(session: AsyncSession = Depends(get_session_with_commit)) -> WikipediaParser:
-    return WikipediaParser(session)
+def get_link_repo(session: AsyncSession = Depends(get_session_with_commit)) -> LinkRepository:
+    return LinkRepository(session)
 
 
 def get_llm_service() -> SummaryService:
     return SummaryService(api_key=api_key)
 
 
-def get_article_service(
-    session: AsyncSession = Depends(get_session_with_commit),
-    article_repo: ArticleRepository = Depends(get_article_repo),
-    summary_repo: SummaryRepository = Depends(get_summary_repo),
-    parser: WikipediaParser = Depends(get_parser),
-    llm_service: SummaryService = Depends(get_llm_service)
+def build_article_service(
+    session: AsyncSession,
+    http_session: aiohttp.ClientSession,
+    parse_executor: Optional[Executor] = None,
+    llm_service: Optional[SummaryService] = None,
+    fetcher: Optional[PoliteFetcher] = None,
+    page_cache: Optional[PageCache] = None
 ) -> ArticleService:
-    return ArticleService(session, article_repo, summary_repo, parser, llm_service)
+    """Собирает ArticleService вне HTTP-запроса, например для фоновых заданий."""
+    return ArticleService(
+        session,
+        ArticleRepository(session),
+        SummaryRepository(session),
+        WikipediaParser(
+            async_session_maker,
+            http_session,
+            parse_executor=parse_executor,
+            fetcher=fetcher,
+            page_cache=page_cache
+        ),
+        llm_service or get_llm_service()
+    )
+
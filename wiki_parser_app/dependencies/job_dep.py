@@ -0,0 +1,14 @@
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from wiki_parser_app.dependencies.repository_dep import get_session_with_commit
+from wiki_parser_app.repositories.job_repo import JobRepository
+from wiki_parser_app.services.job_service import JobManager
+
+
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.job_manager
+
+
+def get_job_repo(session: AsyncSession = Depends(get_session_with_commit)) -> JobRepository:
+    return JobRepository(session)
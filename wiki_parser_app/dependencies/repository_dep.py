@@ -1,10 +1,17 @@
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from wiki_parser_app.db.database import async_session_maker
+from wiki_parser_app.db.instrumentation import db_stats
 
 
 async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
-    """Асинхронная сессия с автоматическим коммитом."""
+    """
+    Асинхронная сессия с автоматическим коммитом.
+
+    FastAPI кэширует зависимости в пределах запроса, поэтому все
+    репозитории одного запроса получают одну и ту же сессию.
+    """
+    db_stats.sessions_opened += 1
     async with async_session_maker() as session:
         try:
             yield session
@@ -18,6 +25,7 @@ async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
 
 async def get_session_without_commit() -> AsyncGenerator[AsyncSession, None]:
     """Асинхронная сессия без автоматического коммита."""
+    db_stats.sessions_opened += 1
     async with async_session_maker() as session:
         try:
             yield session
@@ -0,0 +1,15 @@
+from fastapi import Depends, Request
+
+from wiki_parser_app.db.database import async_session_maker
+from wiki_parser_app.dependencies.article_sevice_dep import get_llm_service
+from wiki_parser_app.services.llm_service import SummaryService
+from wiki_parser_app.services.summarization_service import BatchSummarizer
+from wiki_parser_app.services.summary_stream import SummaryStreamer
+
+
+def get_batch_summarizer(request: Request) -> BatchSummarizer:
+    return request.app.state.batch_summarizer
+
+
+def get_summary_streamer(llm_service: SummaryService = Depends(get_llm_service)) -> SummaryStreamer:
+    return SummaryStreamer(llm_service, async_session_maker)
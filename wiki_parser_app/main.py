@@ -1,19 +1,70 @@
 from contextlib import asynccontextmanager
+from functools import partial
 from typing import AsyncGenerator
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
+from wiki_parser_app.api.v1.routers.admin import router as admin_router
 from wiki_parser_app.api.v1.routers.parser import router as parser_router
+from wiki_parser_app.api.v1.routers.articles import router as articles_router
+from wiki_parser_app.api.v1.routers.jobs import router as jobs_router
+from wiki_parser_app.api.v1.routers.metrics import router as metrics_router
 from wiki_parser_app.api.v1.routers.summary import router as summary_router
+from wiki_parser_app.core.config import api_key, settings
+from wiki_parser_app.core.executors import create_parse_executor
+from wiki_parser_app.core.http_client import HostSessions, create_http_session
+from wiki_parser_app.core.loop_monitor import LoopLagMonitor
+from wiki_parser_app.db.database import async_session_maker
+from wiki_parser_app.dependencies.article_sevice_dep import build_article_service
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.job_service import JobManager
+from wiki_parser_app.services.page_cache import create_page_cache
+from wiki_parser_app.services.summarization_service import BatchSummarizer, RateLimitedSummaryService
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[dict, None]:
     """Управление жизненным циклом приложения."""
     logger.info("Инициализация приложения...")
-    yield
-    logger.info("Завершение работы приложения...")
+    app.state.http_session = create_http_session()
+    app.state.host_sessions = HostSessions() if settings.HTTP_SESSION_PER_HOST else None
+    app.state.fetcher = PoliteFetcher(app.state.http_session, host_sessions=app.state.host_sessions)
+    app.state.page_cache = create_page_cache()
+    app.state.parse_executor = create_parse_executor()
+    app.state.loop_monitor = LoopLagMonitor()
+    app.state.loop_monitor.start()
+    app.state.job_manager = JobManager(
+        async_session_maker,
+        partial(
+            build_article_service,
+            http_session=app.state.http_session,
+            parse_executor=app.state.parse_executor,
+            fetcher=app.state.fetcher,
+            page_cache=app.state.page_cache
+        )
+    )
+    await app.state.job_manager.start()
+    app.state.batch_summarizer = BatchSummarizer(
+        async_session_maker,
+        partial(
+            build_article_service,
+            http_session=app.state.http_session,
+            llm_service=RateLimitedSummaryService(api_key)
+        )
+    )
+    try:
+        yield
+    finally:
+        logger.info("Завершение работы приложения...")
+        await app.state.batch_summarizer.stop()
+        await app.state.job_manager.stop()
+        await app.state.loop_monitor.stop()
+        await app.state.http_session.close()
+        if app.state.host_sessions is not None:
+            await app.state.host_sessions.close()
+        if app.state.parse_executor is not None:
+            app.state.parse_executor.shutdown(wait=False, cancel_futures=True)
 
 
 def create_app() -> FastAPI:
@@ -57,7 +108,11 @@ def register_routers(app: FastAPI) -> None:
     # Подключение роутеров
     app.include_router(root_router, tags=["root"])
     app.include_router(parser_router, tags=["parser"])
+    app.include_router(jobs_router, tags=["jobs"])
     app.include_router(summary_router, tags=["summary"])
+    app.include_router(articles_router, tags=["articles"])
+    app.include_router(metrics_router, tags=["metrics"])
+    app.include_router(admin_router, tags=["admin"])
 
 
 # Создание экземпляра приложения
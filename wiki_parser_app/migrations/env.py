@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_engine_from_config
 from wiki_parser_app.core.config import database_url
 from wiki_parser_app.db.database import Base
 from wiki_parser_app.models.articles import Article
+from wiki_parser_app.models.jobs import Job
 
 
 # this is the Alembic Config object, which provides
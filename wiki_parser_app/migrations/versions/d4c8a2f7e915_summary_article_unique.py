@@ -0,0 +1,34 @@
+"""summary article unique
+
+Revision ID: d4c8a2f7e915
+Revises: a7d3e9b5c184
+Create Date: 2026-10-18 21:04:12.318906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4c8a2f7e915'
+down_revision: Union[str, None] = 'a7d3e9b5c184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent summary requests could insert a second row for an article; keep the newest one
+    op.execute(sa.text(
+        "DELETE FROM summaries s USING summaries newer "
+        "WHERE s.article_id = newer.article_id "
+        "AND (s.updated_at, s.id) < (newer.updated_at, newer.id)"
+    ))
+    op.create_unique_constraint('summaries_article_id_key', 'summaries', ['article_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('summaries_article_id_key', 'summaries', type_='unique')
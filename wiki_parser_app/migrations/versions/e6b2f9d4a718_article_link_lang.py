@@ -0,0 +1,33 @@
+"""article link lang
+
+Revision ID: e6b2f9d4a718
+Revises: d4c8a2f7e915
+Create Date: 2026-10-18 22:16:40.527381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2f9d4a718'
+down_revision: Union[str, None] = 'd4c8a2f7e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('article_links', sa.Column('lang', sa.String(length=16), server_default='ru', nullable=False))
+    # Existing edges take the language of their source article
+    op.execute(sa.text(
+        "UPDATE article_links l SET lang = a.lang FROM articles a "
+        "WHERE a.id = l.source_id AND a.lang <> l.lang"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('article_links', 'lang')
@@ -1,7 +1,7 @@
 import uuid
 from typing import Optional, List
 
-from sqlalchemy import String, Text, ForeignKey, Boolean
+from sqlalchemy import String, Text, ForeignKey, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
@@ -9,8 +9,16 @@ from wiki_parser_app.db.database import Base
 
 
 class Article(Base):
+    __table_args__ = (
+        # Also serves lookups by url: get_by_url, crawl dedup and link joins
+        UniqueConstraint("lang", "url"),
+        # Work queue of articles that were created but not parsed yet
+        Index("ix_articles_unparsed", "created_at", postgresql_where=text("NOT parsed")),
+    )
+
+    lang: Mapped[str] = mapped_column(String(16), default="ru", server_default="ru")
     title: Mapped[str] = mapped_column(String(255))
-    url: Mapped[str] = mapped_column(String(512), unique=True)
+    url: Mapped[str] = mapped_column(String(512))
     content: Mapped[Optional[str]] = mapped_column(Text)
     parsed: Mapped[bool] = mapped_column(Boolean, default=False)
     level: Mapped[int] = mapped_column(default=0)
@@ -18,7 +26,8 @@ class Article(Base):
     parent_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         PG_UUID(as_uuid=True),
         ForeignKey("articles.id"),
-        nullable=True
+        nullable=True,
+        index=True
     )
 
     parent: Mapped[Optional["Article"]] = relationship(remote_side='Article.id')
@@ -31,14 +40,38 @@ class Article(Base):
 
 
 class Summary(Base):
+    __table_args__ = (
+        # One summary per article: SummaryRepository.upsert resolves concurrent writes on it
+        UniqueConstraint("article_id"),
+    )
+
     article_id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True),
         ForeignKey("articles.id"),
         primary_key=True
     )
     content: Mapped[str] = mapped_column(Text)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)
 
     article: Mapped["Article"] = relationship(
         "Article",
         back_populates="summary"
     )
+
+
+class ArticleLink(Base):
+    """Ссылка со статьи source_id на статью target_url (ребро графа ссылок)."""
+    __tablename__ = "article_links"
+    __table_args__ = (
+        # Its leading column also serves lookups by source_id
+        UniqueConstraint("source_id", "target_url"),
+    )
+
+    source_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("articles.id", ondelete="CASCADE")
+    )
+    # Language of the source article: the target is looked up in the same language section
+    lang: Mapped[str] = mapped_column(String(16), default="ru", server_default="ru")
+    target_url: Mapped[str] = mapped_column(String(512), index=True)
+    position: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import String, Text, ForeignKey, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+
+from wiki_parser_app.db.database import Base
+
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(Base):
+    url: Mapped[str] = mapped_column(String(512))
+    status: Mapped[str] = mapped_column(String(32), default=JobStatus.PENDING)
+    pages_fetched: Mapped[int] = mapped_column(default=0)
+    pages_failed: Mapped[int] = mapped_column(default=0)
+    pages_deduped: Mapped[int] = mapped_column(default=0)
+    depth_reached: Mapped[int] = mapped_column(default=0)
+    options: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    started_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP)
+
+    article_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("articles.id"),
+        nullable=True
+    )
@@ -1,15 +1,25 @@
-from typing import Optional
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 
+from sqlalchemy import String, all_, any_, bindparam, func, literal_column
+from sqlalchemy import CTE
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload, load_only
 
 from sqlalchemy.exc import IntegrityError
 
-from wiki_parser_app.models.articles import Article
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.models.articles import Article, Summary
 from loguru import logger
 
 
+TREE_FIELDS = ('id', 'lang', 'title', 'url', 'parent_id', 'level', 'parsed', 'created_at', 'updated_at', 'content')
+DEFAULT_TREE_FIELDS = ('id', 'title', 'url', 'parent_id', 'level')
+
+
 class ArticleRepository:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
@@ -57,7 +67,179 @@ class ArticleRepository:
             logger.error(f"Unexpected error: {str(e)}")
             return None
 
-    async def get_by_url(self, url: str) -> Optional[Article]:
+    async def get_by_url(self, url: str, lang: str = settings.WIKI_DEFAULT_LANG) -> Optional[Article]:
+        result = await self.db_session.execute(
+            select(Article).where(Article.lang == lang, Article.url == url))
+        return result.scalars().first()
+
+    async def get_with_summary(self, url: str, lang: str = settings.WIKI_DEFAULT_LANG) -> Optional[Article]:
+        """
+        Статья вместе с summary одним запросом: joinedload делает LEFT JOIN,
+        поэтому обращение к article.summary не требует ленивой загрузки.
+        """
+        result = await self.db_session.execute(
+            select(Article)
+            .options(joinedload(Article.summary))
+            .where(Article.lang == lang, Article.url == url)
+        )
+        return result.scalars().first()
+
+    async def get_summary_by_url(self, url: str, lang: str = settings.WIKI_DEFAULT_LANG) -> Optional[tuple]:
+        """
+        Summary статьи одним запросом, без загрузки ORM-объектов и ленивых связей.
+
+        :return: Пара (id статьи, текст summary) или None
+        """
+        result = await self.db_session.execute(
+            select(Article.id, Summary.content)
+            .join(Summary, Summary.article_id == Article.id)
+            .where(Article.lang == lang, Article.url == url)
+        )
+        return result.first()
+
+    async def bulk_upsert(self, rows: List[dict]) -> Dict[str, UUID]:
+        """
+        Сохраняет пачку статей одним INSERT ... ON CONFLICT (lang, url) DO UPDATE.
+        Все строки пачки должны относиться к одному языковому разделу.
+
+        :return: Карта url -> id для всех строк пачки, включая уже существовавшие
+        """
+        if not rows:
+            return {}
+
+        stmt = insert(Article).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Article.lang, Article.url],
+            set_={
+                'title': stmt.excluded.title,
+                'content': stmt.excluded.content,
+                'parsed': stmt.excluded.parsed,
+                'parent_id': func.coalesce(Article.parent_id, stmt.excluded.parent_id),
+                'updated_at': func.now(),
+            }
+        ).returning(Article.url, Article.id)
+
+        result = await self.db_session.execute(stmt)
+        return {url: article_id for url, article_id in result.all()}
+
+    async def get_existing_urls(
+            self,
+            urls: List[str],
+            fresh_for: Optional[timedelta] = None,
+            lang: str = settings.WIKI_DEFAULT_LANG
+    ) -> Dict[str, UUID]:
+        """
+        Одним запросом WHERE url = ANY(:urls) находит уже сохранённые статьи раздела lang.
+
+        :param fresh_for: Если задано, учитываются только статьи, обновлённые не раньше now() - fresh_for
+        :return: Карта url -> id найденных статей
+        """
+        if not urls:
+            return {}
+
+        query = select(Article.url, Article.id).where(
+            Article.lang == lang,
+            Article.url == any_(bindparam('urls', urls, type_=ARRAY(String)))
+        )
+        if fresh_for is not None:
+            query = query.where(Article.updated_at >= func.now() - fresh_for)
+
+        result = await self.db_session.execute(query)
+        return {url: article_id for url, article_id in result.all()}
+
+    async def get_by_id(self, article_id: UUID) -> Optional[Article]:
+        result = await self.db_session.execute(
+            select(Article).where(Article.id == article_id))
+        return result.scalars().first()
+
+    async def get_by_id_with_summary(self, article_id: UUID) -> Optional[Article]:
+        """Статья по id вместе с summary одним запросом (см. get_with_summary)."""
         result = await self.db_session.execute(
-            select(Article).where(Article.url == url))
+            select(Article)
+            .options(joinedload(Article.summary))
+            .where(Article.id == article_id)
+        )
         return result.scalars().first()
+
+    async def get_ref(self, article_id: UUID) -> Optional[Article]:
+        """Статья без тяжёлого content: только id, lang, url и title (load_only)."""
+        result = await self.db_session.execute(
+            select(Article)
+            .options(load_only(Article.id, Article.lang, Article.url, Article.title))
+            .where(Article.id == article_id)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    def _subtree(root_id: UUID) -> CTE:
+        """Рекурсивный CTE с id статьи root_id и всех её потомков."""
+        tree = select(Article.id).where(Article.id == root_id).cte('tree', recursive=True)
+        # UNION instead of UNION ALL stops the walk if parent links ever form a cycle
+        return tree.union(select(Article.id).where(Article.parent_id == tree.c.id))
+
+    async def get_unsummarized_ids(
+            self,
+            root_id: Optional[UUID] = None,
+            limit: int = 100,
+            exclude_ids: Optional[List[UUID]] = None
+    ) -> List[UUID]:
+        """
+        Возвращает id статей с текстом, но без summary.
+
+        :param root_id: Если задано, ищет только в дереве обхода с этим корнем
+        :param exclude_ids: id, которые нужно пропустить (например, уже упавшие);
+            передаются одним параметром-массивом, так что их число не ограничено
+            лимитом параметров запроса
+        """
+        query = (
+            select(Article.id)
+            .outerjoin(Summary, Summary.article_id == Article.id)
+            .where(Summary.article_id.is_(None), Article.content.is_not(None))
+        )
+        if root_id is not None:
+            tree = self._subtree(root_id)
+            query = query.where(Article.id.in_(select(tree.c.id)))
+        if exclude_ids:
+            query = query.where(
+                Article.id != all_(bindparam('exclude_ids', exclude_ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+            )
+
+        result = await self.db_session.execute(query.order_by(Article.level, Article.id).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_tree(
+            self,
+            root_id: UUID,
+            max_depth: int,
+            fields: Sequence[str] = DEFAULT_TREE_FIELDS,
+            limit: int = 500,
+            offset: int = 0
+    ) -> List[dict]:
+        """
+        Дерево обхода с корнем root_id одним запросом WITH RECURSIVE.
+
+        Возвращает плоский список узлов (с parent_id и глубиной depth от корня)
+        в порядке обхода в ширину. Выбираются только колонки из fields,
+        поэтому тяжёлый content не читается, если он не запрошен.
+        """
+        tree = (
+            select(Article.id, literal_column('0').label('depth'))
+            .where(Article.id == root_id)
+            .cte('tree', recursive=True)
+        )
+        # The depth bound also guarantees termination if parent links form a cycle
+        tree = tree.union_all(
+            select(Article.id, tree.c.depth + 1)
+            .where(Article.parent_id == tree.c.id, tree.c.depth < max_depth)
+        )
+
+        columns = [getattr(Article, field) for field in fields]
+        query = (
+            select(*columns, tree.c.depth)
+            .join(tree, tree.c.id == Article.id)
+            .order_by(tree.c.depth, Article.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.db_session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
@@ -0,0 +1,34 @@
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from wiki_parser_app.models.jobs import Job, JobStatus
+
+
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, url: str, options: Optional[Dict[str, Any]] = None) -> Job:
+        job = Job(url=url, status=JobStatus.PENDING, options=options or None)
+        self.session.add(job)
+        await self.session.flush()
+        await self.session.refresh(job)
+        return job
+
+    async def get(self, job_id: uuid.UUID) -> Optional[Job]:
+        result = await self.session.execute(select(Job).where(Job.id == job_id))
+        return result.scalars().first()
+
+    async def update(self, job_id: uuid.UUID, **values) -> None:
+        await self.session.execute(update(Job).where(Job.id == job_id).values(**values))
+
+    async def list_unfinished(self) -> List[Job]:
+        result = await self.session.execute(
+            select(Job)
+            .where(Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING]))
+            .order_by(Job.created_at)
+        )
+        return list(result.scalars().all())
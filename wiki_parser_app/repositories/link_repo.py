@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.models.articles import Article, ArticleLink
+
+
+class LinkRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def bulk_insert(self, edges: List[dict]) -> None:
+        """
+        Сохраняет рёбра графа ссылок пачками; уже известные рёбра пропускаются.
+        Пачки ограничены по размеру, чтобы не упереться в лимит параметров запроса.
+        """
+        chunk = settings.CRAWL_LINK_INSERT_CHUNK
+        for start in range(0, len(edges), chunk):
+            stmt = insert(ArticleLink).values(edges[start:start + chunk])
+            await self.session.execute(
+                stmt.on_conflict_do_nothing(index_elements=[ArticleLink.source_id, ArticleLink.target_url])
+            )
+
+    async def get_target_urls(self, source_ids: List[UUID]) -> Dict[UUID, List[str]]:
+        """Одним запросом: source_id -> url целей его ссылок в порядке position."""
+        result = await self.session.execute(
+            select(ArticleLink.source_id, ArticleLink.target_url)
+            .where(ArticleLink.source_id == any_(bindparam('ids', source_ids, type_=ARRAY(PG_UUID(as_uuid=True)))))
+            .order_by(ArticleLink.source_id, ArticleLink.position)
+        )
+        targets: Dict[UUID, List[str]] = {}
+        for source_id, target_url in result.all():
+            targets.setdefault(source_id, []).append(target_url)
+        return targets
+
+    async def get_out_links(self, article_id: UUID, limit: int = 100, offset: int = 0) -> List[dict]:
+        """Исходящие ссылки статьи; article_id и title заполнены, если цель есть в БД."""
+        result = await self.session.execute(
+            select(
+                ArticleLink.target_url.label('url'),
+                Article.id.label('article_id'),
+                Article.title
+            )
+            .outerjoin(Article, and_(Article.url == ArticleLink.target_url, Article.lang == ArticleLink.lang))
+            .where(ArticleLink.source_id == article_id)
+            .order_by(ArticleLink.position)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [dict(row) for row in result.mappings().all()]
+
+    async def get_in_links(self, article_id: UUID, limit: int = 100, offset: int = 0) -> List[dict]:
+        """
+        Сохранённые статьи, ссылающиеся на статью article_id («Ссылки сюда»).
+        url и язык цели берутся в том же запросе, без отдельной загрузки статьи.
+        """
+        target = aliased(Article)
+        result = await self.session.execute(
+            select(Article.url, Article.id.label('article_id'), Article.title)
+            .join(ArticleLink, ArticleLink.source_id == Article.id)
+            .join(target, and_(target.url == ArticleLink.target_url, target.lang == ArticleLink.lang))
+            .where(target.id == article_id)
+            .order_by(Article.title)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [dict(row) for row in result.mappings().all()]
+
+    async def shortest_path(self, source_id: UUID, target_id: UUID, max_depth: int = 6) -> Optional[List[dict]]:
+        """
+        Кратчайший путь по ссылкам между двумя сохранёнными статьями.
+
+        Поиск в ширину, один запрос на уровень: из текущего фронта берутся
+        все исходящие рёбра, ведущие на сохранённые статьи.
+
+        :return: Статьи пути от source до target включительно или None
+        """
+        parents: Dict[UUID, Optional[UUID]] = {source_id: None}
+        frontier = [source_id]
+        for _ in range(max_depth):
+            if target_id in parents or not frontier:
+                break
+            result = await self.session.execute(
+                select(ArticleLink.source_id, Article.id)
+                .join(Article, and_(Article.url == ArticleLink.target_url, Article.lang == ArticleLink.lang))
+                .where(ArticleLink.source_id == any_(bindparam('frontier', frontier, type_=ARRAY(PG_UUID(as_uuid=True)))))
+            )
+            next_frontier = []
+            for parent_id, article_id in result.all():
+                if article_id not in parents:
+                    parents[article_id] = parent_id
+                    next_frontier.append(article_id)
+            frontier = next_frontier
+
+        if target_id not in parents:
+            return None
+
+        path = [target_id]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        path.reverse()
+
+        result = await self.session.execute(
+            select(Article.id, Article.url, Article.title)
+            .where(Article.id == any_(bindparam('path', path, type_=ARRAY(PG_UUID(as_uuid=True)))))
+        )
+        articles = {row['id']: dict(row) for row in result.mappings().all()}
+        # With source_id == target_id no query has checked that the article exists
+        if len(articles) != len(path):
+            return None
+        return [articles[article_id] for article_id in path]
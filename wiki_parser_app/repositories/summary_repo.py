@@ -1,21 +1,31 @@
 import uuid
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from wiki_parser_app.models.articles import Summary
 
 
+# Ключ session.info: id статей, чьё summary изменено в текущей транзакции.
+# Кэш ответов GET /summary сбрасывает их после COMMIT
+CHANGED_SUMMARIES = "changed_summaries"
+
+
 class SummaryRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create(self, article_id: uuid, content: str) -> Optional[str]:
+    def _mark_changed(self, article_id: uuid) -> None:
+        self.session.info.setdefault(CHANGED_SUMMARIES, set()).add(article_id)
+
+    async def create(self, article_id: uuid, content: str, content_hash: Optional[str] = None) -> Optional[str]:
         try:
-            summary = Summary(article_id=article_id, content=content)
+            summary = Summary(article_id=article_id, content=content, content_hash=content_hash)
             self.session.add(summary)
             await self.session.flush()
+            self._mark_changed(article_id)
             return content
         except Exception as e:
             await self.session.rollback()
@@ -29,3 +39,38 @@ class SummaryRepository:
 
         except Exception as e:
             raise e
+
+    async def update(self, summary: Summary, content: str, content_hash: Optional[str] = None) -> Optional[str]:
+        try:
+            summary.content = content
+            summary.content_hash = content_hash
+            await self.session.flush()
+            self._mark_changed(summary.article_id)
+            return content
+        except Exception as e:
+            await self.session.rollback()
+            raise e
+
+    async def upsert(self, article_id: uuid, content: str, content_hash: Optional[str] = None) -> str:
+        """
+        Сохраняет summary статьи одним INSERT ... ON CONFLICT (article_id) DO UPDATE.
+        В отличие от create, одновременные запросы для одной статьи не упадут
+        на уникальности: последняя запись просто перезапишет предыдущую.
+        """
+        stmt = insert(Summary).values(article_id=article_id, content=content, content_hash=content_hash)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Summary.article_id],
+            set_={
+                'content': stmt.excluded.content,
+                'content_hash': stmt.excluded.content_hash,
+                'updated_at': func.now(),
+            }
+        )
+        await self.session.execute(stmt)
+        self._mark_changed(article_id)
+        return content
+
+    async def get_by_content_hash(self, content_hash: str) -> Optional[Summary]:
+        result = await self.session.execute(
+            select(Summary).where(Summary.content_hash == content_hash).limit(1))
+        return result.scalars().first()
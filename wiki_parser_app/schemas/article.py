@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -18,6 +18,10 @@ class ArticleSchema(BaseModel):
 
 class ParseRequestSchema(BaseModel):
     url: str
+    max_depth: Optional[int] = Field(default=None, ge=0, le=10)
+    fan_out: Optional[int] = Field(default=None, ge=1, le=50)
+    max_pages: Optional[int] = Field(default=None, ge=1, le=10000)
+    link_strategy: Optional[Literal["order", "frequency", "lead"]] = None
 
 
 class ArticleResponseSchema(BaseModel):
@@ -29,3 +33,52 @@ class ArticleResponseSchema(BaseModel):
 class ArticleSummarySchema(BaseModel):
     id: UUID
     summary: Optional[str]
+
+
+class SummaryBatchRequestSchema(BaseModel):
+    article_id: Optional[UUID] = None
+
+
+class SummaryBatchStatusSchema(BaseModel):
+    run_id: str
+    status: str
+    summarized: int
+    failed: int
+    error: Optional[str] = None
+
+
+class ArticleTreeNodeSchema(BaseModel):
+    id: Optional[UUID] = None
+    lang: Optional[str] = None
+    title: Optional[str] = None
+    url: Optional[str] = None
+    parent_id: Optional[UUID] = None
+    level: Optional[int] = None
+    parsed: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    content: Optional[str] = None
+    depth: int
+
+
+class ArticleTreeSchema(BaseModel):
+    root_id: UUID
+    items: List[ArticleTreeNodeSchema]
+    next_offset: Optional[int] = None
+
+
+class ArticleLinkSchema(BaseModel):
+    url: str
+    article_id: Optional[UUID] = None
+    title: Optional[str] = None
+
+
+class ArticleRefSchema(BaseModel):
+    id: UUID
+    url: str
+    title: str
+
+
+class ArticlePathSchema(BaseModel):
+    length: int
+    articles: List[ArticleRefSchema]
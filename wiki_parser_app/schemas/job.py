@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import datetime
+
+
+class JobSchema(BaseModel):
+    id: UUID
+    url: str
+    status: str
+    pages_fetched: int
+    pages_failed: int
+    pages_deduped: int
+    depth_reached: int
+    options: Optional[Dict[str, Any]]
+    article_id: Optional[UUID]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -1,13 +1,17 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from loguru import logger
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from wiki_parser_app.models.articles import Article, Summary
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.profiling import profiling, span
+from wiki_parser_app.models.articles import Article
 from wiki_parser_app.repositories.article_repo import ArticleRepository
 from wiki_parser_app.repositories.summary_repo import SummaryRepository
 from wiki_parser_app.services.llm_service import SummaryService
-from wiki_parser_app.services.parser_service import WikipediaParser
+from wiki_parser_app.services.parser_service import WikipediaParser, split_wiki_url
+from wiki_parser_app.services.summary_cache import summary_cache
 
 
 class ArticleService:
@@ -25,23 +29,41 @@ class ArticleService:
         self.parser = parser
         self.llm_service = llm_service
 
-    async def parse_and_save_article(self, url: str) -> Optional[Article]:
+    async def parse_and_save_article(
+            self,
+            url: str,
+            crawl_options: Optional[Dict[str, Any]] = None,
+            profile: bool = False
+    ) -> Optional[Article]:
+        """
+        Обходит статьи начиная с url и генерирует summary корневой статьи.
+
+        :param crawl_options: Параметры обхода для WikipediaParser.configure
+        :param profile: Записать профиль обхода и суммаризации (см. core.profiling)
+        """
+        with profiling(f"parse_and_save {url}", enabled=profile or settings.PROFILING_ENABLED):
+            return await self._parse_and_save(url, crawl_options)
+
+    async def _parse_and_save(self, url: str, crawl_options: Optional[Dict[str, Any]]) -> Optional[Article]:
         try:
+            if crawl_options:
+                self.parser.configure(**crawl_options)
             success = await self.parser.parse_article(url)
             if not success:
                 logger.warning(f"Parsing completed but no new articles found for {url}")
                 return None
 
             # Get the root article
-            normalized_url = self.parser._normalize_url(url)
-            article = await self.article_repo.get_by_url(normalized_url)
+            lang, normalized_url = split_wiki_url(url)
+            article = await self.article_repo.get_with_summary(normalized_url, lang)
 
             if not article:
                 logger.error(f"Root article not found after parsing: {url}")
                 return None
 
             # Generate summary
-            await self._generate_summary(article)
+            with span("summarize"):
+                await self.summarize_article(article)
             await self.session.commit()
             return article
 
@@ -50,23 +72,43 @@ class ArticleService:
             logger.error(f"Error in parse_and_save_article: {str(e)}")
             raise
 
-    async def _generate_summary(self, article: Article) -> None:
+    async def summarize_article(self, article: Article) -> bool:
+        """
+        Создаёт или обновляет summary статьи.
+
+        :return: True, если у статьи есть актуальное summary (сохранённое сейчас или раньше)
+        """
         try:
             if not article.content:
                 logger.warning(f"No content to summarize for article {article.id}")
-                return
+                return False
+
+            content_hash = self.llm_service.content_hash(article)
+
+            # Reuse the summary when the caller loaded it eagerly, never trigger a lazy load
+            if 'summary' in inspect(article).unloaded:
+                existing = await self.summary_repo.exists_for_article(article.id)
+            else:
+                existing = article.summary
+            if existing and existing.content_hash == content_hash:
+                summary_cache.record_db_hit(content_hash, existing.content)
+                logger.info(f"Summary for article {article.id} is up to date")
+                return True
 
-            summary_text = await self.llm_service.generate_summary(article)
+            summary_text = await summary_cache.get(content_hash, self.summary_repo)
+            if summary_text is None:
+                summary_text = await self.llm_service.generate_summary(article)
 
-            if not summary_text:
-                logger.warning(f"Empty summary generated for article {article.id}")
-                return
+                if not summary_text:
+                    logger.warning(f"Empty summary generated for article {article.id}")
+                    return False
+                summary_cache.put(content_hash, summary_text)
 
-            summary = Summary(
-                article_id=article.id,
-                summary=summary_text,
-            )
-            await self.summary_repo.create(summary.article_id, summary.content)
+            if existing:
+                await self.summary_repo.update(existing, summary_text, content_hash)
+            else:
+                await self.summary_repo.create(article.id, summary_text, content_hash)
+            return True
 
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
@@ -0,0 +1,256 @@
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.metrics import DB_FLUSH_ROWS, DB_FLUSH_SECONDS
+from wiki_parser_app.core.profiling import span
+from wiki_parser_app.repositories.article_repo import ArticleRepository
+from wiki_parser_app.repositories.link_repo import LinkRepository
+
+
+DEADLOCK_SQLSTATE = '40P01'
+
+
+class ArticleWriteError(Exception):
+    """Пачку статей не удалось записать; обход нужно прервать."""
+
+
+class ArticleBatchWriter:
+    """
+    Буфер сохранения статей краулера.
+
+    Страницы копятся в буфере и пишутся одним многострочным
+    INSERT ... ON CONFLICT на пачку: при заполнении буфера или по таймеру.
+    id родителей берутся из карты url -> id, которую возвращает RETURNING.
+    Если store_links, вместе со статьями пишутся их исходящие ссылки.
+    Все статьи одного обхода относятся к языковому разделу self.lang.
+
+    Каждая пачка пишется в своей короткой транзакции со своей сессией,
+    поэтому блокировки строк не держатся до конца обхода и параллельные
+    обходы с общими статьями не ждут друг друга. Если пачку записать
+    не удалось, writer запоминает ошибку (self.error) и выставляет
+    self.failed — обход по нему прерывается.
+    """
+
+    def __init__(
+            self,
+            session_maker: async_sessionmaker,
+            store_links: bool = settings.CRAWL_STORE_LINKS,
+            batch_size: int = settings.CRAWL_DB_BATCH_SIZE,
+            flush_interval: float = settings.CRAWL_DB_FLUSH_INTERVAL,
+            deadlock_retries: int = settings.CRAWL_DB_DEADLOCK_RETRIES
+    ):
+        self.session_maker = session_maker
+        self.store_links = store_links
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.deadlock_retries = deadlock_retries
+        self.lang = settings.WIKI_DEFAULT_LANG
+        self.url_ids: Dict[str, uuid.UUID] = {}
+        self.flushes = 0
+        self.rows_written = 0
+        self.links_written = 0
+        self.flush_time = 0.0
+        self.deadlocks = 0
+        self.error: Optional[BaseException] = None
+        self.failed = asyncio.Event()
+        self._buffer: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    def reset(self) -> None:
+        """Сбрасывает состояние перед новым обходом; настройки сохраняются."""
+        self.url_ids = {}
+        self.flushes = 0
+        self.rows_written = 0
+        self.links_written = 0
+        self.flush_time = 0.0
+        self.deadlocks = 0
+        self.error = None
+        self.failed.clear()
+        self._buffer = []
+
+    def start(self) -> None:
+        self.error = None
+        self.failed.clear()
+        self._timer = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            await asyncio.gather(self._timer, return_exceptions=True)
+            self._timer = None
+        if self.error is None:
+            await self.flush()
+        else:
+            # The crawl is aborted, pages that were not written are dropped
+            self._buffer = []
+
+    async def known_urls(self, urls: List[str], fresh_for: Optional[timedelta] = None) -> Dict[str, uuid.UUID]:
+        """
+        Возвращает уже сохранённые статьи из urls и запоминает их id,
+        чтобы потомки могли ссылаться на них как на родителей.
+        """
+        async with self.session_maker() as session:
+            existing = await ArticleRepository(session).get_existing_urls(urls, fresh_for, self.lang)
+        self.url_ids.update(existing)
+        return existing
+
+    async def stored_links(self, urls: List[str]) -> Dict[str, List[str]]:
+        """
+        Сохранённые исходящие ссылки статей из urls в порядке документа.
+        Статьи должны быть уже найдены через known_urls.
+        """
+        url_by_id = {self.url_ids[url]: url for url in urls if url in self.url_ids}
+        if not url_by_id:
+            return {}
+        async with self.session_maker() as session:
+            targets = await LinkRepository(session).get_target_urls(list(url_by_id))
+        return {url_by_id[source_id]: links for source_id, links in targets.items()}
+
+    async def add(
+            self,
+            url: str,
+            title: str,
+            content: str,
+            level: int,
+            parent_url: Optional[str] = None,
+            links: Optional[List[str]] = None
+    ) -> None:
+        if self.error is not None:
+            raise ArticleWriteError("Article writer has failed") from self.error
+        self._buffer.append({
+            'url': url,
+            'title': title,
+            'content': content,
+            'level': level,
+            'parent_url': parent_url,
+            'links': links or [],
+        })
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        # Crawl workers and the flush timer take turns on the lock
+        with span("db_lock_wait"):
+            await self._lock.acquire()
+        try:
+            if self.error is not None:
+                raise ArticleWriteError("Article writer has failed") from self.error
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            with span("db_flush"):
+                await self._write_with_retries(batch)
+        finally:
+            self._lock.release()
+
+    async def _write_with_retries(self, batch: List[dict]) -> None:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                await self._write(batch)
+                break
+            except DBAPIError as e:
+                if getattr(e.orig, 'sqlstate', None) == DEADLOCK_SQLSTATE and attempt < self.deadlock_retries:
+                    # The transaction was rolled back as a whole, the batch is written again
+                    attempt += 1
+                    self.deadlocks += 1
+                    logger.warning(f"Deadlock while writing {len(batch)} articles, retry {attempt}")
+                    continue
+                self._fail(e)
+            except Exception as e:
+                self._fail(e)
+
+        self.flushes += 1
+        self.rows_written += len(batch)
+        elapsed = time.monotonic() - started
+        self.flush_time += elapsed
+        DB_FLUSH_SECONDS.observe(elapsed)
+        DB_FLUSH_ROWS.observe(len(batch))
+
+    def _fail(self, error: Exception) -> None:
+        self.error = error
+        self.failed.set()
+        logger.error(f"Could not write a batch of articles, aborting the crawl: {str(error)}")
+        raise ArticleWriteError(str(error)) from error
+
+    async def _write(self, batch: List[dict]) -> None:
+        # ids are published to url_ids only after commit, so a rolled back
+        # attempt never leaves ids of rows that do not exist
+        written: Dict[str, uuid.UUID] = {}
+        async with self.session_maker() as session:
+            article_repo = ArticleRepository(session)
+            # Parents are always shallower than their children, so inserting
+            # level by level lets every row resolve its parent id. Rows are
+            # ordered by url inside a level so concurrent crawls lock them
+            # in the same order
+            batch = sorted(batch, key=lambda row: (row['level'], row['url']))
+            for _, rows in groupby(batch, key=lambda row: row['level']):
+                values = [
+                    {
+                        'id': uuid.uuid4(),
+                        'lang': self.lang,
+                        'url': row['url'],
+                        'title': row['title'],
+                        'content': row['content'],
+                        'level': row['level'],
+                        'parsed': True,
+                        'parent_id': self._parent_id(row['parent_url'], written),
+                    }
+                    for row in rows
+                ]
+                written.update(await article_repo.bulk_upsert(values))
+
+            edges = []
+            if self.store_links:
+                edges = [
+                    {
+                        'id': uuid.uuid4(),
+                        'source_id': written[row['url']],
+                        'lang': self.lang,
+                        'target_url': target_url,
+                        'position': position,
+                    }
+                    for row in batch
+                    for position, target_url in enumerate(row['links'])
+                ]
+                await LinkRepository(session).bulk_insert(edges)
+
+            await session.commit()
+
+        self.url_ids.update(written)
+        self.links_written += len(edges)
+
+    def _parent_id(self, parent_url: Optional[str], written: Dict[str, uuid.UUID]) -> Optional[uuid.UUID]:
+        if not parent_url:
+            return None
+        return written.get(parent_url) or self.url_ids.get(parent_url)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except ArticleWriteError:
+                return
+            except Exception as e:
+                logger.error(f"Periodic flush failed: {str(e)}")
+
+    def as_dict(self) -> dict:
+        return {
+            'db_flushes': self.flushes,
+            'db_rows_written': self.rows_written,
+            'db_links_written': self.links_written,
+            'db_flush_time': round(self.flush_time, 3),
+            'db_deadlocks': self.deadlocks,
+        }
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from loguru import logger
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.http_client import HostSessions
+from wiki_parser_app.core.metrics import FETCH_ERRORS, FETCH_IN_FLIGHT, FETCH_RETRIES, FETCH_SECONDS, HTTP_RESPONSES
+from wiki_parser_app.core.profiling import span
+from wiki_parser_app.core.rate_limit import CircuitBreaker, TokenBucket, parse_retry_after
+
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class PoliteFetcher:
+    """
+    Слой поверх HTTP-сессии краулера.
+
+    - Запросы к каждому хосту ограничены своим token bucket.
+    - Ответы 429/5xx и сетевые ошибки повторяются с экспоненциальной
+      задержкой и jitter; заголовок Retry-After приостанавливает весь хост
+      ровно на указанное сервером время (не дольше retry_after_max, иначе
+      запрос не повторяется).
+    - При всплеске ошибок хоста его circuit breaker приостанавливает
+      запросы к этому хосту; остальные хосты обходятся как обычно.
+
+    Один экземпляр разделяется всеми обходами, поэтому лимиты общие.
+    Если переданы host_sessions, запросы к каждому хосту идут через его
+    собственную сессию, иначе через общую http_session.
+    """
+
+    def __init__(
+            self,
+            http_session: aiohttp.ClientSession,
+            requests_per_second: float = settings.FETCH_REQUESTS_PER_SECOND,
+            burst: int = settings.FETCH_BURST,
+            max_retries: int = settings.FETCH_MAX_RETRIES,
+            backoff_base: float = settings.FETCH_BACKOFF_BASE,
+            backoff_max: float = settings.FETCH_BACKOFF_MAX,
+            retry_after_max: float = settings.FETCH_RETRY_AFTER_MAX,
+            host_sessions: Optional[HostSessions] = None
+    ):
+        self.http_session = http_session
+        self.host_sessions = host_sessions
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._paused_until: Dict[str, float] = {}
+        self.requests = 0
+        self.retries = 0
+        self.retries_by_reason: Dict[str, int] = defaultdict(int)
+        self.gave_up = 0
+        self.retry_after_wait = 0.0
+        self.backoff_wait = 0.0
+
+    @asynccontextmanager
+    async def get(
+            self,
+            url: str,
+            headers: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Аналог http_session.get(url, headers=headers) с лимитами и повторами.
+
+        Если повторы исчерпаны, отдаётся последний ответ (например, 429),
+        чтобы вызывающий код обработал его как обычный неуспешный ответ.
+        """
+        response = await self._request(url, headers)
+        try:
+            yield response
+        finally:
+            self._release(response)
+
+    async def _request(self, url: str, headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        host = urlsplit(url).hostname or ""
+        breaker = self._breaker(host)
+        attempt = 0
+        while True:
+            with span("throttle"):
+                await breaker.wait()
+                await self._wait_for_host(host)
+                await self._bucket(host).acquire()
+            self.requests += 1
+
+            started = time.perf_counter()
+            try:
+                response = await self._send(host, url, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                FETCH_ERRORS.labels(type(e).__name__).inc()
+                breaker.record(False)
+                if attempt >= self.max_retries:
+                    self.gave_up += 1
+                    raise
+                reason = type(e).__name__
+                delay = self._backoff(attempt)
+            else:
+                FETCH_SECONDS.labels(host).observe(time.perf_counter() - started)
+                HTTP_RESPONSES.labels(response.status).inc()
+                if response.status not in RETRY_STATUSES:
+                    breaker.record(True)
+                    return response
+                breaker.record(False)
+                if attempt >= self.max_retries:
+                    self.gave_up += 1
+                    return response
+                reason = str(response.status)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.retry_after_max:
+                    # Retrying earlier than the server asked would only be refused again
+                    logger.warning(f"Fetch of {url} failed ({reason}), Retry-After {retry_after:.0f}s is too long")
+                    self.gave_up += 1
+                    return response
+                self._release(response)
+                if retry_after is not None:
+                    # The server asked the whole host to slow down, not just this request
+                    delay = retry_after
+                    self._paused_until[host] = max(self._paused_until.get(host, 0.0), time.monotonic() + delay)
+                    self.retry_after_wait += delay
+                else:
+                    delay = self._backoff(attempt)
+
+            attempt += 1
+            self.retries += 1
+            self.retries_by_reason[reason] += 1
+            FETCH_RETRIES.labels(reason).inc()
+            logger.warning(f"Fetch of {url} failed ({reason}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _send(self, host: str, url: str, headers: Optional[Dict[str, str]]) -> aiohttp.ClientResponse:
+        """Сам HTTP-запрос: страница считается в работе до _release() ответа, без ожидания лимитов и повторов."""
+        FETCH_IN_FLIGHT.inc()
+        try:
+            return await self._session(host).get(url, headers=headers)
+        except BaseException:
+            FETCH_IN_FLIGHT.dec()
+            raise
+
+    @staticmethod
+    def _release(response: aiohttp.ClientResponse) -> None:
+        response.release()
+        FETCH_IN_FLIGHT.dec()
+
+    def _session(self, host: str) -> aiohttp.ClientSession:
+        if self.host_sessions is not None and host:
+            return self.host_sessions.get(host)
+        return self.http_session
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(
+                settings.FETCH_BREAKER_WINDOW,
+                settings.FETCH_BREAKER_MIN_REQUESTS,
+                settings.FETCH_BREAKER_ERROR_RATE,
+                settings.FETCH_BREAKER_COOLDOWN
+            )
+        return self._breakers[host]
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+        return self._buckets[host]
+
+    async def _wait_for_host(self, host: str) -> None:
+        delay = self._paused_until.get(host, 0.0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        self.backoff_wait += delay
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'retries_by_reason': dict(self.retries_by_reason),
+            'gave_up': self.gave_up,
+            'throttle_wait': round(sum(bucket.wait_time for bucket in self._buckets.values()), 3),
+            'retry_after_wait': round(self.retry_after_wait, 3),
+            'backoff_wait': round(self.backoff_wait, 3),
+            'breaker_open': [host for host, breaker in self._breakers.items() if breaker.is_open],
+            'breaker_opened': sum(breaker.opened for breaker in self._breakers.values()),
+            'breaker_wait': round(sum(breaker.wait_time for breaker in self._breakers.values()), 3),
+            'throttle_wait_by_host': {
+                host: round(bucket.wait_time, 3) for host, bucket in self._buckets.items()
+            },
+        }
@@ -0,0 +1,179 @@
+import asyncio
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.profiling import profiling
+from wiki_parser_app.models.jobs import Job, JobStatus
+from wiki_parser_app.repositories.job_repo import JobRepository
+from wiki_parser_app.services.article_service import ArticleService
+from wiki_parser_app.services.parser_service import CrawlStats
+
+
+class JobQueueFull(Exception):
+    """Очередь заданий заполнена, новое задание принять нельзя."""
+
+
+class JobManager:
+    """
+    Фоновое выполнение заданий на парсинг.
+
+    POST /parse только создаёт запись в таблице jobs и ставит её id в очередь.
+    Задания выполняют self.workers воркеров, каждый со своей сессией БД;
+    прогресс обхода периодически записывается в строку задания.
+
+    Место в очереди резервируется до записи задания в БД, поэтому
+    параллельные submit не переполняют очередь. Незавершённые задания,
+    найденные при старте и не поместившиеся в очередь, ждут в self._backlog
+    и попадают в очередь по мере её освобождения.
+    """
+
+    def __init__(
+            self,
+            session_maker: async_sessionmaker,
+            service_factory: Callable[[AsyncSession], ArticleService],
+            workers: int = settings.JOB_WORKERS,
+            queue_size: int = settings.JOB_QUEUE_SIZE,
+            progress_interval: float = settings.JOB_PROGRESS_INTERVAL
+    ):
+        self.session_maker = session_maker
+        self.service_factory = service_factory
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._reserved = 0
+        self._backlog: deque = deque()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        # Jobs left unfinished by a previous process are picked up again
+        async with self.session_maker() as session:
+            unfinished = await JobRepository(session).list_unfinished()
+        for job in unfinished:
+            self._backlog.append((job.id, job.url, job.options, False))
+        self._refill()
+        if self._backlog:
+            logger.warning(f"{len(self._backlog)} unfinished jobs wait for a free queue slot")
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, url: str, options: Optional[Dict[str, Any]] = None, profile: bool = False) -> Job:
+        """
+        Создаёт задание и ставит его в очередь.
+
+        :param options: Параметры обхода (max_depth, fan_out, max_pages, link_strategy)
+        :param profile: Записать профиль выполнения; профиль доступен
+            по GET /admin/profiles/{id задания}
+        """
+        if not self._has_room():
+            raise JobQueueFull("Too many crawl jobs in progress")
+
+        # The slot is held across the insert, so concurrent submits cannot take it
+        self._reserved += 1
+        try:
+            async with self.session_maker() as session:
+                job = await JobRepository(session).create(url, options)
+                await session.commit()
+        finally:
+            self._reserved -= 1
+
+        self._queue.put_nowait((job.id, job.url, job.options, profile))
+        return job
+
+    def _refill(self) -> None:
+        """Переносит задания из backlog в освободившиеся места очереди."""
+        while self._backlog and self._has_room():
+            self._queue.put_nowait(self._backlog.popleft())
+
+    def _has_room(self) -> bool:
+        return self._queue.maxsize <= 0 or self._queue.qsize() + self._reserved < self._queue.maxsize
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, url, options, profile = await self._queue.get()
+            self._refill()
+            try:
+                with profiling(
+                        f"job {job_id} {url}",
+                        profile_id=str(job_id),
+                        enabled=profile or settings.PROFILING_ENABLED
+                ):
+                    await self._run(job_id, url, options)
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: uuid.UUID, url: str, options: Optional[Dict[str, Any]] = None) -> None:
+        await self._update(job_id, status=JobStatus.RUNNING, started_at=func.now())
+        stats: Optional[CrawlStats] = None
+        try:
+            async with self.session_maker() as session:
+                service = self.service_factory(session)
+                reporter = asyncio.create_task(self._report_progress(job_id, service))
+                try:
+                    article = await service.parse_and_save_article(url, options)
+                finally:
+                    reporter.cancel()
+                    await asyncio.gather(reporter, return_exceptions=True)
+                    stats = service.parser.stats
+
+            if article:
+                await self._update(
+                    job_id,
+                    status=JobStatus.COMPLETED,
+                    article_id=article.id,
+                    finished_at=func.now(),
+                    **self._progress(stats)
+                )
+            else:
+                await self._update(
+                    job_id,
+                    status=JobStatus.FAILED,
+                    error="Article not found or could not be parsed",
+                    finished_at=func.now(),
+                    **self._progress(stats)
+                )
+
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            await self._update(
+                job_id,
+                status=JobStatus.FAILED,
+                error=str(e),
+                finished_at=func.now(),
+                **(self._progress(stats) if stats else {})
+            )
+
+    async def _report_progress(self, job_id: uuid.UUID, service: ArticleService) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            try:
+                await self._update(job_id, **self._progress(service.parser.stats))
+            except Exception as e:
+                logger.warning(f"Could not report progress of job {job_id}: {str(e)}")
+
+    async def _update(self, job_id: uuid.UUID, **values) -> None:
+        async with self.session_maker() as session:
+            await JobRepository(session).update(job_id, **values)
+            await session.commit()
+
+    @staticmethod
+    def _progress(stats: CrawlStats) -> dict:
+        return {
+            'pages_fetched': stats.pages_fetched,
+            'pages_failed': stats.pages_failed,
+            'pages_deduped': stats.pages_deduped,
+            'depth_reached': stats.max_depth_reached,
+        }
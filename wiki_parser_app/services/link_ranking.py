@@ -0,0 +1,43 @@
+from typing import Callable, Dict, List, Sequence, Set
+
+
+def _by_order(links: List[str], counts: Dict[str, int], lead: Set[str]) -> List[str]:
+    return links
+
+
+def _by_frequency(links: List[str], counts: Dict[str, int], lead: Set[str]) -> List[str]:
+    # sorted() is stable, so links with equal counts keep document order
+    return sorted(links, key=lambda link: -counts.get(link, 1))
+
+
+def _by_lead(links: List[str], counts: Dict[str, int], lead: Set[str]) -> List[str]:
+    return sorted(links, key=lambda link: link not in lead)
+
+
+LINK_STRATEGIES: Dict[str, Callable[[List[str], Dict[str, int], Set[str]], List[str]]] = {
+    "order": _by_order,
+    "frequency": _by_frequency,
+    "lead": _by_lead,
+}
+
+
+def rank_links(
+        links: Sequence[str],
+        strategy: str = "order",
+        counts: Sequence[int] = (),
+        lead_links: Sequence[str] = ()
+) -> List[str]:
+    """
+    Упорядочивает ссылки страницы для выбора дочерних статей.
+
+    Стратегии:
+    - order: порядок появления в тексте;
+    - frequency: сначала ссылки, встречающиеся на странице чаще;
+    - lead: сначала ссылки из вводной части статьи (до первого заголовка h2).
+
+    Результат детерминирован: при равенстве сохраняется порядок в документе.
+    """
+    if strategy not in LINK_STRATEGIES:
+        raise ValueError(f"Unknown link strategy: {strategy!r}")
+    links = list(links)
+    return LINK_STRATEGIES[strategy](links, dict(zip(links, counts)), set(lead_links))
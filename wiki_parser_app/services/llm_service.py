@@ -1,41 +1,254 @@
+import asyncio
+import hashlib
+import re
+import time
+from typing import AsyncIterator, List
+
 from openai import AsyncOpenAI
 
+from wiki_parser_app.core.cache import TTLCache
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.metrics import LLM_ERRORS, LLM_FIRST_TOKEN_SECONDS, LLM_SECONDS, LLM_TOKENS
+from wiki_parser_app.core.profiling import span
 from wiki_parser_app.models.articles import Article
 
 
+SUMMARY_PROMPT = "Напиши краткое резюме статьи {language}"
+CHUNK_PROMPT = "Кратко перескажи фрагмент статьи {language}, сохранив ключевые факты"
+REDUCE_PROMPT = (
+    "Ниже краткие пересказы последовательных фрагментов одной статьи. "
+    "Объедини их в одно краткое резюме статьи {language}"
+)
+
+# Язык ответа LLM совпадает с языком раздела Wikipedia, из которого взята статья
+LANGUAGES = {
+    "ru": "на русском языке",
+    "en": "на английском языке",
+    "de": "на немецком языке",
+    "fr": "на французском языке",
+    "es": "на испанском языке",
+    "it": "на итальянском языке",
+    "pt": "на португальском языке",
+    "uk": "на украинском языке",
+    "be": "на белорусском языке",
+    "kk": "на казахском языке",
+    "pl": "на польском языке",
+    "zh": "на китайском языке",
+    "ja": "на японском языке",
+}
+DEFAULT_LANGUAGE = "на языке самой статьи"
+
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+# Summaries of individual chunks, keyed by chunk hash: re-summarizing an
+# edited article only calls the LLM for the chunks that actually changed
+chunk_summary_cache = TTLCache(settings.SUMMARY_CHUNK_CACHE_SIZE, settings.SUMMARY_CHUNK_CACHE_TTL)
+
+
+def _sha256(*parts: str) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _split_paragraph(paragraph: str, max_chars: int) -> List[str]:
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+
+    pieces: List[str] = []
+    current = ""
+    for sentence in SENTENCE_END.split(paragraph):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Делит текст на фрагменты не длиннее max_chars по границам абзацев;
+    слишком длинные абзацы делятся по предложениям.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for piece in _split_paragraph(paragraph, max_chars):
+            if current and size + len(piece) + 2 > max_chars:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
 class SummaryService:
     def __init__(self, api_key: str):
         self.client = AsyncOpenAI(
             api_key=api_key,
-            base_url="https://api.deepseek.com",
+            base_url=settings.LLM_BASE_URL,
+            # Retries are done by RateLimitedSummaryService, which charges every attempt to the rate limits
+            max_retries=0,
         )
 
+    @staticmethod
+    def is_long(text: str) -> bool:
+        """Нужен ли тексту режим map-reduce вместо одного запроса."""
+        return settings.SUMMARY_MODE == "map_reduce" and len(text) > settings.LLM_MAX_INPUT_CHARS
+
+    @staticmethod
+    def prompt_input(article: Article) -> str:
+        """Текст статьи в том виде, в каком он уходит в LLM."""
+        content = article.content or ""
+        if SummaryService.is_long(content):
+            return content
+        return content[:settings.LLM_MAX_INPUT_CHARS]
+
+    @staticmethod
+    def language(article: Article) -> str:
+        return LANGUAGES.get(article.lang, DEFAULT_LANGUAGE)
+
+    @staticmethod
+    def content_hash(article: Article) -> str:
+        """
+        Хэш всего, от чего зависит summary статьи: модели, промптов, языка
+        ответа и текста, уходящего в LLM. Смена любого из них меняет хэш,
+        и сохранённое summary считается устаревшим.
+        """
+        prompts = (CHUNK_PROMPT, REDUCE_PROMPT) if SummaryService.is_long(article.content or "") else (SUMMARY_PROMPT,)
+        return _sha256(
+            settings.LLM_MODEL, *prompts, SummaryService.language(article), SummaryService.prompt_input(article))
+
+    @staticmethod
+    def _messages(system: str, user: str) -> list[dict]:
+        return [
+            {
+                "role": "system",
+                "content": system
+            },
+            {
+                "role": "user",
+                "content": user
+            }
+        ]
+
+    @staticmethod
+    def _observe_usage(usage) -> None:
+        if usage is not None:
+            LLM_TOKENS.labels('prompt').observe(usage.prompt_tokens)
+            LLM_TOKENS.labels('completion').observe(usage.completion_tokens)
+
+    async def _complete(self, system: str, user: str) -> str:
+        started = time.perf_counter()
+        try:
+            with span("llm"):
+                response = await self.client.chat.completions.create(
+                    model=settings.LLM_MODEL,
+                    messages=self._messages(system, user),
+                    temperature=0.5,
+                    max_tokens=settings.LLM_MAX_TOKENS,
+                    stream=False
+                )
+        except Exception:
+            LLM_ERRORS.labels('complete').inc()
+            raise
+        LLM_SECONDS.labels('complete').observe(time.perf_counter() - started)
+        self._observe_usage(response.usage)
+
+        summary = response.choices[0].message.content.strip()
+        if not summary:
+            raise ValueError("LLM вернул пустой ответ")
+        return summary
+
+    async def _prepare(self, article: Article) -> tuple[str, str]:
+        """
+        Возвращает системный промпт и текст для финального запроса.
+
+        Длинная статья делится на фрагменты, которые пересказываются
+        параллельно (map); финальный запрос объединяет пересказы (reduce).
+        """
+        language = self.language(article)
+        prompt_input = self.prompt_input(article)
+        if not self.is_long(prompt_input):
+            return SUMMARY_PROMPT.format(language=language), prompt_input
+
+        combined = "\n\n".join(await self._summarize_chunks(prompt_input, language))
+        # Partial summaries that still do not fit into one request are reduced again
+        while len(combined) > settings.LLM_MAX_INPUT_CHARS:
+            shorter = "\n\n".join(await self._summarize_chunks(combined, language))
+            if len(shorter) >= len(combined):
+                combined = shorter[:settings.LLM_MAX_INPUT_CHARS]
+                break
+            combined = shorter
+        return REDUCE_PROMPT.format(language=language), combined
+
+    async def _summarize_chunks(self, text: str, language: str) -> List[str]:
+        chunks = split_into_chunks(text, int(settings.LLM_CHUNK_TOKENS * settings.LLM_CHARS_PER_TOKEN))
+        semaphore = asyncio.Semaphore(settings.LLM_CHUNK_CONCURRENCY)
+
+        async def summarize_chunk(chunk: str) -> str:
+            key = _sha256(settings.LLM_MODEL, CHUNK_PROMPT, language, chunk)
+            cached = chunk_summary_cache.get(key)
+            if cached is not None:
+                return cached
+            async with semaphore:
+                summary = await self._complete(CHUNK_PROMPT.format(language=language), chunk)
+            chunk_summary_cache.set(key, summary)
+            return summary
+
+        return list(await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks)))
+
     async def generate_summary(self, article: Article) -> str:
         if not article.content:
             raise ValueError("Article content is empty")
 
         try:
-            response = await self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Напиши краткое резюме статьи на русском языке"
-                    },
-                    {
-                        "role": "user",
-                        "content": article.content[:8000]
-                    }
-                ],
-                temperature=0.5,
-                max_tokens=512,
-                stream=False
-            )
-
-            summary = response.choices[0].message.content.strip()
-            if not summary:
-                raise ValueError("LLM вернул пустой ответ")
-            return summary
+            system, user = await self._prepare(article)
+            return await self._complete(system, user)
+
+        except Exception as e:
+            raise RuntimeError(f"Ошибка генерации summary: {str(e)}") from e
+
+    async def stream_summary(self, article: Article) -> AsyncIterator[str]:
+        """Генерирует summary потоком, отдавая фрагменты текста по мере их прихода."""
+        if not article.content:
+            raise ValueError("Article content is empty")
+
+        try:
+            system, user = await self._prepare(article)
+            started = time.perf_counter()
+            first_token = True
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=settings.LLM_MODEL,
+                    messages=self._messages(system, user),
+                    temperature=0.5,
+                    max_tokens=settings.LLM_MAX_TOKENS,
+                    stream=True,
+                    # The last chunk then carries token usage for the whole response
+                    stream_options={"include_usage": True}
+                )
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        self._observe_usage(chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first_token:
+                            LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                            first_token = False
+                        yield chunk.choices[0].delta.content
+            except Exception:
+                LLM_ERRORS.labels('stream').inc()
+                raise
+            LLM_SECONDS.labels('stream').observe(time.perf_counter() - started)
 
         except Exception as e:
-            raise RuntimeError(f"Ошибка генерации summary: {str(e)}")
+            raise RuntimeError(f"Ошибка генерации summary: {str(e)}") from e
@@ -0,0 +1,142 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from loguru import logger
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+
+
+class MediaWikiApiBackend:
+    """
+    Загрузка статей через MediaWiki Action API вместо HTML-страниц.
+
+    Ссылки на статьи (prop=links) для пачки до batch_size заголовков
+    приходят одним запросом action=query, редиректы разрешаются на стороне
+    сервера (redirects=1); ответ дозапрашивается по continue. Полный текст
+    (prop=extracts, plain text) TextExtracts отдаёт только для одной
+    статьи за запрос, поэтому тексты загружаются отдельными запросами
+    по заголовку, параллельно.
+
+    API отдаёт ссылки страницы в алфавитном порядке, без позиций в тексте.
+    """
+
+    def __init__(
+            self,
+            fetcher: PoliteFetcher,
+            api_url: str,
+            max_content: int = settings.PARSER_MAX_CONTENT,
+            max_links: Optional[int] = None
+    ):
+        self.fetcher = fetcher
+        self.api_url = api_url
+        self.max_content = max_content
+        self.max_links = max_links
+        self.requests = 0
+
+    async def fetch_batch(self, titles: List[str]) -> Dict[str, Optional[dict]]:
+        """
+        Загружает статьи пачкой.
+
+        :param titles: Нормализованные заголовки (через подчёркивание)
+        :return: Заголовок -> словарь с ключами title, content, links,
+            link_counts и lead_links, или None, если статьи нет или её
+            текст не удалось загрузить
+        """
+        pages, aliases = await self._fetch_links(titles)
+        resolved = {title: self._resolve(title, aliases) for title in titles}
+
+        existing = [title for title in dict.fromkeys(resolved.values()) if title in pages]
+        extracts = await asyncio.gather(*(self._fetch_extract(title) for title in existing), return_exceptions=True)
+        for title, extract in zip(existing, extracts):
+            if isinstance(extract, Exception):
+                logger.error(f"Extract error for {title}: {str(extract)}")
+                del pages[title]
+            else:
+                pages[title]['extract'] = extract
+
+        return {title: self._article(resolved[title], pages) for title in titles}
+
+    async def _fetch_links(self, titles: List[str]) -> Tuple[Dict[str, dict], Dict[str, str]]:
+        """Ссылки существующих статей пачки и карта алиасов заголовков."""
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'formatversion': '2',
+            'prop': 'links',
+            'plnamespace': '0',
+            'pllimit': 'max',
+            'redirects': '1',
+            'titles': '|'.join(titles),
+        }
+        pages: Dict[str, dict] = {}
+        aliases: Dict[str, str] = {}
+        continuation: dict = {}
+        while True:
+            data = await self._query(params | continuation)
+            query = data.get('query', {})
+            # normalized maps "A_b" -> "A b", redirects map "A b" -> target title
+            for alias in query.get('normalized', []) + query.get('redirects', []):
+                aliases[alias['from']] = alias['to']
+            for page in query.get('pages', []):
+                if page.get('missing') or page.get('invalid'):
+                    continue
+                merged = pages.setdefault(page['title'], {'extract': None, 'links': []})
+                merged['links'].extend(link['title'] for link in page.get('links', []))
+            if 'continue' not in data:
+                break
+            continuation = data['continue']
+        return pages, aliases
+
+    async def _fetch_extract(self, title: str) -> str:
+        """Полный текст одной статьи; title уже разрешён через редиректы."""
+        data = await self._query({
+            'action': 'query',
+            'format': 'json',
+            'formatversion': '2',
+            'prop': 'extracts',
+            'explaintext': '1',
+            'exsectionformat': 'plain',
+            'titles': title,
+        })
+        pages = data.get('query', {}).get('pages', [])
+        return (pages[0].get('extract') if pages else None) or ''
+
+    async def _query(self, params: dict) -> dict:
+        self.requests += 1
+        async with self.fetcher.get(f"{self.api_url}?{urlencode(params)}") as response:
+            if response.status != 200:
+                raise RuntimeError(f"MediaWiki API returned HTTP {response.status}")
+            data = await response.json(content_type=None)
+        if 'error' in data:
+            raise RuntimeError(f"MediaWiki API error: {data['error'].get('info', data['error'])}")
+        for warning in data.get('warnings', {}).values():
+            logger.warning(f"MediaWiki API warning: {warning}")
+        return data
+
+    @staticmethod
+    def _resolve(title: str, aliases: Dict[str, str]) -> str:
+        seen = set()
+        while title in aliases and title not in seen:
+            seen.add(title)
+            title = aliases[title]
+        return title
+
+    def _article(self, title: str, pages: Dict[str, dict]) -> Optional[dict]:
+        page = pages.get(title)
+        if page is None:
+            return None
+
+        # Plain extracts separate paragraphs with a single newline
+        paragraphs = [line.strip() for line in page['extract'].split('\n') if line.strip()]
+        links = [link.replace(' ', '_') for link in dict.fromkeys(page['links'])]
+        if self.max_links is not None:
+            links = links[:self.max_links]
+        return {
+            'title': title,
+            'content': '\n\n'.join(paragraphs)[:self.max_content],
+            'links': links,
+            'link_counts': [1] * len(links),
+            'lead_links': [],
+        }
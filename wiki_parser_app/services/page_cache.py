@@ -0,0 +1,181 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from loguru import logger
+
+from wiki_parser_app.core.config import settings
+
+
+class PageCache:
+    """
+    Дисковый кэш сырых HTML-страниц, сжатых gzip.
+
+    Каждая страница хранится в отдельном файле вместе с валидаторами
+    (ETag, Last-Modified), чтобы при повторной загрузке отправить условный
+    запрос и на ответ 304 взять тело из кэша. Общий размер файлов ограничен
+    max_bytes, при переполнении удаляются давно не использованные страницы.
+    В режиме offline сеть не используется вовсе: обход идёт только по кэшу.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            max_bytes: int = settings.PAGE_CACHE_MAX_BYTES,
+            offline: bool = settings.PAGE_CACHE_OFFLINE
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        # file name -> size, ordered from least to most recently used
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".gz")]
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            size = entry.stat().st_size
+            self._index[entry.name] = size
+            self._total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def _file_name(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest() + ".gz"
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    async def get(self, url: str) -> Optional[dict]:
+        """
+        Возвращает запись кэша: словарь с ключами body, encoding, etag
+        и last_modified, или None, если страницы в кэше нет.
+        """
+        name = self._file_name(url)
+        if name not in self._index:
+            return None
+        try:
+            entry = await asyncio.to_thread(self._read, self._path(name))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable page cache entry for {url}: {str(e)}")
+            self._remove(name)
+            return None
+        self._index.move_to_end(name)
+        return entry
+
+    async def put(
+            self,
+            url: str,
+            body: bytes,
+            encoding: str,
+            etag: Optional[str],
+            last_modified: Optional[str]
+    ) -> None:
+        name = self._file_name(url)
+        meta = {'url': url, 'encoding': encoding, 'etag': etag, 'last_modified': last_modified}
+        try:
+            size = await asyncio.to_thread(self._write, self._path(name), meta, body)
+        except OSError as e:
+            logger.warning(f"Could not store {url} in page cache: {str(e)}")
+            return
+
+        self._total_bytes += size - self._index.pop(name, 0)
+        self._index[name] = size
+        self.stores += 1
+        self._evict()
+
+    async def refresh(self, url: str, entry: dict, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        Обновляет запись по ответу 304: тело остаётся прежним, а валидаторы,
+        присланные сервером, заменяют сохранённые. Если они не изменились,
+        файл не перезаписывается — свежесть записи уже обновил get().
+        """
+        etag = etag or entry['etag']
+        last_modified = last_modified or entry['last_modified']
+        if (etag, last_modified) != (entry['etag'], entry['last_modified']):
+            await self.put(url, entry['body'], entry['encoding'], etag, last_modified)
+            entry['etag'], entry['last_modified'] = etag, last_modified
+
+    def validators(self, entry: Optional[dict]) -> Dict[str, str]:
+        """Заголовки условного запроса для записи кэша."""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        with gzip.open(path, "rb") as file:
+            meta = json.loads(file.readline())
+            meta['body'] = file.read()
+        # Touch the file so that recency survives a restart
+        os.utime(path)
+        return meta
+
+    @staticmethod
+    def _write(path: str, meta: dict, body: bytes) -> int:
+        # A unique temporary file per write: concurrent puts of the same url
+        # (overlapping jobs) must not write into one file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as file:
+                file.write(json.dumps(meta).encode("utf-8") + b"\n")
+                file.write(body)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return size
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            name = next(iter(self._index))
+            self._remove(name)
+            self.evictions += 1
+
+    def _remove(self, name: str) -> None:
+        self._total_bytes -= self._index.pop(name, 0)
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            'offline': self.offline,
+            'entries': len(self._index),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_ratio': round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+        }
+
+
+def create_page_cache() -> Optional[PageCache]:
+    """Создаёт кэш страниц, если задан PAGE_CACHE_DIR."""
+    if not settings.PAGE_CACHE_DIR:
+        return None
+    return PageCache(settings.PAGE_CACHE_DIR)
@@ -0,0 +1,343 @@
+import re
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+
+from wiki_parser_app.core.config import settings
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+
+LINK_PATTERN = re.compile(r"^/wiki/(?!.*:).*")
+TRACKED_TAGS = frozenset(["h1", "h2", "div", "a", "table", "span"])
+SKIP_TAGS = frozenset(["table", "div", "span"])
+SKIP_CLASSES = ("hatnote", "thumb", "mw-editsection")
+# A paragraph break is emitted on both the start and the end of these elements,
+# so it does not matter whether a backend closes an unclosed <p> or <li> right
+# before the next block or only at the end of the parent element
+BLOCK_TAGS = frozenset([
+    "p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "dl", "li", "dt", "dd", "blockquote", "pre", "hr",
+    "table", "caption", "thead", "tbody", "tfoot", "tr", "td", "th", "figure", "figcaption", "center", "address",
+    "form", "section", "article", "aside", "header", "footer", "nav", "main",
+])
+# Marks a block boundary in the collected fragments; never occurs in page text
+PARAGRAPH_BREAK = "\x1e"
+# Elements without an end tag, never left open
+VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+])
+# Tree building rules of libxml2 (the lxml backend), repeated by the html.parser
+# backend. A start tag closes the current element while it is one of these:
+_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+_FONT_STYLE = ("b", "i", "u", "s", "small", "big", "tt")
+IMPLIED_CLOSE = {tag: frozenset(closes) for tag, closes in {
+    "p": ("p", *_HEADINGS, *_FONT_STYLE),
+    **{heading: ("p",) for heading in _HEADINGS},
+    "ul": ("p", "pre", "address"),
+    "ol": ("p",),
+    "dl": ("p", "dt", "pre", "address"),
+    "li": ("p", "li", "dl", "pre", "address", *_HEADINGS),
+    "dt": ("p", "dt", "dd", "pre", "address"),
+    "dd": ("p", "dt", "dd", "pre", "address"),
+    "blockquote": ("p",),
+    "pre": ("p", "ul"),
+    "address": ("p", "ul"),
+    "center": ("p", "b", "i", "font"),
+    "form": ("p", "form", "ul", "ol", "dl", "pre", "address", *_HEADINGS),
+    "hr": ("p",),
+    "table": ("p", "pre", "a", *_HEADINGS),
+    "caption": ("p",),
+    "thead": ("caption",),
+    "tbody": ("p", "thead", "tbody", "tfoot", "tr", "td", "th", "caption"),
+    "tfoot": ("p", "thead", "tbody", "tr", "td", "th", "caption"),
+    "tr": ("p", "tr", "td", "th", "caption"),
+    "td": ("p", "td", "th", "b", "i", "u", "a", "span", "font"),
+    "th": ("p", "td", "th", "b", "i", "u", "a", "span", "font"),
+    "a": ("a",),
+}.items()}
+# An end tag is ignored if an element with a higher priority is open inside
+# the element it would close; other elements have priority 100
+END_PRIORITY = {
+    "div": 150, "td": 160, "th": 160, "tr": 170, "thead": 180, "tbody": 180, "tfoot": 180,
+    "table": 190, "head": 200, "body": 200, "html": 220,
+}
+
+
+class PageExtractor(ABC):
+    """
+    Общая логика извлечения заголовка, текста и ссылок статьи.
+
+    Бэкенды разбора HTML только транслируют свои события в
+    _start/_data/_end, поэтому результат не зависит от бэкенда.
+    Фрагменты текста копятся в списке и склеиваются один раз;
+    как только набран лимит текста и ссылок, done становится True.
+    """
+
+    def __init__(self, max_content: int = settings.PARSER_MAX_CONTENT, max_links: Optional[int] = None):
+        self.max_content = max_content
+        self.max_links = max_links
+        self._level = 0
+        self._wrapper_tag = ""
+        # href -> number of occurrences; dict order is document order
+        self._found_links: Dict[str, int] = {}
+        self._lead_links: Set[str] = set()
+        self._in_lead = True
+        self._title_parts: List[str] = []
+        self._content_parts: List[str] = []
+        self._content_size = 0
+        self._in_title = False
+        self._in_content = False
+        self._at_boundary = False
+        self._skip_tag = ""
+        self._skip_level = 0
+
+    @abstractmethod
+    def feed(self, data: str) -> None:
+        """Передаёт бэкенду очередной фрагмент HTML."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Завершает разбор и закрывает оставшиеся открытыми элементы."""
+
+    @property
+    def title(self) -> str:
+        return " ".join("".join(self._title_parts).split())
+
+    @property
+    def content(self) -> str:
+        """Текст статьи: абзацы разделены пустой строкой, пробелы внутри абзаца схлопнуты."""
+        paragraphs = (" ".join(block.split()) for block in "".join(self._content_parts).split(PARAGRAPH_BREAK))
+        return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)[:self.max_content]
+
+    @property
+    def done(self) -> bool:
+        content_full = self._content_size >= self.max_content
+        links_full = self.max_links is not None and len(self._found_links) >= self.max_links
+        return content_full and links_full
+
+    def get_found_links(self) -> List[str]:
+        """Ссылки на статьи в порядке их появления в документе."""
+        return list(self._found_links)
+
+    def result(self) -> dict:
+        return {
+            'title': self.title,
+            'content': self.content,
+            'links': self.get_found_links(),
+            'link_counts': list(self._found_links.values()),
+            'lead_links': [link for link in self._found_links if link in self._lead_links],
+        }
+
+    def _start(self, tag: str, attrs: dict) -> None:
+        # Detect title
+        if tag == "h1" and attrs.get("id") == "firstHeading":
+            self._in_title = True
+
+        # Detect content area and track nesting of the wrapper tag inside it
+        if tag == "div" and attrs.get("id") == "bodyContent":
+            self._level = 1
+            self._wrapper_tag = tag
+            self._in_content = True
+        elif self._level > 0 and tag == self._wrapper_tag:
+            self._level += 1
+
+        # The lead section ends at the first second-level heading
+        if tag == "h2" and self._in_content:
+            self._in_lead = False
+
+        # Collect links
+        if self._level > 0 and tag == "a":
+            href = attrs.get("href")
+            if href and LINK_PATTERN.match(href):
+                if href in self._found_links:
+                    self._found_links[href] += 1
+                elif self.max_links is None or len(self._found_links) < self.max_links:
+                    self._found_links[href] = 1
+                else:
+                    return
+                if self._in_lead:
+                    self._lead_links.add(href)
+
+        # Skip unwanted elements together with everything nested in them
+        if self._skip_level:
+            if tag == self._skip_tag:
+                self._skip_level += 1
+        elif tag in SKIP_TAGS:
+            css_class = attrs.get("class") or ""
+            if any(name in css_class for name in SKIP_CLASSES):
+                self._skip_tag = tag
+                self._skip_level = 1
+
+    def _block(self) -> None:
+        # Past the content cap the breaks would only pile up in the list
+        if self._in_content and self._content_size < self.max_content:
+            self._content_parts.append(PARAGRAPH_BREAK)
+
+    def _data(self, data: str) -> None:
+        if self._in_title:
+            self._title_parts.append(data)
+        elif self._in_content and not self._skip_level and self._content_size < self.max_content:
+            # Text split by a tag is separated by a space; text split by a
+            # feed() chunk boundary or an entity is glued back together
+            if self._at_boundary:
+                self._content_parts.append(" ")
+                self._at_boundary = False
+            self._content_parts.append(data)
+            self._content_size += len(data) + 1
+
+    def _end(self, tag: str) -> None:
+        if tag == "h1" and self._in_title:
+            self._in_title = False
+        if tag in BLOCK_TAGS:
+            self._block()
+        if tag == self._wrapper_tag and self._level > 0:
+            self._level -= 1
+            if self._level == 0:
+                self._in_content = False
+        if self._skip_level and tag == self._skip_tag:
+            self._skip_level -= 1
+
+
+class WikipediaPageParser(PageExtractor, HTMLParser):
+    """
+    Бэкенд на чистом Python (html.parser), используется, если lxml не установлен.
+
+    html.parser сообщает теги как есть, а lxml строит дерево: закрывает
+    незакрытые элементы, когда начинается следующий блок или закрывается
+    родитель, и пропускает лишние закрывающие теги. Чтобы результат
+    совпадал, парсер ведёт стек открытых элементов и применяет те же
+    правила (IMPLIED_CLOSE, END_PRIORITY).
+    """
+
+    def __init__(self, max_content: int = settings.PARSER_MAX_CONTENT, max_links: Optional[int] = None):
+        PageExtractor.__init__(self, max_content, max_links)
+        HTMLParser.__init__(self)
+        self._open: List[str] = []
+
+    feed = HTMLParser.feed
+
+    def close(self) -> None:
+        HTMLParser.close(self)
+        while self._open:
+            self._end(self._open.pop())
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self._at_boundary = True
+        closes = IMPLIED_CLOSE.get(tag)
+        if closes:
+            while self._open and self._open[-1] in closes:
+                self._end(self._open.pop())
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+        if tag in BLOCK_TAGS:
+            self._block()
+        # Building a dict for every tag is the hot spot, so skip tags we never inspect
+        if tag in TRACKED_TAGS:
+            self._start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_data(self, data: str):
+        self._data(data)
+
+    def handle_endtag(self, tag: str):
+        priority = END_PRIORITY.get(tag, 100)
+        for open_tag in reversed(self._open):
+            if open_tag == tag:
+                break
+            if END_PRIORITY.get(open_tag, 100) > priority:
+                return
+        else:
+            # A stray end tag, dropped like lxml does
+            return
+        self._at_boundary = True
+        # Elements left open inside this one are closed implicitly
+        while True:
+            open_tag = self._open.pop()
+            self._end(open_tag)
+            if open_tag == tag:
+                break
+
+
+class _LxmlTarget:
+    """Адаптер событий парсера lxml к PageExtractor."""
+
+    def __init__(self, extractor: PageExtractor):
+        self.extractor = extractor
+
+    def start(self, tag: str, attrib: dict) -> None:
+        self.extractor._at_boundary = True
+        if tag in BLOCK_TAGS:
+            self.extractor._block()
+        if tag in TRACKED_TAGS:
+            self.extractor._start(tag, attrib)
+
+    def end(self, tag: str) -> None:
+        self.extractor._at_boundary = True
+        self.extractor._end(tag)
+
+    def data(self, data: str) -> None:
+        self.extractor._data(data)
+
+    def close(self) -> None:
+        return None
+
+
+class LxmlPageParser(PageExtractor):
+    """Бэкенд на libxml2 (lxml): токенизация HTML выполняется в C."""
+
+    def __init__(self, max_content: int = settings.PARSER_MAX_CONTENT, max_links: Optional[int] = None):
+        super().__init__(max_content, max_links)
+        self._parser = etree.HTMLParser(target=_LxmlTarget(self), encoding="utf-8")
+
+    def feed(self, data: str) -> None:
+        self._parser.feed(data)
+
+    def close(self) -> None:
+        self._parser.close()
+
+
+PARSER_BACKENDS = {"html.parser": WikipediaPageParser}
+if etree is not None:
+    PARSER_BACKENDS["lxml"] = LxmlPageParser
+
+
+def get_parser_backend(name: str = settings.PARSER_BACKEND) -> type[PageExtractor]:
+    """
+    Возвращает класс бэкенда разбора HTML.
+
+    :param name: "auto" (lxml, если установлен, иначе html.parser), "lxml" или "html.parser"
+    """
+    if name == "auto":
+        return PARSER_BACKENDS.get("lxml", WikipediaPageParser)
+    if name not in PARSER_BACKENDS:
+        logger.warning(f"HTML parser backend {name!r} is not available, falling back to html.parser")
+        return WikipediaPageParser
+    return PARSER_BACKENDS[name]
+
+
+def extract_page(
+        body: bytes,
+        encoding: str = "utf-8",
+        backend: str = settings.PARSER_BACKEND,
+        max_content: int = settings.PARSER_MAX_CONTENT,
+        max_links: Optional[int] = None
+) -> dict:
+    """
+    Разбирает страницу целиком. Функция верхнего уровня, чтобы её можно
+    было выполнять в пуле процессов.
+
+    :return: Словарь с ключами title, content, links, link_counts и lead_links
+    """
+    parser = get_parser_backend(backend)(max_content=max_content, max_links=max_links)
+    parser.feed(body.decode(encoding, errors="replace"))
+    parser.close()
+    return parser.result()
@@ -1,148 +1,528 @@
 import asyncio
-import aiohttp
-from html.parser import HTMLParser
+import codecs
 import re
-from typing import Set, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from urllib.parse import quote, unquote, urlsplit
+
+import aiohttp
+from typing import Dict, List, Set, Optional, Tuple
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from loguru import logger
 
-from wiki_parser_app.models.articles import Article
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.metrics import PAGES_CRAWLED, PAGES_DEDUPED, PAGES_FAILED, PARSE_SECONDS
+from wiki_parser_app.core.profiling import current_profile, profiling, span
+from wiki_parser_app.services.article_writer import ArticleBatchWriter, ArticleWriteError
+from wiki_parser_app.services.fetch_middleware import PoliteFetcher
+from wiki_parser_app.services.page_cache import PageCache
+from wiki_parser_app.services.link_ranking import LINK_STRATEGIES, rank_links
+from wiki_parser_app.services.mediawiki_api import MediaWikiApiBackend
+from wiki_parser_app.services.page_parsers import extract_page, get_parser_backend
+
+
+WIKI_HOST = re.compile(r"^(?P<lang>[a-z][a-z0-9-]*)(?:\.m)?\.wikipedia\.org$")
+
 
+def normalize_title(url: str) -> str:
+    """Нормализованный заголовок статьи из URL, пути /wiki/... или заголовка."""
+    if url.startswith(('http://', 'https://', '/wiki/')):
+        url = url.split('/wiki/')[-1]
+    return unquote(url.split('#')[0].split('?')[0].strip()).replace(' ', '_')
+
+
+def split_wiki_url(url: str) -> Tuple[str, str]:
+    """
+    Разбирает URL или заголовок статьи на язык раздела и нормализованный заголовок.
+    Для заголовка без хоста (и для хостов не из *.wikipedia.org) берётся WIKI_DEFAULT_LANG.
+    """
+    url = url.strip()
+    lang = settings.WIKI_DEFAULT_LANG
+    if url.startswith(('http://', 'https://')):
+        match = WIKI_HOST.match(urlsplit(url).hostname or '')
+        if match:
+            lang = match.group('lang')
+    return lang, normalize_title(url)
+
+
+class CrawlStats:
+    """Статистика обхода: пропускная способность, глубина очереди и страницы по уровням."""
 
-class WikipediaPageParser(HTMLParser):
     def __init__(self):
-        super().__init__()
-        self._level = 0
-        self._wrapper_tag = ""
-        self._pattern = re.compile(r"^/wiki/(?!.*:).*")
-        self._found_links: Set[str] = set()
-        self.title = ""
-        self.content = ""
-        self._in_title = False
-        self._in_content = False
-
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
-        attrs_dict = dict(attrs)
-
-        # Detect title
-        if tag == "h1" and attrs_dict.get("id") == "firstHeading":
-            self._in_title = True
-
-        # Detect content area
-        if tag == "div" and attrs_dict.get("id") == "bodyContent":
-            self._level = 1
-            self._wrapper_tag = tag
-            self._in_content = True
-
-        # Collect links
-        if self._level > 0 and tag == "a" and "href" in attrs_dict:
-            if self._pattern.match(attrs_dict["href"]):
-                self._found_links.add(attrs_dict["href"])
-
-        # Skip unwanted elements
-        if tag in ["table", "div", "span"] and any(
-                attr in attrs_dict.get("class", "")
-                for attr in ["hatnote", "thumb", "mw-editsection"]
-        ):
-            self._skip_element = True
-
-    def handle_data(self, data: str):
-        if self._in_title:
-            self.title += data
-        elif self._in_content and not getattr(self, "_skip_element", False):
-            self.content += data + " "
-
-    def handle_endtag(self, tag: str):
-        if tag == "h1" and self._in_title:
-            self._in_title = False
-        if tag == self._wrapper_tag and self._level > 0:
-            self._level -= 1
-            if self._level == 0:
-                self._in_content = False
-        if tag == "div" and getattr(self, "_skip_element", False):
-            self._skip_element = False
-
-    def get_found_links(self) -> Set[str]:
-        return self._found_links
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.pages_deduped = 0
+        self.pages_by_depth: Dict[int, int] = defaultdict(int)
+        self.max_depth_reached = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record_page(self, depth: int) -> None:
+        self.pages_fetched += 1
+        self.pages_by_depth[depth] += 1
+        self.max_depth_reached = max(self.max_depth_reached, depth)
+        PAGES_CRAWLED.inc()
+
+    def record_failed(self, count: int = 1) -> None:
+        self.pages_failed += count
+        PAGES_FAILED.inc(count)
+
+    def record_deduped(self) -> None:
+        self.pages_deduped += 1
+        PAGES_DEDUPED.inc()
+
+    def observe_queue(self, size: int) -> None:
+        self.queue_depth = size
+        self.max_queue_depth = max(self.max_queue_depth, size)
+
+    def finish(self) -> None:
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages_fetched / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'pages_fetched': self.pages_fetched,
+            'pages_failed': self.pages_failed,
+            'pages_deduped': self.pages_deduped,
+            'pages_by_depth': dict(self.pages_by_depth),
+            'max_depth_reached': self.max_depth_reached,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'elapsed': round(self.elapsed, 3),
+            'pages_per_second': round(self.pages_per_second, 2),
+        }
 
 
 class WikipediaParser:
-    def __init__(self, session: AsyncSession, max_depth: int = 5):
-        self.session = session
-        self.max_depth = max_depth
-        self.visited_urls = set()
-        self.semaphore = asyncio.Semaphore(10)
-        self.base_url = "https://ru.wikipedia.org"
+    def __init__(
+            self,
+            session_maker: async_sessionmaker,
+            http_session: aiohttp.ClientSession,
+            max_depth: int = settings.CRAWL_MAX_DEPTH,
+            workers: int = settings.CRAWL_WORKERS,
+            max_pages: int = settings.CRAWL_MAX_PAGES,
+            fan_out: int = settings.CRAWL_FAN_OUT,
+            freshness_hours: Optional[float] = settings.CRAWL_FRESHNESS_HOURS,
+            parse_executor: Optional[Executor] = None,
+            link_strategy: str = settings.CRAWL_LINK_STRATEGY,
+            fetcher: Optional[PoliteFetcher] = None,
+            page_cache: Optional[PageCache] = None,
+            fetch_backend: str = settings.CRAWL_FETCH_BACKEND
+    ):
+        self.session_maker = session_maker
+        self.http_session = http_session
+        self.fetcher = fetcher or PoliteFetcher(http_session)
+        self.page_cache = page_cache
+        self.parse_executor = parse_executor
+        self.workers = workers
+        self.freshness = timedelta(hours=freshness_hours) if freshness_hours is not None else None
+        self.visited_urls: Set[str] = set()
+        self.scheduled = 0
+        self.stats = CrawlStats()
+        self.lang = settings.WIKI_DEFAULT_LANG
+        self.base_url = settings.WIKI_BASE_URL.format(lang=self.lang)
+        self.fetch_backend = fetch_backend
+        self.page_parser_class = get_parser_backend()
+        self.writer = ArticleBatchWriter(session_maker)
+        self.configure(max_depth=max_depth, fan_out=fan_out, max_pages=max_pages, link_strategy=link_strategy)
+
+    def configure(
+            self,
+            max_depth: Optional[int] = None,
+            fan_out: Optional[int] = None,
+            max_pages: Optional[int] = None,
+            link_strategy: Optional[str] = None
+    ) -> None:
+        """Задаёт параметры обхода; None оставляет текущее значение."""
+        if link_strategy is not None and link_strategy not in LINK_STRATEGIES:
+            raise ValueError(f"Unknown link strategy: {link_strategy!r}")
+        if max_depth is not None:
+            self.max_depth = max_depth
+        if fan_out is not None:
+            self.fan_out = fan_out
+        if max_pages is not None:
+            self.max_pages = max_pages
+        if link_strategy is not None:
+            self.link_strategy = link_strategy
+
+        # The whole link list is only needed when the link graph is stored
+        # or when links are ranked by something other than document order
+        if settings.CRAWL_STORE_LINKS or self.link_strategy != "order":
+            self.max_links = max(settings.CRAWL_MAX_LINKS_PER_PAGE, self.fan_out)
+        else:
+            self.max_links = self.fan_out
+
+    async def parse_article(self, url: str, profile: bool = False) -> bool:
+        """
+        Обходит статьи в ширину начиная с url.
+
+        Обход идёт внутри языкового раздела, заданного хостом url
+        (en.wikipedia.org -> en); для заголовка без хоста — WIKI_DEFAULT_LANG.
+
+        Очередь (frontier) разбирают self.workers воркеров, поэтому число
+        одновременных HTTP-запросов ограничено пулом воркеров, а не глубиной
+        обхода. С бэкендом "api" воркер забирает из очереди пачку до
+        MEDIAWIKI_API_BATCH_SIZE статей: ссылки всей пачки приходят одним
+        запросом, тексты загружаются параллельно по одному.
+        Статьи сохраняются пачками через self.writer. Уже сохранённые в БД
+        статьи (не старше self.freshness, если окно задано) повторно не
+        сохраняются, но раскрываются (см. _expand_stored), поэтому повторный
+        обход с большей глубиной или ветвлением продолжается ниже них.
+        Общее число статей обхода, включая уже сохранённые, ограничено
+        self.max_pages.
 
-    async def parse_article(self, url: str, depth: int = 0, parent_id: Optional[int] = None) -> bool:
-        if depth > self.max_depth:
-            return False
+        :param profile: Записать профиль обхода (см. core.profiling), также
+            включается настройкой PROFILING_ENABLED
+        :return: True, если корневая статья сохранена (в этом обходе или раньше)
+        """
+        with profiling(f"crawl {url}", enabled=profile or settings.PROFILING_ENABLED):
+            return await self._crawl(url)
 
-        normalized_url = self._normalize_url(url)
-        full_url = self._build_full_url(normalized_url)
+    async def _crawl(self, url: str) -> bool:
+        self.stats = CrawlStats()
+        self.visited_urls = set()
+        self.scheduled = 0
+        frontier: asyncio.Queue = asyncio.Queue()
+        self.lang, root_url = split_wiki_url(url)
+        self.base_url = settings.WIKI_BASE_URL.format(lang=self.lang)
+        self.writer.reset()
+        self.writer.lang = self.lang
+        await self._schedule(frontier, [root_url], 0, None)
 
-        if full_url in self.visited_urls:
-            return False
-        self.visited_urls.add(full_url)
+        api = None
+        if self.fetch_backend == "api":
+            api = MediaWikiApiBackend(
+                self.fetcher,
+                f"{self.base_url}/w/api.php",
+                settings.PARSER_MAX_CONTENT,
+                self.max_links
+            )
 
+        self.writer.start()
+        workers = [asyncio.create_task(self._worker(frontier, api)) for _ in range(self.workers)]
+        # A failed write aborts the crawl: later pages could not be stored anyway
+        done = asyncio.ensure_future(frontier.join())
+        failed = asyncio.ensure_future(self.writer.failed.wait())
         try:
-            async with self.semaphore:
-                article_data = await self._fetch_article(full_url)
-                if not article_data:
-                    return False
+            await asyncio.wait([done, failed], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            tasks = [done, failed, *workers]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.writer.close()
+            self.stats.finish()
+
+        if self.writer.error is not None:
+            raise ArticleWriteError(f"Crawl of {self.lang}:{root_url} aborted") from self.writer.error
+        logger.info(f"Crawl of {self.lang}:{root_url} finished: {self.stats.as_dict() | self.writer.as_dict()}")
+        return root_url in self.writer.url_ids
+
+    async def _worker(self, frontier: asyncio.Queue, api: Optional[MediaWikiApiBackend]) -> None:
+        while True:
+            # Idle workers wait here: a long total means the pool is larger than the frontier
+            with span("frontier_wait"):
+                batch = [await frontier.get()]
+            if api is not None:
+                while len(batch) < settings.MEDIAWIKI_API_BATCH_SIZE and not frontier.empty():
+                    batch.append(frontier.get_nowait())
+            try:
+                to_fetch = await self._expand_stored(frontier, batch)
+                if to_fetch:
+                    with span("fetch"):
+                        if api is not None:
+                            pages = await api.fetch_batch([url for url, _, _, _ in to_fetch])
+                        else:
+                            url = to_fetch[0][0]
+                            pages = {url: await self._fetch_article(self._build_full_url(url))}
+
+                for url, depth, parent_url, known in to_fetch:
+                    try:
+                        await self._crawl_page(frontier, url, depth, parent_url, pages.get(url), store=not known)
+                    except ArticleWriteError:
+                        raise
+                    except Exception as e:
+                        self.stats.record_failed()
+                        logger.error(f"Error parsing {url}: {str(e)}")
+            except ArticleWriteError:
+                raise
+            except Exception as e:
+                self.stats.record_failed(len(batch))
+                logger.error(f"Error fetching {', '.join(url for url, _, _, _ in batch)}: {str(e)}")
+            finally:
+                for _ in batch:
+                    frontier.task_done()
+                self.stats.observe_queue(frontier.qsize())
+
+    async def _expand_stored(self, frontier: asyncio.Queue, batch: List[tuple]) -> List[tuple]:
+        """
+        Раскрывает уже сохранённые статьи пачки по их сохранённым ссылкам,
+        не загружая страницы заново.
+
+        Сохранённые ссылки идут в порядке документа, поэтому годятся только
+        для стратегии "order". Для остальных стратегий, а также если граф
+        ссылок не сохраняется (CRAWL_STORE_LINKS), страница загружается
+        повторно, но только ради ссылок: сама статья не перезаписывается.
 
-                article = Article(
+        :return: Элементы пачки, которые нужно загрузить
+        """
+        known = [url for url, _, _, is_known in batch if is_known]
+        if not known or self.link_strategy != "order" or not self.writer.store_links:
+            return batch
+
+        with span("stored_links"):
+            stored = await self.writer.stored_links(known)
+
+        to_fetch = []
+        for item in batch:
+            url, depth, _, is_known = item
+            if is_known:
+                await self._schedule(frontier, stored.get(url, [])[:self.fan_out], depth + 1, url)
+            else:
+                to_fetch.append(item)
+        return to_fetch
+
+    async def _crawl_page(
+            self,
+            frontier: asyncio.Queue,
+            url: str,
+            depth: int,
+            parent_url: Optional[str],
+            article_data: Optional[dict],
+            store: bool = True
+    ) -> None:
+        if not article_data:
+            self.stats.record_failed()
+            return
+
+        # Different hrefs may point to the same article (anchors, encoding),
+        # so counts and lead membership are merged after normalization
+        counts: Dict[str, int] = {}
+        lead: Set[str] = set()
+        lead_hrefs = set(article_data['lead_links'])
+        for href, count in zip(article_data['links'], article_data['link_counts']):
+            link = self._normalize_url(href)
+            counts[link] = counts.get(link, 0) + count
+            if href in lead_hrefs:
+                lead.add(link)
+        links = list(counts)
+        # An already stored article is fetched again only for its links
+        if store:
+            with span("store"):
+                await self.writer.add(
+                    url=url,
                     title=article_data['title'],
-                    url=normalized_url,
                     content=article_data['content'],
-                    parsed=True,
-                    parent_id=parent_id
+                    level=depth,
+                    parent_url=parent_url,
+                    links=links
                 )
+            self.stats.record_page(depth)
 
-                self.session.add(article)
-                await self.session.flush()
+        if depth < self.max_depth:
+            ranked = rank_links(links, self.link_strategy, [counts[link] for link in links], lead)
+            await self._schedule(frontier, ranked[:self.fan_out], depth + 1, url)
 
-                if depth < self.max_depth:
-                    child_links = article_data['links']
-                    tasks = [
-                        self.parse_article(link, depth + 1, article.id)
-                        for link in child_links[:5]  # Limit child articles
-                    ]
-                    await asyncio.gather(*tasks)
+    async def _schedule(
+            self,
+            frontier: asyncio.Queue,
+            links: List[str],
+            depth: int,
+            parent_url: Optional[str]
+    ) -> None:
+        candidates = []
+        for normalized_url in links:
+            if normalized_url not in self.visited_urls and normalized_url not in candidates:
+                candidates.append(normalized_url)
+        if not candidates:
+            return
 
-                return True
+        # One lookup per frontier batch instead of one per page
+        with span("dedup_lookup"):
+            known_urls = await self.writer.known_urls(candidates, self.freshness)
 
-        except Exception as e:
-            logger.error(f"Error parsing {url}: {str(e)}")
-            return False
+        # Stored articles are not fetched again but stay in the traversal:
+        # they are expanded, so a deeper crawl continues below them
+        for normalized_url in candidates:
+            if normalized_url in self.visited_urls:
+                continue
+            if self.scheduled >= self.max_pages:
+                break
+            self.visited_urls.add(normalized_url)
+            self.scheduled += 1
+            known = normalized_url in known_urls
+            if known:
+                self.stats.record_deduped()
+                # A stored article at the depth limit needs no work at all
+                if depth >= self.max_depth:
+                    continue
+            frontier.put_nowait((normalized_url, depth, parent_url, known))
+        self.stats.observe_queue(frontier.qsize())
 
     async def _fetch_article(self, url: str) -> Optional[dict]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
+            if self.page_cache is not None:
+                page = await self._fetch_cached(url)
+                if page is None:
+                    return None
+            else:
+                async with self.fetcher.get(url) as response:
                     if response.status != 200:
                         logger.warning(f"HTTP {response.status} for {url}")
                         return None
-                    html = await response.text()
 
-            parser = WikipediaPageParser()
-            parser.feed(html)
+                    encoding = response.charset or 'utf-8'
+                    if self._streams:
+                        page = await self._extract_streaming(response, encoding)
+                    else:
+                        body = await self._read_body(response)
+
+                if not self._streams:
+                    page = await self._extract_body(body, encoding)
 
             return {
                 'url': self._normalize_url(url),
-                'title': parser.title.strip(),
-                'content': parser.content.strip()[:50000],  # Limit content size
-                'links': list(parser.get_found_links())
+                'title': page['title'],
+                'content': page['content'],
+                'links': page['links'],
+                'link_counts': page['link_counts'],
+                'lead_links': page['lead_links']
             }
 
         except Exception as e:
             logger.error(f"Fetch error for {url}: {str(e)}")
             return None
 
+    async def _fetch_cached(self, url: str) -> Optional[dict]:
+        """
+        Загрузка через кэш страниц: условный запрос с валидаторами из кэша,
+        ответ 304 берётся из кэша (присланные с ним ETag и Last-Modified
+        сохраняются в записи). Тело читается целиком (до PARSER_MAX_BYTES),
+        чтобы его можно было сохранить, поэтому потоковый разбор не используется.
+        """
+        entry = await self.page_cache.get(url)
+        if self.page_cache.offline:
+            if entry is None:
+                self.page_cache.misses += 1
+                logger.warning(f"{url} is not in the page cache (offline mode)")
+                return None
+            self.page_cache.hits += 1
+            return await self._extract_body(entry['body'], entry['encoding'])
+
+        async with self.fetcher.get(url, headers=self.page_cache.validators(entry)) as response:
+            if response.status == 304 and entry is not None:
+                self.page_cache.revalidated += 1
+                body, encoding = entry['body'], entry['encoding']
+                await self.page_cache.refresh(
+                    url,
+                    entry,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
+            elif response.status == 200:
+                self.page_cache.misses += 1
+                encoding = response.charset or 'utf-8'
+                body = await self._read_body(response)
+                await self.page_cache.put(
+                    url,
+                    body,
+                    encoding,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
+            else:
+                logger.warning(f"HTTP {response.status} for {url}")
+                return None
+
+        return await self._extract_body(body, encoding)
+
+    async def _extract_body(self, body: bytes, encoding: str) -> dict:
+        extract = partial(
+            extract_page,
+            body,
+            encoding,
+            settings.PARSER_BACKEND,
+            settings.PARSER_MAX_CONTENT,
+            self.max_links
+        )
+        if self.parse_executor is None:
+            with PARSE_SECONDS.labels('inline').time(), span("parse"):
+                return extract()
+        # Parsing is CPU-bound, keep it off the event loop.
+        # The measured time includes waiting for a free executor worker
+        with PARSE_SECONDS.labels('executor').time(), span("parse"):
+            return await asyncio.get_running_loop().run_in_executor(self.parse_executor, extract)
+
+    @property
+    def _streams(self) -> bool:
+        """
+        Разбирается ли страница потоком прямо из сокета.
+
+        Потоковый разбор перестаёт читать ответ, как только набраны лимит
+        текста и квота ссылок. Он возможен без пула (разбор в event loop) и
+        с пулом потоков, куда уходит каждый фрагмент. Состояние парсера не
+        передать в другой процесс, поэтому с пулом процессов тело читается
+        целиком (до PARSER_MAX_BYTES) и разбирается в процессе одним вызовом.
+        """
+        return self.parse_executor is None or isinstance(self.parse_executor, ThreadPoolExecutor)
+
+    async def _extract_streaming(self, response: aiohttp.ClientResponse, encoding: str) -> dict:
+        parser = self.page_parser_class(max_links=self.max_links)
+
+        # Feed the parser straight from the socket and stop reading
+        # as soon as the content cap and link quota are reached
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        # Only the time spent in the parser is measured, not waiting for the network;
+        # with a thread pool it includes waiting for a free worker
+        parse_time = 0.0
+        async for chunk in response.content.iter_chunked(settings.PARSER_CHUNK_SIZE):
+            started = time.perf_counter()
+            await self._feed(parser.feed, decoder.decode(chunk))
+            parse_time += time.perf_counter() - started
+            if parser.done:
+                break
+        else:
+            started = time.perf_counter()
+            await self._feed(parser.feed, decoder.decode(b'', final=True))
+            await self._feed(parser.close)
+            parse_time += time.perf_counter() - started
+        PARSE_SECONDS.labels('streaming').observe(parse_time)
+        current = current_profile.get()
+        if current is not None:
+            current.add_span("parse", parse_time)
+        return parser.result()
+
+    async def _feed(self, method, *args) -> None:
+        if self.parse_executor is None:
+            method(*args)
+        else:
+            # One chunk at a time, in order: the parser is never used by two threads at once
+            await asyncio.get_running_loop().run_in_executor(self.parse_executor, method, *args)
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(settings.PARSER_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= settings.PARSER_MAX_BYTES:
+                break
+        return b''.join(chunks)
+
     def _normalize_url(self, url: str) -> str:
-        if url.startswith(('http://', 'https://')):
-            url = url.split('/wiki/')[-1]
-        return url.split('#')[0].split('?')[0].strip()
+        return normalize_title(url)
 
     def _build_full_url(self, normalized_url: str) -> str:
-        return f"{self.base_url}/wiki/{normalized_url}"
+        return f"{self.base_url}/wiki/{quote(normalized_url)}"
@@ -0,0 +1,170 @@
+import asyncio
+import random
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.core.rate_limit import TokenBucket, parse_retry_after
+from wiki_parser_app.repositories.article_repo import ArticleRepository
+from wiki_parser_app.services.article_service import ArticleService
+from wiki_parser_app.services.llm_service import SummaryService
+
+
+class RateLimitedSummaryService(SummaryService):
+    """
+    SummaryService с лимитами запросов и токенов в минуту и повторами
+    с экспоненциальной задержкой для 429/5xx и сетевых ошибок.
+
+    Лимиты и повторы применяются к каждому запросу к LLM, а не к summary
+    целиком: в режиме map-reduce одно summary — это запрос на каждый
+    фрагмент и финальный запрос, и каждый из них расходует свой бюджет.
+    """
+
+    def __init__(
+            self,
+            api_key: str,
+            requests_per_minute: int = settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute: int = settings.LLM_TOKENS_PER_MINUTE,
+            max_retries: int = settings.LLM_MAX_RETRIES
+    ):
+        super().__init__(api_key)
+        self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.max_retries = max_retries
+        self.retries = 0
+
+    @staticmethod
+    def estimate_tokens(system: str, user: str) -> int:
+        """Оценка токенов одного запроса: промпт и максимальная длина ответа."""
+        return int((len(system) + len(user)) / settings.LLM_CHARS_PER_TOKEN) + settings.LLM_MAX_TOKENS
+
+    async def _complete(self, system: str, user: str) -> str:
+        attempt = 0
+        while True:
+            await self.requests.acquire()
+            await self.tokens.acquire(self.estimate_tokens(system, user))
+            try:
+                return await super()._complete(system, user)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"LLM call failed ({str(e)}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_delay(error: Optional[BaseException], attempt: int) -> Optional[float]:
+        """
+        Задержка перед повтором или None, если ошибку повторять бессмысленно.
+
+        Retry-After соблюдается так же, как в PoliteFetcher: ровно указанное
+        время, даже если оно больше LLM_BACKOFF_MAX, а если оно больше
+        LLM_RETRY_AFTER_MAX, запрос не повторяется.
+        """
+        if isinstance(error, RateLimitError) or (isinstance(error, APIStatusError) and error.status_code >= 500):
+            retry_after = parse_retry_after(error.response.headers.get("retry-after"))
+            if retry_after is not None:
+                if retry_after > settings.LLM_RETRY_AFTER_MAX:
+                    # Retrying earlier than the server asked would only be refused again
+                    logger.warning(f"LLM call failed ({str(error)}), Retry-After {retry_after:.0f}s is too long")
+                    return None
+                return retry_after
+        elif not isinstance(error, (APIConnectionError, APITimeoutError)):
+            return None
+
+        backoff = min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * 2 ** attempt)
+        return random.uniform(backoff / 2, backoff)
+
+
+class BatchSummarizer:
+    """
+    Пакетная генерация summary для всех статей дерева обхода или для всех
+    статей без summary.
+
+    Каждое summary сохраняется и коммитится отдельно, а статьи для обработки
+    выбираются как «ещё без summary», поэтому прерванный запуск после
+    рестарта продолжается с того же места повторным POST /summary/batch.
+
+    Состояние запусков (runs) хранится только в памяти процесса: после
+    рестарта GET /summary/batch/{run_id} его не найдёт, а запуск
+    сам не возобновляется — сохранённые summary при этом не теряются.
+    """
+
+    def __init__(
+            self,
+            session_maker: async_sessionmaker,
+            service_factory: Callable[[AsyncSession], ArticleService],
+            concurrency: int = settings.SUMMARY_BATCH_CONCURRENCY,
+            page_size: int = settings.SUMMARY_BATCH_PAGE_SIZE
+    ):
+        self.session_maker = session_maker
+        self.service_factory = service_factory
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.runs: Dict[str, dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, root_id: Optional[uuid.UUID] = None) -> str:
+        """Запускает обработку в фоне; повторный вызов для идущего запуска ничего не делает."""
+        key = str(root_id) if root_id else "all"
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            self.runs[key] = {'status': 'running', 'summarized': 0, 'failed': 0}
+            self._tasks[key] = asyncio.create_task(self._run(key, root_id))
+        return key
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+
+    async def _run(self, key: str, root_id: Optional[uuid.UUID]) -> None:
+        run = self.runs[key]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Articles that failed or produced no summary are not picked up again in this run.
+        # Summarized ones need no exclusion: the query only returns articles without a summary
+        skipped: List[uuid.UUID] = []
+
+        async def summarize(article_id: uuid.UUID) -> None:
+            async with semaphore:
+                try:
+                    if await self._summarize_one(article_id):
+                        run['summarized'] += 1
+                    else:
+                        skipped.append(article_id)
+                except Exception as e:
+                    skipped.append(article_id)
+                    run['failed'] += 1
+                    logger.error(f"Could not summarize article {article_id}: {str(e)}")
+
+        try:
+            while True:
+                async with self.session_maker() as session:
+                    article_ids = await ArticleRepository(session).get_unsummarized_ids(
+                        root_id, self.page_size, skipped)
+                if not article_ids:
+                    break
+                await asyncio.gather(*(summarize(article_id) for article_id in article_ids))
+            run['status'] = 'completed'
+        except Exception as e:
+            run['status'] = 'failed'
+            run['error'] = str(e)
+            logger.error(f"Batch summarization {key} failed: {str(e)}")
+
+    async def _summarize_one(self, article_id: uuid.UUID) -> bool:
+        """:return: True, если у статьи теперь есть summary"""
+        async with self.session_maker() as session:
+            service = self.service_factory(session)
+            article = await service.article_repo.get_by_id_with_summary(article_id)
+            if not article:
+                return False
+            summarized = await service.summarize_article(article)
+            await session.commit()
+            return summarized
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from wiki_parser_app.core.cache import TTLCache
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.repositories.summary_repo import SummaryRepository
+
+
+class SummaryCache:
+    """
+    Кэш готовых summary по хэшу входного текста промпта.
+
+    Сначала проверяется LRU в памяти процесса, затем таблица summaries;
+    только при промахе в обоих нужен вызов LLM.
+    """
+
+    def __init__(self, maxsize: int = settings.SUMMARY_CACHE_SIZE, ttl: float = settings.SUMMARY_CACHE_TTL):
+        self.lru = TTLCache(maxsize, ttl)
+        self.lru_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, content_hash: str, summary_repo: SummaryRepository) -> Optional[str]:
+        summary_text = self.lru.get(content_hash)
+        if summary_text is not None:
+            self.lru_hits += 1
+            return summary_text
+
+        summary = await summary_repo.get_by_content_hash(content_hash)
+        if summary:
+            self.db_hits += 1
+            self.lru.set(content_hash, summary.content)
+            return summary.content
+
+        self.misses += 1
+        return None
+
+    def record_db_hit(self, content_hash: str, summary_text: str) -> None:
+        self.db_hits += 1
+        self.lru.set(content_hash, summary_text)
+
+    def put(self, content_hash: str, summary_text: str) -> None:
+        self.lru.set(content_hash, summary_text)
+
+    def stats(self) -> dict:
+        lookups = self.lru_hits + self.db_hits + self.misses
+        return {
+            'lru_hits': self.lru_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.lru_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            'lru_size': len(self.lru),
+        }
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import uuid
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from wiki_parser_app.core.cache import CacheBackend, TTLCache, create_cache_backend
+from wiki_parser_app.core.config import settings
+from wiki_parser_app.repositories.summary_repo import CHANGED_SUMMARIES
+
+
+class SummaryResponseCache:
+    """
+    Read-through кэш ответов GET /summary.
+
+    Хранит две записи: url статьи -> id (не меняется) и id -> summary
+    с ETag. Сначала проверяется LRU в памяти процесса, затем общий кэш
+    (если настроен), и только потом БД.
+
+    Запись id -> summary сбрасывается после COMMIT транзакции, изменившей
+    summary (SummaryRepository отмечает такие статьи в session.info), а не
+    до него: иначе параллельный GET успел бы снова закэшировать старую
+    строку. generation растёт при каждом сбросе; значение, прочитанное
+    до сброса, в кэш уже не попадает.
+    """
+
+    def __init__(
+            self,
+            maxsize: int = settings.SUMMARY_RESPONSE_CACHE_SIZE,
+            ttl: float = settings.SUMMARY_RESPONSE_CACHE_TTL,
+            shared: Optional[CacheBackend] = None,
+            shared_ttl: float = settings.SUMMARY_RESPONSE_SHARED_TTL
+    ):
+        self.local = TTLCache(maxsize, ttl)
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._pending: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _url_key(lang: str, url: str) -> str:
+        return f"summary-url:{lang}:{url}"
+
+    @staticmethod
+    def _summary_key(article_id: uuid.UUID) -> str:
+        return f"summary:{article_id}"
+
+    @staticmethod
+    def etag(summary_text: str) -> str:
+        return '"' + hashlib.sha256(summary_text.encode("utf-8")).hexdigest()[:32] + '"'
+
+    async def _get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """:return: Значение и уровень кэша, где оно нашлось ("local" или "shared")"""
+        value = self.local.get(key)
+        if value is not None:
+            return value, "local"
+        if self.shared is not None:
+            generation = self.generation
+            value = await self.shared.get(key)
+            if value is not None:
+                # An invalidation during the await means the value may be stale
+                if generation == self.generation:
+                    self.local.set(key, value)
+                return value, "shared"
+        return None, None
+
+    async def _set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.shared_ttl)
+
+    async def get(self, lang: str, url: str) -> Optional[dict]:
+        """
+        :return: Словарь с ключами id, summary и etag или None при промахе
+        """
+        article_id, _ = await self._get(self._url_key(lang, url))
+        if article_id is None:
+            self.misses += 1
+            return None
+
+        entry, level = await self._get(self._summary_key(article_id))
+        if entry is None:
+            self.misses += 1
+        elif level == "local":
+            self.local_hits += 1
+        else:
+            self.shared_hits += 1
+        return entry
+
+    async def set(
+            self,
+            lang: str,
+            url: str,
+            article_id: uuid.UUID,
+            summary_text: str,
+            generation: Optional[int] = None
+    ) -> dict:
+        """
+        :param generation: Значение self.generation до чтения summary из БД;
+            если с тех пор был сброс, summary не кэшируется
+        """
+        entry = {'id': str(article_id), 'summary': summary_text, 'etag': self.etag(summary_text)}
+        await self._set(self._url_key(lang, url), str(article_id))
+        if generation is None or generation == self.generation:
+            await self._set(self._summary_key(article_id), entry)
+        return entry
+
+    def invalidate(self, article_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Сбрасывает записи id -> summary. Вызывается из обработчика события
+        сессии, поэтому из общего кэша записи удаляются в фоновой задаче.
+        """
+        keys = [self._summary_key(article_id) for article_id in article_ids]
+        self.generation += 1
+        for key in keys:
+            self.local.delete(key)
+        self.invalidations += len(keys)
+        if self.shared is not None:
+            task = asyncio.get_running_loop().create_task(self._invalidate_shared(keys))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _invalidate_shared(self, keys: List[str]) -> None:
+        try:
+            for key in keys:
+                await self.shared.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not invalidate shared summary cache: {str(e)}")
+        # A reader may have copied the old value from the shared cache meanwhile
+        self.generation += 1
+        for key in keys:
+            self.local.delete(key)
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': round((self.local_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            'local_size': len(self.local),
+            'shared_backend': type(self.shared).__name__ if self.shared is not None else None,
+        }
+
+
+summary_response_cache = SummaryResponseCache(
+    shared=create_cache_backend(settings.SUMMARY_RESPONSE_CACHE_BACKEND, settings.REDIS_URL)
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    article_ids = session.info.pop(CHANGED_SUMMARIES, None)
+    if article_ids:
+        summary_response_cache.invalidate(article_ids)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction) -> None:
+    session.info.pop(CHANGED_SUMMARIES, None)
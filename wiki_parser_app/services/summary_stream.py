@@ -0,0 +1,70 @@
+import json
+from typing import AsyncIterator, List
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from wiki_parser_app.models.articles import Article
+from wiki_parser_app.repositories.summary_repo import SummaryRepository
+from wiki_parser_app.services.llm_service import SummaryService
+from wiki_parser_app.services.summary_cache import summary_cache
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Одно событие Server-Sent Events с JSON в поле data."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class SummaryStreamer:
+    """
+    Потоковая выдача summary в формате SSE.
+
+    Актуальное summary статьи (с тем же content_hash) или готовое summary
+    того же текста из кэша отдаётся сразу одним событием "done". Иначе
+    фрагменты от LLM отправляются клиенту по мере генерации, а итоговый
+    текст сохраняется через upsert после завершения потока. Сессии для
+    чтения кэша и записи открываются отдельно: сессия запроса к этому
+    моменту уже закрыта.
+    """
+
+    def __init__(self, llm_service: SummaryService, session_maker: async_sessionmaker):
+        self.llm_service = llm_service
+        self.session_maker = session_maker
+
+    async def events(self, article: Article) -> AsyncIterator[str]:
+        """:param article: Статья с загруженным summary (ArticleRepository.get_with_summary)"""
+        try:
+            content_hash = self.llm_service.content_hash(article)
+            existing = article.summary
+            if existing and existing.content_hash == content_hash:
+                summary_cache.record_db_hit(content_hash, existing.content)
+                yield sse_event("done", {"summary": existing.content, "cached": True})
+                return
+
+            async with self.session_maker() as session:
+                summary_text = await summary_cache.get(content_hash, SummaryRepository(session))
+            if summary_text is not None:
+                await self._save(article, summary_text, content_hash)
+                yield sse_event("done", {"summary": summary_text, "cached": True})
+                return
+
+            parts: List[str] = []
+            async for delta in self.llm_service.stream_summary(article):
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+
+            summary_text = "".join(parts).strip()
+            if not summary_text:
+                raise ValueError("LLM вернул пустой ответ")
+            await self._save(article, summary_text, content_hash)
+            summary_cache.put(content_hash, summary_text)
+            yield sse_event("done", {"summary": summary_text, "cached": False})
+
+        except Exception as e:
+            logger.error(f"Summary stream for article {article.id} failed: {str(e)}")
+            yield sse_event("error", {"detail": str(e)})
+
+    async def _save(self, article: Article, summary_text: str, content_hash: str) -> None:
+        async with self.session_maker() as session:
+            await SummaryRepository(session).upsert(article.id, summary_text, content_hash)
+            await session.commit()